@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     EvidenceCategory, EvidenceSubmission, EvidenceFile,
-    SubmissionComment, ReminderLog
+    SubmissionComment, ReminderLog, DriveUploadJob, DriveCredential, EvidenceBlob, EvidenceUpload,
+    OutboundEmail, NotificationArchive
 )
 
 
@@ -23,9 +24,10 @@ class EvidenceSubmissionAdmin(admin.ModelAdmin):
 
 @admin.register(EvidenceFile)
 class EvidenceFileAdmin(admin.ModelAdmin):
-    list_display = ['filename', 'submission', 'file_size', 'uploaded_at']
-    list_filter = ['uploaded_at', 'mime_type']
+    list_display = ['filename', 'submission', 'file_size', 'uploaded_at', 'drive_upload_status']
+    list_filter = ['uploaded_at', 'mime_type', 'drive_upload_status']
     search_fields = ['filename']
+    readonly_fields = ['blob']
 
 
 @admin.register(SubmissionComment)
@@ -42,4 +44,45 @@ class ReminderLogAdmin(admin.ModelAdmin):
     search_fields = ['submission__category__name']
 
 
+@admin.register(DriveUploadJob)
+class DriveUploadJobAdmin(admin.ModelAdmin):
+    list_display = ['evidence_file', 'status', 'attempts', 'next_attempt_at', 'completed_at']
+    list_filter = ['status']
+    search_fields = ['evidence_file__filename', 'last_error']
 
+
+@admin.register(DriveCredential)
+class DriveCredentialAdmin(admin.ModelAdmin):
+    list_display = ['user', 'token_expiry', 'updated_at']
+    search_fields = ['user__username', 'user__email']
+    # Tokens are never shown
+    fields = ['user', 'token_expiry', 'created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(EvidenceBlob)
+class EvidenceBlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'size', 'ref_count', 'created_at']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'file', 'size', 'ref_count', 'created_at']
+
+
+@admin.register(EvidenceUpload)
+class EvidenceUploadAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'submission', 'created_by', 'offset', 'size', 'expires_at']
+    search_fields = ['filename', 'created_by__username']
+    readonly_fields = ['submission', 'created_by', 'offset', 'size']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject', 'to', 'last_error']
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ['title', 'user', 'notification_type', 'occurrence_count', 'created_at', 'archived_at']
+    list_filter = ['notification_type']
+    search_fields = ['title', 'user__username']
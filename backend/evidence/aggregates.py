@@ -0,0 +1,53 @@
+from django.db.models import Aggregate
+
+
+class PercentileCont(Aggregate):
+    """
+    Continuous percentile (linear interpolation between the closest rows), e.g.
+    PercentileCont('duration', percentile=0.9).
+
+    Uses PERCENTILE_CONT ... WITHIN GROUP on PostgreSQL. SQLite has no percentile
+    function, so a percentile_cont(value, fraction) aggregate is registered on each
+    SQLite connection (see register_sqlite_functions).
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        if not 0 <= percentile <= 1:
+            raise ValueError('percentile must be between 0 and 1')
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        clone = self.copy()
+        clone.template = '%(function)s(%(expressions)s, %(percentile)s)'
+        return super(PercentileCont, clone).as_sql(compiler, connection, **extra_context)
+
+
+class SQLitePercentileCont:
+    """Python implementation of percentile_cont(value, fraction) for SQLite"""
+
+    def __init__(self):
+        self.values = []
+        self.fraction = None
+
+    def step(self, value, fraction):
+        if value is not None:
+            self.values.append(value)
+        self.fraction = fraction
+
+    def finalize(self):
+        if not self.values:
+            return None
+        values = sorted(self.values)
+        position = (len(values) - 1) * self.fraction
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    """connection_created receiver adding the aggregates SQLite lacks"""
+    if connection.vendor == 'sqlite':
+        connection.connection.create_aggregate('PERCENTILE_CONT', 2, SQLitePercentileCont)
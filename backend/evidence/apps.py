@@ -1,9 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class EvidenceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'evidence'
 
+    def ready(self):
+        from .aggregates import register_sqlite_functions
+        from . import signals  # noqa: F401 - registers model signal receivers
+        connection_created.connect(register_sqlite_functions)
+
 
 
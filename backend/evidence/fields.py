@@ -0,0 +1,43 @@
+import base64
+import hashlib
+from functools import lru_cache
+from cryptography.fernet import Fernet, MultiFernet
+from django.conf import settings
+from django.db import models
+
+
+@lru_cache(maxsize=None)
+def _fernet(keys):
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+def field_encryption():
+    """
+    Fernet used to encrypt field values.
+
+    Keys come from FIELD_ENCRYPTION_KEYS (newest first: the first key encrypts, all of them
+    decrypt, so keys can be rotated). Without it a key is derived from SECRET_KEY.
+    """
+    keys = settings.FIELD_ENCRYPTION_KEYS or [
+        base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest()).decode()
+    ]
+    return _fernet(tuple(keys))
+
+
+class EncryptedTextField(models.TextField):
+    """
+    TextField stored encrypted (Fernet: AES-128-CBC with an HMAC).
+
+    The same value encrypts differently each time, so only isnull lookups work on it.
+    """
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return field_encryption().encrypt(value.encode()).decode()
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return field_encryption().decrypt(value.encode()).decode()
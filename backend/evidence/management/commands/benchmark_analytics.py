@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from evidence.models import (
+    EvidenceCategory, EvidenceSubmission, EvidenceStatus, CategoryGroup, ReviewPeriod
+)
+from evidence.services.analytics import build_analytics
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic controls once the benchmark is done"""
+
+
+class Command(BaseCommand):
+    help = 'Measure queries and time of the analytics payload as the number of controls grows (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100, 1000, 10000],
+            help='Numbers of synthetic controls to benchmark with (default: 100 1000 10000)'
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['sizes'])
+        results = []
+
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(username='analytics-benchmark')
+                created = 0
+                for size in sizes:
+                    self._add_controls(created, size, user)
+                    created = size
+                    results.append((size,) + self._measure(user))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"{'controls':>10} {'queries':>8} {'ms':>10}")
+        for size, queries, elapsed in results:
+            self.stdout.write(f'{size:>10} {queries:>8} {elapsed:>10.1f}')
+
+        if len({queries for _, queries, _ in results}) == 1:
+            self.stdout.write(self.style.SUCCESS('Query count is constant across sizes'))
+        else:
+            self.stdout.write(self.style.WARNING('Query count grows with the number of controls'))
+
+    def _add_controls(self, start, end, user):
+        """Create controls start..end-1 with a spread of submission states"""
+        today = timezone.now().date()
+        groups = [code for code, _ in CategoryGroup.choices]
+        periods = [code for code, _ in ReviewPeriod.choices]
+        statuses = [code for code, _ in EvidenceStatus.choices]
+
+        categories = EvidenceCategory.objects.bulk_create([
+            EvidenceCategory(
+                name=f'Benchmark control {i:05d}',
+                description='Synthetic control',
+                evidence_requirements='Synthetic control',
+                review_period=periods[i % len(periods)],
+                category_group=groups[i % len(groups)],
+                assignee=user if i % 3 else None,
+                approver=user if i % 4 else None,
+            )
+            for i in range(start, end)
+        ], batch_size=500)
+
+        now = timezone.now()
+        submissions = []
+        for i, category in enumerate(categories, start=start):
+            for k in range(i % 4):
+                status = statuses[(i + k) % len(statuses)]
+                due_date = today + timedelta(days=(i * 7 + k) % 90 - 60 - 30 * k)
+                submitted_at = now - timedelta(days=(i + k) % 180) if status != EvidenceStatus.PENDING else None
+                submissions.append(EvidenceSubmission(
+                    category=category,
+                    period_start_date=due_date - timedelta(days=30),
+                    period_end_date=due_date - timedelta(days=1),
+                    due_date=due_date,
+                    status=status,
+                    submitted_at=submitted_at,
+                    reviewed_at=submitted_at + timedelta(hours=k + 1)
+                    if status in (EvidenceStatus.APPROVED, EvidenceStatus.REJECTED) else None,
+                ))
+        EvidenceSubmission.objects.bulk_create(submissions, batch_size=500)
+
+    def _measure(self, user):
+        """Return (queries, milliseconds) for one analytics build"""
+        # Warm up first so new controls get their compliance state rows
+        build_analytics(user)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            build_analytics(user)
+            elapsed = (time.perf_counter() - started) * 1000
+        return len(queries), elapsed
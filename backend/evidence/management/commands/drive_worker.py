@@ -0,0 +1,90 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from evidence.models import DriveUploadStatus
+from evidence.services.drive_uploads import claim_jobs, run_upload_job
+
+logger = logging.getLogger(__name__)
+
+
+def _run_job(job_id):
+    """Thread entry point: run one job on this thread's own database connection"""
+    try:
+        return run_upload_job(job_id)
+    except Exception as e:
+        # The job stays claimed and is picked up again once its lease runs out
+        logger.error(f'Drive upload job {job_id} crashed: {str(e)}', exc_info=True)
+        return None, f'Drive upload job {job_id} crashed: {str(e)}'
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Upload queued evidence files to Google Drive using a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.DRIVE_UPLOAD_WORKERS,
+            help=f'Number of uploads to run in parallel (default: {settings.DRIVE_UPLOAD_WORKERS})'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking the queue again when it is empty (default: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no job is due instead of waiting for new ones'
+        )
+
+    def handle(self, *args, **options):
+        threads = max(options['threads'], 1)
+        poll_interval = options['poll_interval']
+        counts = {DriveUploadStatus.UPLOADED: 0, DriveUploadStatus.QUEUED: 0, DriveUploadStatus.FAILED: 0}
+        running = set()
+
+        self.stdout.write(f'Drive upload worker started with {threads} thread(s)')
+        try:
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='drive-upload') as pool:
+                while True:
+                    # Keep every thread busy: claim as many jobs as there are free threads
+                    if len(running) < threads:
+                        for job_id in claim_jobs(threads - len(running)):
+                            running.add(pool.submit(_run_job, job_id))
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._report(future.result(), counts)
+        except KeyboardInterrupt:
+            # Jobs still running are retried by the next worker once their lease runs out
+            self.stdout.write('Stopping Drive upload worker')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Uploaded {counts[DriveUploadStatus.UPLOADED]} file(s), "
+            f"{counts[DriveUploadStatus.QUEUED]} attempt(s) to retry, "
+            f"{counts[DriveUploadStatus.FAILED]} file(s) failed"
+        ))
+
+    def _report(self, result, counts):
+        job_status, message = result
+        if job_status == DriveUploadStatus.UPLOADED:
+            self.stdout.write(message)
+        elif job_status == DriveUploadStatus.QUEUED:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.ERROR(message))
+        if job_status in counts:
+            counts[job_status] += 1
@@ -0,0 +1,66 @@
+import time
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from evidence.services.outbox import claim_emails, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails in batches over a single connection to the mail server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help=f'Emails claimed and sent per batch (default: {settings.EMAIL_OUTBOX_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking the queue again when it is empty (default: 5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no email is due instead of waiting for new ones'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        sent = retrying = failed = 0
+        # Opened on the first send and kept open while there is mail to send, so each
+        # email doesn't pay for its own connection and TLS handshake
+        connection = get_connection(fail_silently=False)
+
+        self.stdout.write('Email worker started')
+        try:
+            while True:
+                emails = claim_emails(batch_size)
+                if not emails:
+                    # Mail servers drop idle connections; reconnect when mail arrives
+                    connection.close()
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                batch_sent, batch_retrying, batch_failed = send_batch(connection, emails)
+                sent += batch_sent
+                retrying += batch_retrying
+                failed += batch_failed
+                self.stdout.write(f'Sent {batch_sent} of {len(emails)} email(s)')
+                if batch_retrying or batch_failed:
+                    self.stdout.write(self.style.WARNING(
+                        f'{batch_retrying} email(s) to retry, {batch_failed} email(s) failed'
+                    ))
+        except KeyboardInterrupt:
+            # Emails still claimed are sent by the next worker once their lease runs out
+            self.stdout.write('Stopping email worker')
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {sent} email(s), {retrying} attempt(s) to retry, {failed} email(s) failed'
+        ))
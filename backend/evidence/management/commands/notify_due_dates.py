@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from evidence.services.notifications import run_due_date_notifications
+
+
+class Command(BaseCommand):
+    help = 'Create in-app "Due Today" notifications for assignees (runs at most once per day)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run again even if the job already ran today'
+        )
+
+    def handle(self, *args, **options):
+        created = run_due_date_notifications(force=options['force'])
+
+        if created is None:
+            self.stdout.write('Due date notifications already created today (use --force to run again)')
+            return
+
+        for notification in created:
+            self.stdout.write(
+                f"Created due date notification for {notification.category.name} to {notification.user.username}"
+            )
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} due date notification(s)'))
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from evidence.services.notification_retention import run_notification_retention
+
+
+class Command(BaseCommand):
+    help = 'Archive old read notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help=f'Archive read notifications not seen for this many days (default: {settings.NOTIFICATION_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.NOTIFICATION_ARCHIVE_BATCH_SIZE,
+            help=f'Notifications archived per transaction (default: {settings.NOTIFICATION_ARCHIVE_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be archived without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        summary = run_notification_retention(
+            days=options['days'],
+            batch_size=max(options['batch_size'], 1),
+            dry_run=options['dry_run']
+        )
+
+        if summary['dry_run']:
+            self.stdout.write(
+                f"{summary['to_archive']} read notification(s) older than {summary['days']} day(s) would be archived "
+                f"(of {summary['notifications']})"
+            )
+            self.stdout.write(self.style.SUCCESS('Dry run finished, nothing was changed'))
+            return
+
+        self.stdout.write(f"Archived {summary['archived']} read notification(s) older than {summary['days']} day(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['remaining']} notification(s) left, finished in {summary['duration_seconds']}s"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from evidence.services.drive_reconcile import run_drive_reconcile
+
+
+class Command(BaseCommand):
+    help = 'Queue approved files missing from Google Drive and apply changes made on Drive since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Check every approved file, not just those approved since the last run'
+        )
+
+    def handle(self, *args, **options):
+        summary = run_drive_reconcile(full=options['full'])
+
+        if summary['since']:
+            self.stdout.write(f"Checked files approved since {summary['since']}")
+        else:
+            self.stdout.write('Checked all approved files')
+        self.stdout.write(f"Queued {summary['files_queued']} file(s) for upload to Google Drive")
+        self.stdout.write(
+            f"Read {summary['changes_seen']} change(s) from Google Drive: "
+            f"{summary['files_removed']} file(s) removed ({summary['files_requeued']} queued again), "
+            f"{summary['files_moved']} file(s) moved, {summary['folders_removed']} control folder(s) removed"
+        )
+
+        if summary['error']:
+            self.stdout.write(self.style.WARNING(summary['error']))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Drive reconciliation finished in {summary['duration_seconds']}s"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from evidence.models import EvidenceCategory
+from evidence.services.compliance import refresh_compliance_state
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized compliance state for all categories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of categories to refresh per query (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        category_ids = list(EvidenceCategory.objects.values_list('id', flat=True))
+
+        for start in range(0, len(category_ids), batch_size):
+            refresh_compliance_state(category_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed compliance state for {len(category_ids)} categories'))
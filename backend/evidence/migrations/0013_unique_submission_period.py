@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# Most progressed status wins when duplicate periods are merged
+STATUS_RANK = {'APPROVED': 0, 'UNDER_REVIEW': 1, 'SUBMITTED': 2, 'REJECTED': 3, 'PENDING': 4}
+
+
+def merge_duplicate_periods(apps, schema_editor):
+    """
+    Lazy creation while listing categories could create several submissions for the
+    same period. Keep the most progressed one and move files, comments, reminder logs
+    and notifications of the others onto it before the unique constraint is added.
+    """
+    EvidenceSubmission = apps.get_model('evidence', 'EvidenceSubmission')
+    EvidenceFile = apps.get_model('evidence', 'EvidenceFile')
+    SubmissionComment = apps.get_model('evidence', 'SubmissionComment')
+    ReminderLog = apps.get_model('evidence', 'ReminderLog')
+    Notification = apps.get_model('evidence', 'Notification')
+
+    duplicates = EvidenceSubmission.objects.values(
+        'category_id', 'period_start_date'
+    ).annotate(total=Count('id')).filter(total__gt=1)
+
+    for duplicate in duplicates:
+        submissions = sorted(
+            EvidenceSubmission.objects.filter(
+                category_id=duplicate['category_id'],
+                period_start_date=duplicate['period_start_date']
+            ),
+            key=lambda submission: (STATUS_RANK.get(submission.status, len(STATUS_RANK)), submission.id)
+        )
+        keep, others = submissions[0], [submission.id for submission in submissions[1:]]
+        for model in (EvidenceFile, SubmissionComment, ReminderLog, Notification):
+            model.objects.filter(submission_id__in=others).update(submission_id=keep.id)
+        EvidenceSubmission.objects.filter(id__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0012_add_file_submission_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_periods, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='evidencesubmission',
+            constraint=models.UniqueConstraint(fields=('category', 'period_start_date'), name='unique_submission_period'),
+        ),
+    ]
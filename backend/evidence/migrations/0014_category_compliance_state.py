@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0013_unique_submission_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryComplianceState',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='compliance_state', serialize=False, to='evidence.evidencecategory')),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(blank=True, choices=[('PENDING', 'Pending Submission'), ('SUBMITTED', 'Submitted'), ('UNDER_REVIEW', 'Under Review'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('has_files', models.BooleanField(default=False)),
+                ('score', models.FloatField(default=0)),
+                ('oldest_pending_due_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('current_submission', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='evidence.evidencesubmission')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['score'], name='evidence_ca_score_70aec9_idx'), models.Index(fields=['oldest_pending_due_date'], name='evidence_ca_oldest__adc380_idx')],
+            },
+        ),
+    ]
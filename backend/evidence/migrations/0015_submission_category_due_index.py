@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0014_category_compliance_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evidencesubmission',
+            index=models.Index(fields=['category', '-due_date'], name='submission_category_due_idx'),
+        ),
+    ]
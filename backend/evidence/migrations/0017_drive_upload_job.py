@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_uploaded_files(apps, schema_editor):
+    """Files uploaded before the queue existed already have a Drive id"""
+    EvidenceFile = apps.get_model('evidence', 'EvidenceFile')
+    EvidenceFile.objects.filter(google_drive_file_id__isnull=False).exclude(
+        google_drive_file_id=''
+    ).update(drive_upload_status='UPLOADED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0016_job_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evidencefile',
+            name='drive_upload_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='evidencefile',
+            name='drive_upload_status',
+            field=models.CharField(blank=True, choices=[('QUEUED', 'Queued'), ('UPLOADING', 'Uploading'), ('UPLOADED', 'Uploaded'), ('FAILED', 'Failed')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='DriveUploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('UPLOADING', 'Uploading'), ('UPLOADED', 'Uploaded'), ('FAILED', 'Failed')], default='QUEUED', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('evidence_file', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='drive_upload_job', to='evidence.evidencefile')),
+            ],
+            options={
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='evidence_dr_status_f4ad38_idx')],
+            },
+        ),
+        migrations.RunPython(mark_uploaded_files, migrations.RunPython.noop),
+    ]
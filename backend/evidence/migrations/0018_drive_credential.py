@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:04
+
+import django.db.models.deletion
+import evidence.fields
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def import_session_tokens(apps, schema_editor):
+    """Keep Drive working after the upgrade: copy Google tokens of active sessions into DriveCredential"""
+    from django.contrib.sessions.backends.db import SessionStore
+    Session = apps.get_model('sessions', 'Session')
+    DriveCredential = apps.get_model('evidence', 'DriveCredential')
+
+    store = SessionStore()
+    for session in Session.objects.filter(expire_date__gte=timezone.now()).order_by('expire_date'):
+        session_data = store.decode(session.session_data)
+        user_id = session_data.get('_auth_user_id')
+        if not user_id or not session_data.get('google_access_token'):
+            continue
+        # Later sessions overwrite earlier ones, except that a refresh token is never dropped
+        defaults = {'access_token': session_data['google_access_token']}
+        if session_data.get('google_refresh_token'):
+            defaults['refresh_token'] = session_data['google_refresh_token']
+        DriveCredential.objects.update_or_create(user_id=user_id, defaults=defaults)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0017_drive_upload_job'),
+        ('sessions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriveCredential',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('access_token', evidence.fields.EncryptedTextField()),
+                ('refresh_token', evidence.fields.EncryptedTextField(blank=True, null=True)),
+                ('token_expiry', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='drive_credential', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-updated_at'], name='evidence_dr_updated_5cc822_idx')],
+            },
+        ),
+        migrations.RunPython(import_session_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:24
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min, Q
+
+
+def set_last_seen(apps, schema_editor):
+    """Existing notifications were last seen when they were created"""
+    Notification = apps.get_model('evidence', 'Notification')
+    Notification.objects.update(last_seen_at=F('created_at'))
+
+
+def remove_duplicate_notifications(apps, schema_editor):
+    """
+    Uploads and repeated generation could notify a user about the same submission more
+    than once. Keep the newest notification of each kind per user and submission (unread
+    if any of them was) before the unique constraint is added.
+
+    Repeated OVERDUE notifications are the days a submission was seen overdue, so the one
+    kept counts them all, from the first one's creation to the last one's.
+    """
+    Notification = apps.get_model('evidence', 'Notification')
+
+    duplicates = Notification.objects.filter(
+        notification_type__in=['DUE_SOON', 'OVERDUE', 'PENDING_APPROVAL'],
+        submission__isnull=False
+    ).values(
+        'user_id', 'notification_type', 'category_id', 'submission_id'
+    ).annotate(
+        total=Count('id'),
+        keep_id=Max('id'),
+        unread=Count('id', filter=Q(is_read=False)),
+        first_created_at=Min('created_at'),
+        last_created_at=Max('created_at')
+    ).filter(total__gt=1)
+
+    for duplicate in duplicates:
+        Notification.objects.filter(
+            user_id=duplicate['user_id'],
+            notification_type=duplicate['notification_type'],
+            category_id=duplicate['category_id'],
+            submission_id=duplicate['submission_id']
+        ).exclude(id=duplicate['keep_id']).delete()
+        kept = {'is_read': not duplicate['unread']}
+        if duplicate['notification_type'] == 'OVERDUE':
+            kept.update(
+                occurrence_count=duplicate['total'],
+                created_at=duplicate['first_created_at'],
+                last_seen_at=duplicate['last_created_at']
+            )
+        Notification.objects.filter(id=duplicate['keep_id']).update(**kept)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0021_outbound_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='last_seen_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='occurrence_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(set_last_seen, migrations.RunPython.noop),
+        migrations.RunPython(remove_duplicate_notifications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('notification_type__in', ['DUE_SOON', 'OVERDUE', 'PENDING_APPROVAL']), ('submission__isnull', False)), fields=('user', 'notification_type', 'category', 'submission'), name='unique_submission_notification'),
+        ),
+    ]
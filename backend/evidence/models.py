@@ -1,7 +1,10 @@
+import os
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
+from .fields import EncryptedTextField
 
 
 class ReviewPeriod(models.TextChoices):
@@ -124,13 +127,21 @@ class EvidenceCategory(models.Model):
         if not current_submission:
             return 0
         
+        return self.score_submission(current_submission.status, current_submission.files.exists())
+    
+    @staticmethod
+    def score_submission(submission_status, has_files):
+        """
+        Score a single submission: 100% if approved with evidence files,
+        50% if evidence is submitted and awaiting review, 0% otherwise.
+        """
         # Check if current submission is approved and has evidence files
-        if current_submission.status == EvidenceStatus.APPROVED and current_submission.files.exists():
+        if submission_status == EvidenceStatus.APPROVED and has_files:
             return 100.0
         
         # If submission has files but not yet approved, give partial credit
-        if current_submission.files.exists():
-            if current_submission.status == EvidenceStatus.SUBMITTED or current_submission.status == EvidenceStatus.UNDER_REVIEW:
+        if has_files:
+            if submission_status == EvidenceStatus.SUBMITTED or submission_status == EvidenceStatus.UNDER_REVIEW:
                 return 50.0  # Partial credit for submitted evidence
         
         return 0.0
@@ -188,6 +199,21 @@ class EvidenceSubmission(models.Model):
     
     class Meta:
         ordering = ['-due_date']
+        constraints = [
+            # One submission per review period - keeps period rollover idempotent
+            models.UniqueConstraint(fields=['category', 'period_start_date'], name='unique_submission_period'),
+        ]
+        indexes = [
+            # Latest submission per category without a sort (groups, compliance state)
+            models.Index(fields=['category', '-due_date'], name='submission_category_due_idx'),
+        ]
+
+
+class DriveUploadStatus(models.TextChoices):
+    QUEUED = 'QUEUED', 'Queued'
+    UPLOADING = 'UPLOADING', 'Uploading'
+    UPLOADED = 'UPLOADED', 'Uploaded'
+    FAILED = 'FAILED', 'Failed'
 
 
 def evidence_file_upload_path(instance, filename):
@@ -195,10 +221,37 @@ def evidence_file_upload_path(instance, filename):
     # Format: evidence_files/{category_id}/{submission_id}/{filename}
     return f'evidence_files/{instance.submission.category.id}/{instance.submission.id}/{filename}'
 
+
+def evidence_blob_upload_path(instance, filename):
+    """Generate content-addressed upload path for evidence blobs"""
+    # Format: evidence_files/blobs/{first 2 hash characters}/{sha256}{extension}
+    _, ext = os.path.splitext(filename)
+    return f'evidence_files/blobs/{instance.sha256[:2]}/{instance.sha256}{ext.lower()}'
+
+
+class EvidenceBlob(models.Model):
+    """
+    Stored content of evidence files, kept once per distinct SHA-256 however many
+    EvidenceFile rows share it (e.g. the same policy uploaded every month).
+    
+    ref_count is the number of EvidenceFile rows using the blob; the blob and its stored
+    file are deleted when the last of them is (see services.blob_store).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=evidence_blob_upload_path, max_length=255)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.sha256
+
 class EvidenceFile(models.Model):
     submission = models.ForeignKey(EvidenceSubmission, on_delete=models.CASCADE, related_name='files')
     filename = models.CharField(max_length=255)
     file = models.FileField(upload_to=evidence_file_upload_path, blank=True, null=True)
+    # Content of the file; `file` then points at the blob's stored file. Null for files stored before blobs
+    blob = models.ForeignKey(EvidenceBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='evidence_files')
     # Keep Google Drive fields for backward compatibility (can be removed later)
     google_drive_file_id = models.CharField(max_length=255, blank=True, null=True)
     google_drive_file_url = models.URLField(blank=True, null=True)
@@ -211,6 +264,9 @@ class EvidenceFile(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     review_notes = models.TextField(blank=True)
     submission_notes = models.TextField(blank=True, help_text='Notes provided when this file was submitted')
+    # Progress of the background upload to Google Drive (see DriveUploadJob); blank if never queued
+    drive_upload_status = models.CharField(max_length=20, choices=DriveUploadStatus.choices, blank=True)
+    drive_upload_error = models.TextField(blank=True)
     
     def __str__(self):
         return self.filename
@@ -226,6 +282,71 @@ class EvidenceFile(models.Model):
         ordering = ['-uploaded_at']
 
 
+class EvidenceUpload(models.Model):
+    """
+    Evidence file being uploaded in parts before it is committed to a submission
+    (see services.direct_uploads).
+    
+    The id is the upload's token. Bytes received so far are in EVIDENCE_UPLOAD_TEMP_DIR/<id>.part
+    and `offset` counts them, so an interrupted upload carries on from there.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    submission = models.ForeignKey(EvidenceSubmission, on_delete=models.CASCADE, related_name='uploads')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='evidence_uploads')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Unfinished uploads are discarded after this (pushed back by each part received)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size} bytes)"
+
+
+class CategoryComplianceState(models.Model):
+    """
+    Denormalized compliance state for a category (control), kept up to date by
+    services.compliance.refresh_compliance_state whenever its submissions or files change.
+    
+    Due-date dependent values (score reset, overdue) are derived at read time from the
+    stored dates, so the row never goes stale just because a day has passed.
+    """
+    category = models.OneToOneField(EvidenceCategory, on_delete=models.CASCADE, primary_key=True, related_name='compliance_state')
+    # Latest active (PENDING/SUBMITTED/UNDER_REVIEW) submission and its due date
+    current_submission = models.ForeignKey(EvidenceSubmission, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    due_date = models.DateField(null=True, blank=True)
+    # Status and file presence of the latest non-rejected submission the score is based on
+    status = models.CharField(max_length=20, choices=EvidenceStatus.choices, blank=True)
+    has_files = models.BooleanField(default=False)
+    score = models.FloatField(default=0)
+    # Earliest due date among PENDING submissions - overdue once it is in the past
+    oldest_pending_due_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def compliance_score(self, today=None):
+        """Score with the reset applied: 0 once the current submission is past its due date"""
+        today = today or timezone.now().date()
+        if self.due_date and self.due_date < today:
+            return 0
+        return self.score
+    
+    def is_overdue(self, today=None):
+        today = today or timezone.now().date()
+        return self.oldest_pending_due_date is not None and self.oldest_pending_due_date < today
+    
+    def __str__(self):
+        return f"Compliance state for {self.category.name}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['score']),
+            models.Index(fields=['oldest_pending_due_date']),
+        ]
+
+
 class SubmissionComment(models.Model):
     submission = models.ForeignKey(EvidenceSubmission, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -253,6 +374,10 @@ class ReminderLog(models.Model):
         ordering = ['-sent_at']
 
 
+# Notification types describing where a submission stands: at most one per user and submission
+SUBMISSION_STATE_NOTIFICATIONS = ['DUE_SOON', 'OVERDUE', 'PENDING_APPROVAL']
+
+
 class Notification(models.Model):
     """Notifications for users about due dates and approvals"""
     NOTIFICATION_TYPES = [
@@ -272,18 +397,58 @@ class Notification(models.Model):
     submission = models.ForeignKey(EvidenceSubmission, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # A notification that recurs (e.g. a submission still overdue the next day) is counted
+    # on the existing row instead of being added again
+    occurrence_count = models.PositiveIntegerField(default=1)
+    last_seen_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['created_at']),
+            # Old read notifications due for archiving
+            models.Index(fields=['is_read', 'last_seen_at']),
+        ]
+        constraints = [
+            # Keeps bulk generation idempotent (bulk_create with ignore_conflicts)
+            models.UniqueConstraint(
+                fields=['user', 'notification_type', 'category', 'submission'],
+                condition=models.Q(notification_type__in=SUBMISSION_STATE_NOTIFICATIONS, submission__isnull=False),
+                name='unique_submission_notification'
+            ),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
 
+class NotificationArchive(models.Model):
+    """
+    Read notifications moved out of the Notification table once older than
+    NOTIFICATION_RETENTION_DAYS (see `manage.py prune_notifications`), so the table the
+    app queries stays small while history is kept.
+    """
+    # id the notification had in the Notification table
+    notification_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    category = models.ForeignKey(EvidenceCategory, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    submission = models.ForeignKey(EvidenceSubmission, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    occurrence_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.title} - {self.user.username} (archived)"
+
+
 class GoogleDriveFolderMapping(models.Model):
     """Store Google Drive folder IDs for category group structure"""
     # Root folder
@@ -307,3 +472,127 @@ class GoogleDriveFolderMapping(models.Model):
     
     def __str__(self):
         return f"Google Drive Folder Structure - {self.updated_at}"
+
+
+class DriveCredential(models.Model):
+    """
+    Google OAuth tokens of a user who connected Google Drive, encrypted at rest.
+    
+    Background work (e.g. the Drive upload worker) uses these instead of reading tokens
+    out of other users' sessions. Refreshed and rotated tokens are written back here.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='drive_credential')
+    access_token = EncryptedTextField()
+    refresh_token = EncryptedTextField(null=True, blank=True)
+    token_expiry = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"Google Drive credential - {self.user.username}"
+
+
+class JobRun(models.Model):
+    """Last run of a scheduled background job, used to keep daily jobs to one run per day"""
+    name = models.CharField(max_length=100, unique=True)
+    last_run_date = models.DateField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True)  # Summary of the last run
+    
+    def __str__(self):
+        return f"{self.name} - {self.last_run_at}"
+    
+    @classmethod
+    def claim_daily(cls, name, today=None):
+        """
+        Mark the job as run for today. Returns False if it already ran today.
+        
+        The check and the update are a single UPDATE, so concurrent runners can't both claim the day.
+        Claim inside the same transaction as the job's work, so a run that fails releases the day.
+        """
+        today = today or timezone.now().date()
+        cls.objects.get_or_create(name=name)
+        claimed = cls.objects.filter(name=name).exclude(last_run_date=today).update(
+            last_run_date=today,
+            last_run_at=timezone.now()
+        )
+        return claimed == 1
+    
+    @classmethod
+    def record(cls, name, **details):
+        """Store the summary of the latest run"""
+        cls.objects.update_or_create(
+            name=name,
+            defaults={'last_run_at': timezone.now(), 'details': details}
+        )
+
+
+class DriveUploadJob(models.Model):
+    """
+    Pending upload of an evidence file to Google Drive, processed by `manage.py drive_worker`.
+    
+    One job per file, so queueing the same file twice is a no-op. Failed attempts are
+    retried with exponential backoff until DRIVE_UPLOAD_MAX_ATTEMPTS is reached.
+    """
+    evidence_file = models.OneToOneField(EvidenceFile, on_delete=models.CASCADE, related_name='drive_upload_job')
+    status = models.CharField(max_length=20, choices=DriveUploadStatus.choices, default=DriveUploadStatus.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # A worker holds the job until this time; after it, the job is retried (e.g. the worker died)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"Drive upload of file {self.evidence_file_id} - {self.status}"
+
+
+class OutboundEmailStatus(models.TextChoices):
+    QUEUED = 'QUEUED', 'Queued'
+    SENDING = 'SENDING', 'Sending'
+    SENT = 'SENT', 'Sent'
+    FAILED = 'FAILED', 'Failed'
+
+
+class OutboundEmail(models.Model):
+    """
+    Email waiting to be sent by `manage.py email_worker`, so requests never wait on the mail server.
+    
+    Failed sends are retried with exponential backoff; after EMAIL_OUTBOX_MAX_ATTEMPTS (or a
+    failure retrying can't fix, such as every recipient being refused) the email is left as
+    Failed with its last error for someone to look at.
+    """
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=OutboundEmailStatus.choices, default=OutboundEmailStatus.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # A worker holds the email until this time; after it, the email is retried (e.g. the worker died)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} - {self.status}"
@@ -4,6 +4,7 @@ from .models import (
     EvidenceCategory, EvidenceSubmission, EvidenceFile,
     SubmissionComment, ReminderLog, Notification
 )
+from .services.submission_loader import SubmissionLoader
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -24,7 +25,8 @@ class EvidenceFileSerializer(serializers.ModelSerializer):
         model = EvidenceFile
         fields = ['id', 'filename', 'file', 'file_url', 'google_drive_file_id', 'google_drive_file_url',
                   'file_size', 'mime_type', 'uploaded_by', 'uploaded_at', 'category_name', 'submission_id',
-                  'status', 'reviewed_by', 'reviewed_at', 'review_notes', 'submission_notes']
+                  'status', 'reviewed_by', 'reviewed_at', 'review_notes', 'submission_notes',
+                  'drive_upload_status', 'drive_upload_error']
     
     def get_file_url(self, obj):
         """Return the file URL (local file if available, otherwise Google Drive URL)"""
@@ -69,6 +71,15 @@ class EvidenceSubmissionSerializer(serializers.ModelSerializer):
                   'is_overdue', 'days_until_due', 'created_at', 'updated_at']
 
 
+class EvidenceCategoryListSerializer(serializers.ListSerializer):
+    """Load submissions for the whole page in one batch before serializing each category"""
+    
+    def to_representation(self, data):
+        categories = list(data.all() if hasattr(data, 'all') else data)
+        self.context['submission_loader'] = SubmissionLoader(categories)
+        return super().to_representation(categories)
+
+
 class EvidenceCategorySerializer(serializers.ModelSerializer):
     assigned_reviewers = UserSerializer(many=True, read_only=True)
     primary_assignee = UserSerializer(read_only=True)
@@ -99,66 +110,24 @@ class EvidenceCategorySerializer(serializers.ModelSerializer):
                   'category_group', 'google_drive_folder_id', 'assigned_reviewers', 'primary_assignee', 
                   'assignee', 'assignee_id', 'approver', 'approver_id', 'created_by', 'created_at', 'updated_at', 'is_active', 
                   'current_submission', 'past_submissions', 'compliance_score']
+        list_serializer_class = EvidenceCategoryListSerializer
+    
+    def get_submission_loader(self, obj):
+        """Return the batch loader covering this category, loading it on its own if needed"""
+        loader = self.context.get('submission_loader')
+        if loader is None or not loader.covers(obj):
+            loader = SubmissionLoader([obj])
+            self.context['submission_loader'] = loader
+        return loader
     
     def get_current_submission(self, obj):
         """Get the current/active submission with files filtered to include status 'PENDING', 'SUBMITTED', or 'UNDER_REVIEW'."""
         try:
-            from .models import EvidenceStatus, EvidenceSubmission
-            from django.utils import timezone
-            from datetime import timedelta
-            
-            # Get the active submission (PENDING, SUBMITTED, or UNDER_REVIEW)
-            submission = obj.submissions.filter(
-                status__in=[EvidenceStatus.PENDING, EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]
-            ).order_by('-due_date').first()
+            from .models import EvidenceStatus
             
-            # If no active submission exists, create one
-            if not submission:
-                today = timezone.now().date()
-                
-                # Check if there's a latest submission to determine the next period
-                latest = obj.submissions.order_by('-period_end_date').first()
-                
-                if not latest or latest.period_end_date < today:
-                    # No submissions exist, or latest period has ended - create new submission
-                    if not latest:
-                        # First submission for this category
-                        start_date = today
-                    else:
-                        # Latest period ended, start new period
-                        start_date = latest.period_end_date + timedelta(days=1)
-                    
-                    due_date_obj = obj.calculate_next_due_date(start_date)
-                    due_date = due_date_obj.date() if hasattr(due_date_obj, 'date') else due_date_obj
-                    
-                    submission = EvidenceSubmission.objects.create(
-                        category=obj,
-                        period_start_date=start_date,
-                        period_end_date=due_date - timedelta(days=1),
-                        due_date=due_date,
-                        status=EvidenceStatus.PENDING
-                    )
-                else:
-                    # Latest submission period hasn't ended, but it's APPROVED/REJECTED
-                    # Create a new PENDING submission for the current period starting today
-                    start_date = today
-                    # Use the latest submission's due_date if it's in the future, otherwise calculate new one
-                    if latest.due_date > today:
-                        due_date = latest.due_date
-                        period_end_date = latest.period_end_date
-                    else:
-                        due_date_obj = obj.calculate_next_due_date(start_date)
-                        due_date = due_date_obj.date() if hasattr(due_date_obj, 'date') else due_date_obj
-                        period_end_date = due_date - timedelta(days=1)
-                    
-                    submission = EvidenceSubmission.objects.create(
-                        category=obj,
-                        period_start_date=start_date,
-                        period_end_date=period_end_date,
-                        due_date=due_date,
-                        status=EvidenceStatus.PENDING
-                    )
-       
+            # Get the active submission (PENDING, SUBMITTED, or UNDER_REVIEW).
+            # New periods are opened by services.period_roll, never while serializing.
+            submission = self.get_submission_loader(obj).get_current_submission(obj)
             if not submission:
                 return None
             
@@ -188,23 +157,15 @@ class EvidenceCategorySerializer(serializers.ModelSerializer):
     
     def get_compliance_score(self, obj):
         """Calculate and return compliance score for this category"""
-        # Check if score should be reset
-        if obj.should_reset_compliance_score():
-            return 0
-        
-        return obj.calculate_compliance_score()
+        return self.get_submission_loader(obj).get_compliance_score(obj)
     
     def get_past_submissions(self, obj):
         """Get submissions with files filtered to only include status 'APPROVED' or 'REJECTED'"""
         try:
-            from django.db.models import Q
             from .models import EvidenceStatus
             
             # Get submissions that have files with status APPROVED or REJECTED
-            submissions = obj.submissions.filter(
-                Q(status__in=[EvidenceStatus.APPROVED, EvidenceStatus.REJECTED]) |
-                Q(files__status__in=[EvidenceStatus.APPROVED, EvidenceStatus.REJECTED])
-            ).distinct().order_by('-due_date')[:10]
+            submissions = self.get_submission_loader(obj).get_past_submissions(obj)
             
             # Serialize each submission and filter files
             result = []
@@ -263,7 +224,8 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'notification_type', 'title', 'message', 'category', 'category_name', 
-                  'category_id', 'submission', 'submission_id', 'is_read', 'created_at']
+                  'category_id', 'submission', 'submission_id', 'is_read', 'created_at',
+                  'occurrence_count', 'last_seen_at']
 
 
 class CategoryGroupAnalyticsSerializer(serializers.Serializer):
@@ -299,6 +261,18 @@ class UpcomingDeadlineSerializer(serializers.Serializer):
     status = serializers.CharField()
 
 
+class ApproverStatsSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    username = serializers.CharField()
+    name = serializers.CharField()
+    approved_count = serializers.IntegerField()
+    rejected_count = serializers.IntegerField()
+    average_approval_time_hours = serializers.FloatField(allow_null=True)
+    approval_time_p50_hours = serializers.FloatField(allow_null=True)
+    approval_time_p90_hours = serializers.FloatField(allow_null=True)
+    rejection_rate = serializers.FloatField()
+
+
 class AnalyticsSerializer(serializers.Serializer):
     # Action Required
     overdue_count = serializers.IntegerField()
@@ -324,7 +298,10 @@ class AnalyticsSerializer(serializers.Serializer):
     
     # Workflow Efficiency
     average_approval_time_hours = serializers.FloatField(allow_null=True)
+    approval_time_p50_hours = serializers.FloatField(allow_null=True)
+    approval_time_p90_hours = serializers.FloatField(allow_null=True)
     rejection_rate = serializers.FloatField()
+    approver_stats = ApproverStatsSerializer(many=True)
     submission_trends = serializers.ListField()
     bottleneck_approvers = serializers.ListField()
     
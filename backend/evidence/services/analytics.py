@@ -0,0 +1,391 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import (
+    Avg, Count, DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+)
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from evidence.models import EvidenceCategory, EvidenceSubmission, EvidenceStatus, CategoryGroup
+from evidence.aggregates import PercentileCont
+from evidence.services.compliance import ensure_compliance_states
+
+
+# Number of calendar months (including the current one) in submission trends
+TREND_MONTHS = 6
+
+PENDING_APPROVAL_STATUSES = [EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]
+REVIEWED_STATUSES = [EvidenceStatus.APPROVED, EvidenceStatus.REJECTED]
+
+
+def _display_name(user):
+    """Full name if set, otherwise username (None when there is no user)"""
+    if not user:
+        return None
+    if user.first_name or user.last_name:
+        return f"{user.first_name} {user.last_name}".strip()
+    return user.username
+
+
+def _stored_score(category):
+    """Base compliance score from the state row loaded with select_related('compliance_state')"""
+    state = getattr(category, 'compliance_state', None)
+    return state.score if state else 0
+
+
+def _month_starts(start_of_month, months):
+    """First day of the last `months` calendar months, oldest first"""
+    starts = [start_of_month]
+    for _ in range(months - 1):
+        starts.append((starts[-1] - timedelta(days=1)).replace(day=1))
+    return list(reversed(starts))
+
+
+def _hours(duration):
+    """Duration in hours rounded to 1 decimal, None when there is nothing to report"""
+    return round(duration.total_seconds() / 3600, 1) if duration else None
+
+
+def _rate(part, whole):
+    return round(part / whole * 100, 1) if whole else 0
+
+
+def approval_stats(percentiles=False):
+    """
+    Approval time and rejection statistics, overall and per approver.
+
+    Approval time (reviewed_at - submitted_at of approved submissions) is averaged
+    in the database with one query grouped by reviewer; the overall figures are
+    combined from those groups, so the cost does not grow with history. Percentiles
+    cannot be combined that way and take one extra aggregate query.
+
+    Args:
+        percentiles: Also compute p50/p90 approval times
+
+    Returns:
+        Dictionary with average_approval_time_hours, approval_time_p50_hours,
+        approval_time_p90_hours, rejection_rate and approvers (list per reviewer)
+    """
+    approval_time = ExpressionWrapper(F('reviewed_at') - F('submitted_at'), output_field=DurationField())
+    timed = Q(status=EvidenceStatus.APPROVED, reviewed_at__isnull=False, submitted_at__isnull=False)
+    aggregates = {
+        'average': Avg(approval_time, filter=timed),
+        'approved_count': Count('id', filter=timed),
+        'reviewed_count': Count('id', filter=Q(reviewed_at__isnull=False)),
+        'rejected_count': Count('id', filter=Q(status=EvidenceStatus.REJECTED)),
+    }
+    if percentiles:
+        aggregates['p50'] = PercentileCont(approval_time, percentile=0.5, filter=timed)
+        aggregates['p90'] = PercentileCont(approval_time, percentile=0.9, filter=timed)
+
+    submissions = EvidenceSubmission.objects.filter(status__in=REVIEWED_STATUSES)
+    rows = list(submissions.order_by().values(
+        'reviewed_by', 'reviewed_by__username', 'reviewed_by__first_name', 'reviewed_by__last_name'
+    ).annotate(**aggregates).order_by('-approved_count', 'reviewed_by__username'))
+
+    approvers = []
+    for row in rows:
+        if row['reviewed_by'] is None:
+            continue
+        name = f"{row['reviewed_by__first_name']} {row['reviewed_by__last_name']}".strip()
+        approvers.append({
+            'user_id': row['reviewed_by'],
+            'username': row['reviewed_by__username'],
+            'name': name or row['reviewed_by__username'],
+            'approved_count': row['approved_count'],
+            'rejected_count': row['rejected_count'],
+            'average_approval_time_hours': _hours(row['average']),
+            'approval_time_p50_hours': _hours(row.get('p50')),
+            'approval_time_p90_hours': _hours(row.get('p90')),
+            'rejection_rate': _rate(row['rejected_count'], row['reviewed_count']),
+        })
+
+    # Overall average weighted by the number of approvals of each reviewer
+    approved_count = sum(row['approved_count'] for row in rows)
+    average = None
+    if approved_count:
+        average = sum(
+            (row['average'] * row['approved_count'] for row in rows if row['average'] is not None),
+            timedelta()
+        ) / approved_count
+
+    overall = {}
+    if percentiles:
+        overall = submissions.aggregate(p50=aggregates['p50'], p90=aggregates['p90'])
+
+    return {
+        'average_approval_time_hours': _hours(average),
+        'approval_time_p50_hours': _hours(overall.get('p50')),
+        'approval_time_p90_hours': _hours(overall.get('p90')),
+        'rejection_rate': _rate(
+            sum(row['rejected_count'] for row in rows),
+            sum(row['reviewed_count'] for row in rows)
+        ),
+        'approvers': approvers,
+    }
+
+
+def build_analytics(user=None, my_assignments_only=False, percentiles=False, today=None):
+    """
+    Build the compliance analytics payload.
+
+    Counts come from conditional aggregates instead of one COUNT per metric:
+    one query over submissions (aging buckets, upcoming windows, approvals),
+    one grouped query over categories (heatmap, gaps, compliance scores from
+    CategoryComplianceState) and one TruncMonth query for the trends. The
+    number of queries does not depend on how many controls or submissions exist.
+
+    Args:
+        user: The requesting user (may be anonymous)
+        my_assignments_only: Limit control/submission metrics to the user's assignments
+        percentiles: Include p50/p90 approval times (overall and per approver)
+        today: Optional date to compute against (defaults to today)
+
+    Returns:
+        Dictionary matching AnalyticsSerializer
+    """
+    today = today or timezone.now().date()
+    start_of_month = today.replace(day=1)
+    six_months_ago = today - timedelta(days=180)
+    authenticated = user is not None and user.is_authenticated
+    scoped = my_assignments_only and authenticated
+
+    active_categories = EvidenceCategory.objects.filter(is_active=True)
+    scope = Q()
+    if scoped:
+        active_categories = active_categories.filter(assignee=user)
+        scope = Q(category__assignee=user)
+
+    # ========== SUBMISSION COUNTS ==========
+    last_month_start = (start_of_month - timedelta(days=32)).replace(day=1)
+    last_month_end = start_of_month - timedelta(days=1)
+    overdue = scope & Q(status=EvidenceStatus.PENDING, due_date__lt=today)
+    upcoming = scope & Q(status=EvidenceStatus.PENDING, due_date__gte=today)
+    approved = Q(status=EvidenceStatus.APPROVED)
+
+    counts = EvidenceSubmission.objects.aggregate(
+        overdue_count=Count('id', filter=overdue),
+        overdue_1_7_days=Count('id', filter=overdue & Q(due_date__gte=today - timedelta(days=7))),
+        overdue_8_30_days=Count('id', filter=overdue & Q(
+            due_date__gte=today - timedelta(days=30),
+            due_date__lt=today - timedelta(days=7)
+        )),
+        overdue_over_30_days=Count('id', filter=overdue & Q(due_date__lt=today - timedelta(days=30))),
+        pending_approvals_count=Count('id', filter=scope & Q(status__in=PENDING_APPROVAL_STATUSES)),
+        due_next_7_days=Count('id', filter=upcoming & Q(due_date__lte=today + timedelta(days=7))),
+        due_next_14_days=Count('id', filter=upcoming & Q(due_date__lte=today + timedelta(days=14))),
+        due_next_30_days=Count('id', filter=upcoming & Q(due_date__lte=today + timedelta(days=30))),
+        last_month_approved=Count('id', filter=approved & Q(
+            reviewed_at__gte=last_month_start,
+            reviewed_at__lte=last_month_end
+        )),
+        this_month_approved=Count('id', filter=approved & Q(reviewed_at__gte=start_of_month)),
+    )
+
+    # Compare approvals with last month
+    last_month_approved = counts['last_month_approved']
+    compliance_trend = 'stable'
+    if last_month_approved > 0:
+        trend_change = ((counts['this_month_approved'] - last_month_approved) / last_month_approved) * 100
+        if trend_change > 5:
+            compliance_trend = 'up'
+        elif trend_change < -5:
+            compliance_trend = 'down'
+
+    # ========== CONTROL COUNTS PER GROUP ==========
+    ensure_compliance_states(active_categories)
+    recently_approved = EvidenceSubmission.objects.filter(
+        category=OuterRef('pk'),
+        status=EvidenceStatus.APPROVED,
+        reviewed_at__gte=six_months_ago
+    )
+    awaiting_submission = EvidenceSubmission.objects.filter(
+        category=OuterRef('pk'),
+        status=EvidenceStatus.PENDING,
+        due_date__gte=today
+    )
+    group_aggregates = {
+        'total': Count('id'),
+        'score_sum': Sum('compliance_state__score'),
+        'overdue': Count('id', filter=Q(compliance_state__oldest_pending_due_date__lt=today)),
+        'compliant': Count('id', filter=Q(compliance_state__score__gte=80)),
+        'at_risk': Count('id', filter=Q(compliance_state__score__gte=50, compliance_state__score__lt=80)),
+        'no_evidence': Count('id', filter=~Q(Exists(recently_approved))),
+        'missing_assignees': Count('id', filter=Q(assignee__isnull=True)),
+        'missing_approvers': Count('id', filter=Q(approver__isnull=True)),
+    }
+    if authenticated:
+        group_aggregates['my_assignments'] = Count(
+            'id', filter=Q(assignee=user) & Q(Exists(awaiting_submission))
+        )
+    rows = {
+        row['category_group']: row
+        for row in active_categories.order_by().values('category_group').annotate(**group_aggregates)
+    }
+
+    def total(key):
+        return sum(row.get(key) or 0 for row in rows.values())
+
+    total_categories = total('total')
+    overall_compliance_score = (total('score_sum') / total_categories * 100) if total_categories > 0 else 0
+
+    # Category group heatmap
+    category_groups = []
+    for group_code, group_label in CategoryGroup.choices:
+        row = rows.get(group_code)
+        if not row:
+            continue
+        score_sum = row['score_sum'] or 0
+        category_groups.append({
+            'group_code': group_code,
+            'group_label': group_label,
+            'total_controls': row['total'],
+            'compliance_score': round(score_sum / row['total'], 1),
+            'overdue_count': row['overdue'],
+            'at_risk_count': row['at_risk'],
+            'compliant_count': row['compliant'],
+            'no_data_count': row['total'] - row['compliant'] - row['at_risk']
+        })
+
+    # ========== WHAT'S DUE NEXT ==========
+    upcoming_deadlines_by_period = defaultdict(int)
+    upcoming_deadlines_list = []
+    upcoming_submissions = EvidenceSubmission.objects.filter(
+        upcoming,
+        due_date__lte=today + timedelta(days=30)
+    ).select_related('category', 'category__assignee').order_by('due_date')[:50]
+
+    for submission in upcoming_submissions:
+        period = submission.category.review_period
+        upcoming_deadlines_by_period[period] += 1
+        upcoming_deadlines_list.append({
+            'control_id': submission.category.id,
+            'control_name': submission.category.name,
+            'due_date': submission.due_date,
+            'days_until_due': (submission.due_date - today).days,
+            'review_period': period,
+            'assignee_name': _display_name(submission.category.assignee),
+            'status': submission.status
+        })
+
+    # ========== WORKFLOW EFFICIENCY ==========
+    approval = approval_stats(percentiles=percentiles)
+
+    # Submission trends (last TREND_MONTHS calendar months)
+    month_starts = _month_starts(start_of_month, TREND_MONTHS)
+    monthly_counts = {
+        month.date(): count
+        for month, count in EvidenceSubmission.objects.filter(
+            submitted_at__date__gte=month_starts[0]
+        ).annotate(
+            month=TruncMonth('submitted_at')
+        ).order_by('month').values('month').annotate(
+            count=Count('id')
+        ).values_list('month', 'count')
+    }
+    submission_trends = [
+        {'month': month_start.strftime('%Y-%m'), 'count': monthly_counts.get(month_start, 0)}
+        for month_start in month_starts
+    ]
+
+    # Bottleneck approvers (approvers with most pending)
+    approver_bottlenecks = EvidenceSubmission.objects.filter(
+        status__in=PENDING_APPROVAL_STATUSES
+    ).values('category__approver__username', 'category__approver__first_name').annotate(
+        pending_count=Count('id')
+    ).order_by('-pending_count')[:5]
+
+    bottleneck_approvers = [
+        {
+            'username': item['category__approver__username'] or 'Unassigned',
+            'name': item['category__approver__first_name'] or 'Unassigned',
+            'pending_count': item['pending_count']
+        }
+        for item in approver_bottlenecks
+    ]
+
+    # ========== RISK & GAP ANALYSIS ==========
+    priority_issues = []
+    issue_categories = active_categories.select_related('assignee', 'compliance_state')
+
+    # Controls with no evidence
+    for category in issue_categories.filter(~Exists(recently_approved))[:10]:
+        priority_issues.append({
+            'control_id': category.id,
+            'control_name': category.name,
+            'status': 'NO_EVIDENCE',
+            'days_overdue': None,
+            'assignee_name': _display_name(category.assignee),
+            'assignee_id': category.assignee.id if category.assignee else None,
+            'issue_type': 'No evidence submitted recently',
+            'compliance_score': _stored_score(category)
+        })
+
+    # Controls without assignees
+    for category in issue_categories.filter(assignee__isnull=True)[:5]:
+        priority_issues.append({
+            'control_id': category.id,
+            'control_name': category.name,
+            'status': 'NO_ASSIGNEE',
+            'days_overdue': None,
+            'assignee_name': None,
+            'assignee_id': None,
+            'issue_type': 'No assignee assigned',
+            'compliance_score': _stored_score(category)
+        })
+
+    # Overdue controls, with the due date of their oldest overdue submission
+    oldest_overdue = EvidenceSubmission.objects.filter(
+        category=OuterRef('pk'),
+        status=EvidenceStatus.PENDING,
+        due_date__lt=today
+    ).order_by('due_date')
+    overdue_categories = issue_categories.annotate(
+        oldest_overdue_due_date=Subquery(oldest_overdue.values('due_date')[:1])
+    ).filter(oldest_overdue_due_date__isnull=False)[:10]
+
+    for category in overdue_categories:
+        days_overdue = (today - category.oldest_overdue_due_date).days
+        priority_issues.append({
+            'control_id': category.id,
+            'control_name': category.name,
+            'status': 'OVERDUE',
+            'days_overdue': days_overdue,
+            'assignee_name': _display_name(category.assignee),
+            'assignee_id': category.assignee.id if category.assignee else None,
+            'issue_type': f'Overdue by {days_overdue} days',
+            'compliance_score': _stored_score(category)
+        })
+
+    for priority, issue in enumerate(priority_issues, start=1):
+        issue['priority'] = priority
+
+    return {
+        'overdue_count': counts['overdue_count'],
+        'overdue_aging': {
+            '1_7_days': counts['overdue_1_7_days'],
+            '8_30_days': counts['overdue_8_30_days'],
+            'over_30_days': counts['overdue_over_30_days']
+        },
+        'my_assignments_count': total('my_assignments'),
+        'pending_approvals_count': counts['pending_approvals_count'],
+        'no_evidence_count': total('no_evidence'),
+        'missing_assignees_count': total('missing_assignees'),
+        'missing_approvers_count': total('missing_approvers'),
+        'overall_compliance_score': round(overall_compliance_score, 1),
+        'compliance_trend': compliance_trend,
+        'category_groups': category_groups,
+        'at_risk_controls_count': total('at_risk'),
+        'due_next_7_days': counts['due_next_7_days'],
+        'due_next_14_days': counts['due_next_14_days'],
+        'due_next_30_days': counts['due_next_30_days'],
+        'upcoming_deadlines_by_period': dict(upcoming_deadlines_by_period),
+        'upcoming_deadlines': upcoming_deadlines_list,
+        'average_approval_time_hours': approval['average_approval_time_hours'],
+        'approval_time_p50_hours': approval['approval_time_p50_hours'],
+        'approval_time_p90_hours': approval['approval_time_p90_hours'],
+        'rejection_rate': approval['rejection_rate'],
+        'approver_stats': approval['approvers'],
+        'submission_trends': submission_trends,
+        'bottleneck_approvers': bottleneck_approvers,
+        'priority_issues': priority_issues[:10]
+    }
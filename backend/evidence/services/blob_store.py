@@ -0,0 +1,71 @@
+import hashlib
+from django.db import IntegrityError, transaction
+from django.db.models import F, ProtectedError
+from evidence.models import EvidenceBlob, EvidenceFile
+
+
+def hash_file(uploaded_file):
+    """SHA-256 (hex) of an uploaded file, read a chunk at a time; the file is rewound afterwards"""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def store_blob(uploaded_file, sha256=None):
+    """
+    Blob holding the content of an uploaded file, stored only if no blob has that content yet.
+
+    Args:
+        uploaded_file: Django File / UploadedFile
+        sha256: Hash of the content if already known (computed otherwise)
+
+    Returns:
+        EvidenceBlob. Its reference is counted when an EvidenceFile using it is created.
+    """
+    sha256 = sha256 or hash_file(uploaded_file)
+    blob = EvidenceBlob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        if not blob.file.storage.exists(blob.file.name):
+            # The stored copy was removed (e.g. by remove_local_documents) - put the content back.
+            # It may land under another name (e.g. a different extension), so the files using
+            # the blob are pointed at it too.
+            blob.file.save(uploaded_file.name, uploaded_file, save=False)
+            with transaction.atomic():
+                EvidenceBlob.objects.filter(id=blob.id).update(file=blob.file.name)
+                EvidenceFile.objects.filter(blob=blob).exclude(file=blob.file.name).update(file=blob.file.name)
+        return blob
+
+    blob = EvidenceBlob(sha256=sha256, size=uploaded_file.size)
+    blob.file.save(uploaded_file.name, uploaded_file, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # The same content was stored concurrently; keep that blob and drop our copy
+        blob.file.storage.delete(blob.file.name)
+        blob = EvidenceBlob.objects.get(sha256=sha256)
+    return blob
+
+
+def add_blob_reference(blob_id):
+    EvidenceBlob.objects.filter(id=blob_id).update(ref_count=F('ref_count') + 1)
+
+
+def release_blob_reference(blob_id):
+    """Drop one reference to a blob, deleting the blob and its stored file with the last one"""
+    EvidenceBlob.objects.filter(id=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    blob = EvidenceBlob.objects.filter(id=blob_id, ref_count=0).first()
+    if blob is None:
+        return
+
+    try:
+        with transaction.atomic():
+            blob.delete()
+    except ProtectedError:
+        # Still used by a file whose reference hasn't been counted yet
+        return
+    # Only once the deletion is committed, so a rollback doesn't leave a blob without content
+    storage, name = blob.file.storage, blob.file.name
+    transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,126 @@
+import threading
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from evidence.models import (
+    EvidenceCategory, EvidenceSubmission, EvidenceFile, EvidenceStatus,
+    CategoryComplianceState
+)
+from evidence.services.submission_loader import ACTIVE_STATUSES, SCORED_STATUSES
+
+
+STATE_FIELDS = ['current_submission', 'due_date', 'status', 'has_files', 'score', 'oldest_pending_due_date']
+
+# Categories and submissions changed in the current transaction, refreshed together on commit
+_pending = threading.local()
+
+
+def refresh_compliance_state(categories):
+    """
+    Recompute and upsert CategoryComplianceState rows for the given categories.
+
+    Accepts category instances or ids. The current, scored and oldest pending
+    submission of every category are resolved in one annotated query and written
+    back with one bulk upsert, so callers can run this inside the same transaction
+    as the status change that triggered it.
+
+    Returns:
+        Dictionary of category id to its refreshed state
+    """
+    category_ids = {getattr(category, 'id', category) for category in categories}
+    if not category_ids:
+        return {}
+
+    submissions = EvidenceSubmission.objects.filter(category=OuterRef('pk'))
+    current = submissions.filter(status__in=ACTIVE_STATUSES).order_by('-due_date', 'id')
+    scored = submissions.filter(status__in=SCORED_STATUSES).order_by('-due_date', 'id').annotate(
+        has_files=Exists(EvidenceFile.objects.filter(submission=OuterRef('pk')))
+    )
+    pending = submissions.filter(status=EvidenceStatus.PENDING).order_by('due_date')
+
+    rows = EvidenceCategory.objects.filter(id__in=category_ids).annotate(
+        current_id=Subquery(current.values('id')[:1]),
+        current_due_date=Subquery(current.values('due_date')[:1]),
+        scored_status=Subquery(scored.values('status')[:1]),
+        scored_has_files=Subquery(scored.values('has_files')[:1]),
+        oldest_pending_due_date=Subquery(pending.values('due_date')[:1]),
+    ).values(
+        'id', 'current_id', 'current_due_date', 'scored_status', 'scored_has_files', 'oldest_pending_due_date'
+    )
+
+    states = {}
+    for row in rows:
+        has_files = bool(row['scored_has_files'])
+        states[row['id']] = CategoryComplianceState(
+            category_id=row['id'],
+            current_submission_id=row['current_id'],
+            due_date=row['current_due_date'],
+            status=row['scored_status'] or '',
+            has_files=has_files,
+            score=EvidenceCategory.score_submission(row['scored_status'], has_files) if row['scored_status'] else 0,
+            oldest_pending_due_date=row['oldest_pending_due_date'],
+        )
+
+    if states:
+        CategoryComplianceState.objects.bulk_create(
+            list(states.values()),
+            update_conflicts=True,
+            unique_fields=['category'],
+            update_fields=STATE_FIELDS + ['updated_at'],
+        )
+    return states
+
+
+def refresh_compliance_state_on_commit(category_ids=(), submission_ids=()):
+    """
+    Queue a compliance refresh for the given categories (or the categories of the
+    given submissions) to run once the current transaction commits.
+
+    Every change in a transaction shares one refresh, so uploading several files
+    or saving a batch of submissions recomputes each category once.
+    """
+    pending = getattr(_pending, 'changes', None)
+    if pending is None:
+        pending = _pending.changes = {'categories': set(), 'submissions': set()}
+    pending['categories'].update(category_ids)
+    pending['submissions'].update(submission_ids)
+    # Later callbacks in the same transaction find nothing left to do
+    transaction.on_commit(_refresh_pending)
+
+
+def _refresh_pending():
+    pending = getattr(_pending, 'changes', None)
+    _pending.changes = None
+    if not pending:
+        return
+    category_ids = set(pending['categories'])
+    if pending['submissions']:
+        # Submissions removed since (e.g. by a cascade) report their own category
+        category_ids.update(
+            EvidenceSubmission.objects.filter(id__in=pending['submissions']).values_list('category_id', flat=True)
+        )
+    refresh_compliance_state(category_ids)
+
+
+def get_compliance_states(categories):
+    """
+    Return {category id: CategoryComplianceState} for the given categories in one query.
+
+    Categories that have no state row yet (e.g. created before the table existed)
+    are computed and stored on first use.
+    """
+    category_ids = {getattr(category, 'id', category) for category in categories}
+    states = {
+        state.category_id: state
+        for state in CategoryComplianceState.objects.filter(category_id__in=category_ids)
+    }
+    missing = category_ids - set(states)
+    if missing:
+        states.update(refresh_compliance_state(missing))
+    return states
+
+
+def ensure_compliance_states(queryset):
+    """Create state rows for categories in the queryset that don't have one yet"""
+    missing = list(queryset.filter(compliance_state__isnull=True).values_list('id', flat=True))
+    if missing:
+        refresh_compliance_state(missing)
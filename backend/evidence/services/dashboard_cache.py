@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+# Bumped on every relevant model change; part of every snapshot key, so bumping it
+# invalidates all scopes at once without having to know which keys exist
+GENERATION_KEY = 'dashboard:generation'
+HITS_KEY = 'dashboard:hits'
+MISSES_KEY = 'dashboard:misses'
+
+
+def _increment(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key missing or evicted - start counting again
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def get_snapshot(scope, build):
+    """
+    Return the cached snapshot for `scope`, building and storing it on a miss.
+
+    Args:
+        scope: String identifying the payload variant (endpoint, user, filters)
+        build: Callable returning the payload (must be picklable)
+
+    Returns:
+        Tuple of (payload, hit) where hit is True when served from the cache
+    """
+    # Overdue and "this month" figures depend on the date, so snapshots never outlive the day
+    key = f'dashboard:{_generation()}:{timezone.now().date().isoformat()}:{scope}'
+    payload = cache.get(key)
+    if payload is not None:
+        _increment(HITS_KEY)
+        return payload, True
+
+    _increment(MISSES_KEY)
+    payload = build()
+    cache.set(key, payload, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+    return payload, False
+
+
+def invalidate_snapshots():
+    """Drop every cached snapshot (called when submissions, files or categories change)"""
+    _increment(GENERATION_KEY)
+
+
+def snapshot_stats():
+    """Hit/miss counters for the snapshot cache"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total * 100, 1) if total else 0,
+        'generation': cache.get(GENERATION_KEY, 1),
+        'backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'timeout_seconds': settings.DASHBOARD_CACHE_TIMEOUT,
+    }
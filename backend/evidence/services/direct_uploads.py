@@ -0,0 +1,214 @@
+import base64
+import binascii
+import hashlib
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from evidence.models import EvidenceUpload
+from evidence.upload_handlers import SNIFF_BYTES, sniff_content_type
+
+# Bytes read from the request (and the part file) at a time
+UPLOAD_READ_SIZE = 64 * 1024
+
+# Expired uploads removed per purge, so a purge never holds up the request doing it for long
+PURGE_BATCH_SIZE = 100
+
+# Version of the tus resumable upload protocol (https://tus.io) spoken by the upload endpoints
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,termination,expiration'
+
+
+class UploadOffsetError(Exception):
+    """Part that doesn't start where the upload left off"""
+
+    def __init__(self, expected_offset):
+        super().__init__(f'Upload is at byte {expected_offset}')
+        self.expected_offset = expected_offset
+
+
+class UploadedPart(File):
+    """Finished upload's part file, ready for store_blob (which moves it into place)"""
+
+    def __init__(self, file, name, content_type, size, sha256):
+        super().__init__(file, name)
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass
+
+
+def part_path(upload):
+    return os.path.join(settings.EVIDENCE_UPLOAD_TEMP_DIR, f'{upload.id}.part')
+
+
+def discard_part_file(upload):
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def _expiry():
+    return timezone.now() + timedelta(hours=settings.EVIDENCE_UPLOAD_EXPIRY_HOURS)
+
+
+def purge_expired_uploads():
+    """Delete a batch of abandoned uploads (their part files go with them) and return how many"""
+    expired = list(
+        EvidenceUpload.objects.filter(expires_at__lt=timezone.now()).values_list('id', flat=True)[:PURGE_BATCH_SIZE]
+    )
+    for upload in EvidenceUpload.objects.filter(id__in=expired):
+        upload.delete()
+    return len(expired)
+
+
+def create_upload(submission, user, filename, size, content_type=''):
+    """
+    Open an upload slot for a file of `size` bytes; its parts are then sent with append_part.
+
+    Raises:
+        ValueError: Missing filename or a size out of range
+    """
+    if not filename:
+        raise ValueError('filename is required.')
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValueError('size must be the file size in bytes.')
+    if size < 0 or size > settings.EVIDENCE_UPLOAD_MAX_SIZE:
+        raise ValueError(f'size must be between 0 and {settings.EVIDENCE_UPLOAD_MAX_SIZE} bytes.')
+
+    purge_expired_uploads()
+    upload = EvidenceUpload.objects.create(
+        submission=submission,
+        created_by=user,
+        filename=os.path.basename(filename),
+        content_type=content_type or '',
+        size=size,
+        expires_at=_expiry()
+    )
+    os.makedirs(settings.EVIDENCE_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def parse_upload_metadata(header):
+    """
+    Decode a tus Upload-Metadata header ("key base64value,key2 base64value2,flag") into a dict.
+
+    Raises:
+        ValueError: A value isn't valid base64 / UTF-8
+    """
+    metadata = {}
+    for pair in (header or '').split(','):
+        if not pair.strip():
+            continue
+        key, _, value = pair.strip().partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f'Upload-Metadata value for {key} is not valid base64.')
+    return metadata
+
+
+def append_part(upload, stream, offset, length=None):
+    """
+    Write the next part of an upload, read from `stream` a block at a time, at `offset`.
+
+    Bytes received before the client went away are kept, so a retry only has to send the
+    rest. The upload's row is locked (select_for_update) while the part is written, so two
+    requests for the same offset (e.g. a retry racing the original) take turns: the second
+    one finds the upload moved on and is rejected by the offset check before it touches
+    the part file.
+
+    Returns:
+        The upload's new offset
+
+    Raises:
+        UploadOffsetError: `offset` isn't where the upload is
+        ValueError: The part would go past the declared size, or the upload was deleted
+    """
+    error = None
+    with transaction.atomic():
+        current = EvidenceUpload.objects.select_for_update().filter(id=upload.id).values_list('offset', flat=True).first()
+        if current is None:
+            raise ValueError(f'{upload.filename} upload no longer exists.')
+        upload.offset = current
+        if offset != current:
+            raise UploadOffsetError(current)
+        remaining = upload.size - offset
+        if length is None:
+            length = remaining
+        if length > remaining:
+            raise ValueError(f'Part is {length} bytes but only {remaining} byte(s) of the file are left.')
+
+        written = 0
+        try:
+            with open(part_path(upload), 'r+b') as part:
+                part.seek(offset)
+                part.truncate()
+                while written < length:
+                    block = stream.read(min(UPLOAD_READ_SIZE, length - written))
+                    if not block:
+                        break
+                    part.write(block)
+                    written += len(block)
+        except Exception as e:
+            # Record what arrived even if the connection dropped part way; raised once that is saved
+            error = e
+        EvidenceUpload.objects.filter(id=upload.id).update(
+            offset=offset + written,
+            updated_at=timezone.now(),
+            expires_at=_expiry()
+        )
+    upload.offset = offset + written
+    if error is not None:
+        raise error
+    return upload.offset
+
+
+def finish_upload(upload):
+    """
+    Completed upload as an UploadedPart: hashed and type-sniffed in one read of the part file.
+
+    Raises:
+        ValueError: Not all bytes have been received yet, or the part file doesn't hold them
+    """
+    if upload.offset != upload.size:
+        raise ValueError(f'{upload.filename} is incomplete: {upload.offset} of {upload.size} bytes received.')
+
+    try:
+        handle = open(part_path(upload), 'rb')
+    except FileNotFoundError:
+        raise ValueError(f'{upload.filename} has no data on the server, upload it again.')
+    on_disk = os.fstat(handle.fileno()).st_size
+    if on_disk != upload.size:
+        handle.close()
+        raise ValueError(
+            f'{upload.filename} is damaged: {on_disk} of {upload.size} bytes on the server, upload it again.'
+        )
+
+    digest = hashlib.sha256()
+    head = handle.read(SNIFF_BYTES)
+    digest.update(head)
+    for block in iter(lambda: handle.read(UPLOAD_READ_SIZE), b''):
+        digest.update(block)
+    handle.seek(0)
+    return UploadedPart(
+        handle,
+        name=upload.filename,
+        content_type=sniff_content_type(head, upload.filename, upload.content_type),
+        size=upload.size,
+        sha256=digest.hexdigest()
+    )
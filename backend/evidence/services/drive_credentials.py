@@ -0,0 +1,78 @@
+import datetime
+from datetime import timedelta
+from django.db.models import Q
+from django.utils import timezone
+from evidence.models import DriveCredential
+from evidence.services.google_drive import GoogleDriveService
+
+# Lifetime Google gives access tokens, assumed when the expiry isn't reported
+DEFAULT_ACCESS_TOKEN_SECONDS = 3600
+
+
+def store_drive_credential(user, access_token, refresh_token=None, expires_in=None):
+    """
+    Save a user's Google tokens when they sign in with Google.
+
+    Google only sends a refresh token on first consent, so a stored one is kept when
+    none is given. Without expires_in the token is taken to last the usual hour.
+    """
+    defaults = {
+        'access_token': access_token,
+        'token_expiry': timezone.now() + timedelta(seconds=int(expires_in or DEFAULT_ACCESS_TOKEN_SECONDS)),
+    }
+    if refresh_token:
+        defaults['refresh_token'] = refresh_token
+    credential, _ = DriveCredential.objects.update_or_create(user=user, defaults=defaults)
+    return credential
+
+
+def get_drive_credential(user=None):
+    """
+    Stored credential to use for Google Drive, or None.
+
+    The user's own if they have a usable one, otherwise the most recently updated usable
+    one (the Drive folder structure is shared by the whole team). Usable means it can be
+    refreshed or its access token is known not to have expired; an access token with no
+    expiry and nothing to refresh it with is treated as expired. A single indexed lookup,
+    however many people are signed in.
+    """
+    usable = DriveCredential.objects.filter(
+        Q(refresh_token__isnull=False) | Q(token_expiry__gt=timezone.now())
+    )
+    if user is not None and user.is_authenticated:
+        credential = usable.filter(user=user).first()
+        if credential:
+            return credential
+    return usable.order_by('-updated_at').first()
+
+
+def _store_refreshed_tokens(credential_id):
+    """on_refresh callback writing refreshed (and rotated) tokens back to the credential"""
+    def on_refresh(credentials):
+        fields = {
+            'access_token': credentials.token,
+            # google-auth keeps expiry as naive UTC
+            'token_expiry': credentials.expiry.replace(tzinfo=datetime.timezone.utc) if credentials.expiry else None,
+            'updated_at': timezone.now(),
+        }
+        if credentials.refresh_token:
+            fields['refresh_token'] = credentials.refresh_token
+        DriveCredential.objects.filter(id=credential_id).update(**fields)
+    return on_refresh
+
+
+def get_drive_service(user=None):
+    """GoogleDriveService using the stored credential from get_drive_credential, or None if there is none"""
+    credential = get_drive_credential(user)
+    if credential is None:
+        return None
+
+    expiry = None
+    if credential.token_expiry:
+        expiry = credential.token_expiry.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return GoogleDriveService(
+        access_token=credential.access_token,
+        refresh_token=credential.refresh_token,
+        expiry=expiry,
+        on_refresh=_store_refreshed_tokens(credential.id)
+    )
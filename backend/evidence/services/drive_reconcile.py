@@ -0,0 +1,180 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from evidence.models import DriveUploadStatus, EvidenceCategory, EvidenceFile, EvidenceStatus, JobRun
+from evidence.services.drive_credentials import get_drive_service
+from evidence.services.drive_uploads import enqueue_drive_uploads
+
+logger = logging.getLogger(__name__)
+
+DRIVE_RECONCILE_JOB = 'drive_reconcile'
+
+# Each run looks back this far before the previous run's start, so an approval committed
+# while that run was querying isn't missed. Looking at a file twice is harmless.
+HIGH_WATER_MARK_OVERLAP = timedelta(minutes=5)
+
+REMOVED_FROM_DRIVE = 'Removed from Google Drive'
+
+
+def files_needing_upload(since=None):
+    """
+    Approved files with no Drive copy that aren't already waiting in the upload queue.
+
+    With `since`, only files approved after it or belonging to a category changed after
+    it (e.g. one that just got its Drive folder), so a run only looks at what is new.
+    Categories without a Drive folder are left out until a folder sync creates one.
+    """
+    files = EvidenceFile.objects.filter(
+        Q(status=EvidenceStatus.APPROVED) | Q(submission__status=EvidenceStatus.APPROVED),
+        google_drive_file_id__isnull=True
+    ).exclude(
+        submission__category__google_drive_folder_id=''
+    ).exclude(
+        drive_upload_status__in=[DriveUploadStatus.QUEUED, DriveUploadStatus.UPLOADING]
+    )
+    if since is not None:
+        files = files.filter(
+            Q(reviewed_at__gt=since) | Q(submission__reviewed_at__gt=since) |
+            Q(submission__category__updated_at__gt=since)
+        )
+    return files
+
+
+def apply_drive_changes(changes, summary):
+    """
+    Bring local records in line with one page of Drive changes.
+
+    Evidence files deleted or trashed on Drive lose their Drive link and are queued to be
+    uploaded again. A deleted category folder is cleared (with the links of the files in
+    it) so the next folder sync recreates it. Files moved out of their category folder
+    are only reported, since someone moved them on purpose.
+    """
+    # Later changes to the same file supersede earlier ones
+    latest = {change['fileId']: change for change in changes if change.get('fileId')}
+    summary['changes_seen'] += len(changes)
+    if not latest:
+        return
+
+    removed = {
+        file_id for file_id, change in latest.items()
+        if change.get('removed') or (change.get('file') or {}).get('trashed')
+    }
+    now = timezone.now()
+    to_requeue = []
+
+    with transaction.atomic():
+        if removed:
+            categories = list(EvidenceCategory.objects.filter(google_drive_folder_id__in=removed))
+            for category in categories:
+                logger.warning(f'Google Drive folder of {category.name} was removed; it will be recreated by the next folder sync')
+            EvidenceCategory.objects.filter(id__in=[category.id for category in categories]).update(
+                google_drive_folder_id='', updated_at=now
+            )
+            EvidenceFile.objects.filter(
+                submission__category__in=categories,
+                google_drive_file_id__isnull=False
+            ).update(
+                google_drive_file_id=None,
+                google_drive_file_url=None,
+                drive_upload_status='',
+                drive_upload_error=REMOVED_FROM_DRIVE
+            )
+            summary['folders_removed'] += len(categories)
+
+        files = EvidenceFile.objects.filter(
+            google_drive_file_id__in=list(latest)
+        ).select_related('submission__category')
+        moved = []
+        for evidence_file in files:
+            drive_file = latest[evidence_file.google_drive_file_id].get('file') or {}
+            if evidence_file.google_drive_file_id in removed:
+                logger.warning(f'{evidence_file.filename} was removed from Google Drive')
+                evidence_file.google_drive_file_id = None
+                evidence_file.google_drive_file_url = None
+                evidence_file.drive_upload_status = ''
+                evidence_file.drive_upload_error = REMOVED_FROM_DRIVE
+                evidence_file.save(update_fields=[
+                    'google_drive_file_id', 'google_drive_file_url', 'drive_upload_status', 'drive_upload_error'
+                ])
+                summary['files_removed'] += 1
+                approved = EvidenceStatus.APPROVED in (evidence_file.status, evidence_file.submission.status)
+                if approved and evidence_file.submission.category.google_drive_folder_id:
+                    to_requeue.append(evidence_file)
+            elif 'parents' in drive_file and evidence_file.submission.category.google_drive_folder_id not in drive_file['parents']:
+                logger.warning(f'{evidence_file.filename} was moved out of its Google Drive folder')
+                moved.append(evidence_file)
+                summary['files_moved'] += 1
+                if drive_file.get('webViewLink'):
+                    evidence_file.google_drive_file_url = drive_file['webViewLink']
+        EvidenceFile.objects.bulk_update(moved, ['google_drive_file_url'])
+
+        summary['files_requeued'] += enqueue_drive_uploads(to_requeue)
+
+
+def run_drive_reconcile(full=False):
+    """
+    Scheduled entry point: queue approved files missing from Drive and pick up changes made
+    on Drive, processing only what changed since the previous run.
+
+    Progress is kept in the job's JobRun row: the high-water mark of approvals already seen
+    and the Drive Changes API page token to resume from, saved after each page of changes.
+    The first run only records a page token, as changes made before it can't be listed.
+
+    Args:
+        full: Check every approved file, not just those approved since the previous run
+
+    Returns:
+        Summary of the run (also stored on the JobRun row)
+    """
+    started_at = timezone.now()
+    previous = JobRun.objects.filter(name=DRIVE_RECONCILE_JOB).values_list('details', flat=True).first() or {}
+    high_water_mark = None if full else parse_datetime(previous.get('high_water_mark') or '')
+
+    summary = {
+        'full': full,
+        'since': high_water_mark.isoformat() if high_water_mark else None,
+        'files_queued': enqueue_drive_uploads(
+            files_needing_upload(high_water_mark - HIGH_WATER_MARK_OVERLAP if high_water_mark else None)
+        ),
+        'changes_seen': 0,
+        'files_removed': 0,
+        'files_moved': 0,
+        'files_requeued': 0,
+        'folders_removed': 0,
+        'error': '',
+    }
+
+    page_token = previous.get('start_page_token')
+    drive_service = get_drive_service()
+    if drive_service is None:
+        summary['error'] = 'Google Drive not authenticated. Changes made on Google Drive were not checked.'
+    else:
+        try:
+            if page_token is None:
+                page_token = drive_service.get_start_page_token()
+            else:
+                while True:
+                    changes, next_page_token, new_start_page_token = drive_service.list_changes(page_token)
+                    apply_drive_changes(changes, summary)
+                    page_token = next_page_token or new_start_page_token
+                    # Saved per page, so a run that fails or dies later on resumes after the
+                    # pages already applied instead of replaying them
+                    previous['start_page_token'] = page_token
+                    JobRun.objects.filter(name=DRIVE_RECONCILE_JOB).update(details=previous)
+                    if not next_page_token:
+                        break
+        except Exception as e:
+            logger.error(f'Error reading changes from Google Drive: {str(e)}', exc_info=True)
+            summary['error'] = f'Error reading changes from Google Drive: {str(e)}'
+
+    summary['duration_seconds'] = round((timezone.now() - started_at).total_seconds(), 3)
+    JobRun.record(
+        DRIVE_RECONCILE_JOB,
+        high_water_mark=started_at.isoformat(),
+        start_page_token=page_token,
+        **summary
+    )
+    return summary
@@ -0,0 +1,227 @@
+import logging
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from evidence.models import DriveUploadJob, DriveUploadStatus, EvidenceFile
+from evidence.services.drive_credentials import get_drive_service
+
+logger = logging.getLogger(__name__)
+
+# appProperties key each uploaded Drive file is tagged with, so a retry can find the copy
+# left by an attempt that died between the upload and saving its result
+FILE_ID_PROPERTY = 'evidence_file_id'
+
+# appProperties key holding the SHA-256 of the content, so the same content isn't uploaded
+# to a folder twice
+SHA256_PROPERTY = 'sha256'
+
+
+class PermanentUploadError(Exception):
+    """Upload that can't succeed by retrying (e.g. the local file is gone)"""
+
+
+def enqueue_drive_uploads(files):
+    """
+    Queue the given evidence files for upload to Google Drive.
+
+    Files already on Drive are skipped and files already queued keep their job, so calling
+    this again for the same file is harmless. Failed jobs are given a fresh set of attempts.
+    Returns the number of files waiting for upload.
+    """
+    pending = [evidence_file for evidence_file in files if not evidence_file.google_drive_file_id]
+    if not pending:
+        return 0
+
+    file_ids = [evidence_file.id for evidence_file in pending]
+    with transaction.atomic():
+        DriveUploadJob.objects.bulk_create(
+            [DriveUploadJob(evidence_file_id=file_id) for file_id in file_ids],
+            ignore_conflicts=True
+        )
+        DriveUploadJob.objects.filter(
+            evidence_file_id__in=file_ids,
+            status__in=[DriveUploadStatus.FAILED, DriveUploadStatus.UPLOADED]
+        ).update(
+            status=DriveUploadStatus.QUEUED,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            locked_until=None,
+            last_error=''
+        )
+        EvidenceFile.objects.filter(id__in=file_ids).exclude(
+            drive_upload_status=DriveUploadStatus.UPLOADING
+        ).update(drive_upload_status=DriveUploadStatus.QUEUED, drive_upload_error='')
+
+    for evidence_file in pending:
+        if evidence_file.drive_upload_status != DriveUploadStatus.UPLOADING:
+            evidence_file.drive_upload_status = DriveUploadStatus.QUEUED
+            evidence_file.drive_upload_error = ''
+    return len(pending)
+
+
+def _due_jobs(now):
+    """Jobs ready to run: queued ones whose retry time has come, and running ones whose worker went away"""
+    return Q(status=DriveUploadStatus.QUEUED, next_attempt_at__lte=now) | Q(
+        status=DriveUploadStatus.UPLOADING, locked_until__lt=now
+    )
+
+
+def claim_jobs(limit):
+    """
+    Claim up to `limit` due jobs for this worker and return their ids.
+
+    Each claim is a conditional UPDATE, so two workers never run the same job; whoever
+    loses the race simply skips it.
+    """
+    now = timezone.now()
+    candidates = list(
+        DriveUploadJob.objects.filter(_due_jobs(now)).order_by('next_attempt_at').values_list('id', flat=True)[:limit]
+    )
+
+    locked_until = now + timedelta(seconds=settings.DRIVE_UPLOAD_LEASE_SECONDS)
+    claimed = []
+    for job_id in candidates:
+        updated = DriveUploadJob.objects.filter(_due_jobs(now), id=job_id).update(
+            status=DriveUploadStatus.UPLOADING,
+            locked_until=locked_until,
+            attempts=F('attempts') + 1
+        )
+        if updated:
+            claimed.append(job_id)
+
+    if claimed:
+        EvidenceFile.objects.filter(drive_upload_job__id__in=claimed).update(
+            drive_upload_status=DriveUploadStatus.UPLOADING
+        )
+    return claimed
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the given number of failed attempts (doubling, capped, with jitter)"""
+    delay = min(
+        settings.DRIVE_UPLOAD_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.DRIVE_UPLOAD_RETRY_MAX_SECONDS
+    )
+    # Spread retries out so files that failed together don't all hit Drive again at once
+    return delay * random.uniform(0.9, 1.1)
+
+
+def _upload(evidence_file):
+    """Upload one file to its category's Drive folder and return the Drive file_id/web_url"""
+    if evidence_file.google_drive_file_id:
+        return {'file_id': evidence_file.google_drive_file_id, 'web_url': evidence_file.google_drive_file_url}
+
+    folder_id = evidence_file.submission.category.google_drive_folder_id
+    if not folder_id:
+        raise PermanentUploadError('Google Drive folder not configured for this category.')
+    if not evidence_file.file:
+        raise PermanentUploadError(f'Local file not found for {evidence_file.filename}')
+
+    # The same content (e.g. a policy uploaded again for a new period) already in this folder
+    if evidence_file.blob_id:
+        duplicate = EvidenceFile.objects.filter(
+            blob_id=evidence_file.blob_id,
+            submission__category__google_drive_folder_id=folder_id,
+            google_drive_file_id__isnull=False
+        ).exclude(id=evidence_file.id).values('google_drive_file_id', 'google_drive_file_url').first()
+        if duplicate:
+            return {'file_id': duplicate['google_drive_file_id'], 'web_url': duplicate['google_drive_file_url']}
+
+    # Uploads run as whoever approved the file if they connected Drive, else as any connected user
+    drive_service = get_drive_service(evidence_file.reviewed_by)
+    if drive_service is None:
+        raise ValueError('Google Drive not authenticated. Please authenticate Google Drive first.')
+
+    # A previous attempt may have uploaded the file and died before recording it, or the
+    # same content may have been put in the folder by a file whose record has changed since
+    app_properties = {FILE_ID_PROPERTY: str(evidence_file.id)}
+    if evidence_file.blob_id:
+        app_properties[SHA256_PROPERTY] = evidence_file.blob.sha256
+    existing = drive_service.find_file_by_properties(folder_id, app_properties)
+    if existing:
+        return existing
+
+    def log_progress(uploaded, total):
+        if total:
+            logger.info(f'Uploading {evidence_file.filename} to Google Drive: {uploaded * 100 // total}% of {total} bytes')
+
+    # Streamed from storage a chunk at a time - the file is never read into memory whole
+    try:
+        with evidence_file.file.open('rb') as handle:
+            return drive_service.upload_file(
+                file=handle,
+                filename=evidence_file.filename,
+                folder_id=folder_id,
+                mime_type=evidence_file.mime_type,
+                app_properties=app_properties,
+                progress_callback=log_progress
+            )
+    except FileNotFoundError:
+        raise PermanentUploadError(f'Local file not found for {evidence_file.filename}')
+
+
+def run_upload_job(job_id):
+    """
+    Run one claimed job and record the outcome on the job and the file.
+
+    Returns (status, message) where status is the job's new DriveUploadStatus.
+    """
+    job = DriveUploadJob.objects.select_related(
+        'evidence_file__submission__category', 'evidence_file__reviewed_by', 'evidence_file__blob'
+    ).get(id=job_id)
+    evidence_file = job.evidence_file
+
+    try:
+        drive_result = _upload(evidence_file)
+    except Exception as e:
+        return _record_failure(job, e)
+
+    # Updates rather than save() so a review that happened meanwhile isn't overwritten
+    with transaction.atomic():
+        EvidenceFile.objects.filter(id=evidence_file.id).update(
+            google_drive_file_id=drive_result['file_id'],
+            google_drive_file_url=drive_result['web_url'],
+            drive_upload_status=DriveUploadStatus.UPLOADED,
+            drive_upload_error=''
+        )
+        DriveUploadJob.objects.filter(id=job.id).update(
+            status=DriveUploadStatus.UPLOADED,
+            locked_until=None,
+            last_error='',
+            completed_at=timezone.now()
+        )
+    return DriveUploadStatus.UPLOADED, f'Uploaded {evidence_file.filename} to Google Drive'
+
+
+def _record_failure(job, error):
+    """Schedule a retry for a failed attempt, or give up once it can't or shouldn't be retried"""
+    evidence_file = job.evidence_file
+    error_msg = f"Failed to upload {evidence_file.filename} to Google Drive: {str(error)}"
+
+    if isinstance(error, PermanentUploadError) or job.attempts >= settings.DRIVE_UPLOAD_MAX_ATTEMPTS:
+        logger.error(error_msg, exc_info=not isinstance(error, PermanentUploadError))
+        new_status = DriveUploadStatus.FAILED
+        job_fields = {'next_attempt_at': timezone.now()}
+        message = f'{error_msg} (giving up after {job.attempts} attempt(s))'
+    else:
+        delay = retry_delay(job.attempts)
+        logger.warning(f'{error_msg} - retrying in {delay:.0f}s', exc_info=True)
+        new_status = DriveUploadStatus.QUEUED
+        job_fields = {'next_attempt_at': timezone.now() + timedelta(seconds=delay)}
+        message = f'{error_msg} - retrying in {delay:.0f}s'
+
+    with transaction.atomic():
+        EvidenceFile.objects.filter(id=evidence_file.id).update(
+            drive_upload_status=new_status,
+            drive_upload_error=error_msg
+        )
+        DriveUploadJob.objects.filter(id=job.id).update(
+            status=new_status,
+            locked_until=None,
+            last_error=error_msg,
+            **job_fields
+        )
+    return new_status, message
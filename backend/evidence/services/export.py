@@ -0,0 +1,134 @@
+import csv
+import tempfile
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Subquery, Value, When
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from evidence.models import EvidenceCategory, EvidenceSubmission, EvidenceFile, EvidenceStatus, CategoryGroup
+
+
+EXPORT_HEADERS = ['Category Group', 'Control', 'Evidence Status', 'Last Uploaded Date', 'Uploaded By', 'Approved By']
+
+# Write-only sheets need column widths before the first row, so they are fixed up front
+EXPORT_COLUMN_WIDTHS = [30, 50, 16, 21, 20, 20]
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_GROUPS = [(code, label) for code, label in CategoryGroup.choices if code != 'UNCATEGORIZED']
+
+
+def export_queryset(show_hidden=False):
+    """
+    Categories to export, annotated with everything a row needs and ordered by
+    group (in CategoryGroup order) and name, so rows can be streamed in one pass.
+    """
+    queryset = EvidenceCategory.objects.filter(
+        is_active=not show_hidden,
+        category_group__in=[code for code, _ in EXPORT_GROUPS]
+    )
+
+    files = EvidenceFile.objects.filter(submission=OuterRef('pk'))
+
+    # Current submission: latest open or rejected one - evidence counts as uploaded if it has files
+    current = EvidenceSubmission.objects.filter(
+        category=OuterRef('pk'),
+        status__in=[
+            EvidenceStatus.PENDING, EvidenceStatus.SUBMITTED,
+            EvidenceStatus.UNDER_REVIEW, EvidenceStatus.REJECTED
+        ]
+    ).order_by('-due_date', 'id').annotate(has_files=Exists(files))
+
+    # Most recently submitted submission that has files, and its newest file
+    with_files = EvidenceSubmission.objects.filter(
+        category=OuterRef('pk')
+    ).filter(Exists(files)).order_by(F('submitted_at').desc(nulls_last=True), '-due_date', 'id')
+    latest_file = EvidenceFile.objects.filter(
+        submission=OuterRef('latest_submission_id')
+    ).order_by('-uploaded_at', 'id')
+    approved = EvidenceSubmission.objects.filter(
+        id=OuterRef('latest_submission_id'),
+        status=EvidenceStatus.APPROVED
+    )
+
+    group_order = Case(
+        *[When(category_group=code, then=Value(index)) for index, (code, _) in enumerate(EXPORT_GROUPS)],
+        output_field=IntegerField()
+    )
+
+    return queryset.annotate(
+        current_has_files=Subquery(current.values('has_files')[:1]),
+        latest_submission_id=Subquery(with_files.values('id')[:1]),
+    ).annotate(
+        last_uploaded_at=Subquery(latest_file.values('uploaded_at')[:1]),
+        uploaded_by_username=Subquery(latest_file.values('uploaded_by__username')[:1]),
+        approved_by_username=Subquery(approved.values('reviewed_by__username')[:1]),
+    ).order_by(group_order, 'name').values(
+        'name', 'category_group', 'current_has_files', 'last_uploaded_at',
+        'uploaded_by_username', 'approved_by_username'
+    )
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield export rows (lists in EXPORT_HEADERS order) from a server-side cursor"""
+    group_labels = dict(CategoryGroup.choices)
+    for category in queryset.iterator(chunk_size=chunk_size):
+        uploaded_at = category['last_uploaded_at']
+        yield [
+            group_labels[category['category_group']],
+            category['name'],
+            'Uploaded' if category['current_has_files'] else 'Missing',
+            uploaded_at.strftime('%Y-%m-%d %H:%M:%S') if uploaded_at else 'N/A',
+            category['uploaded_by_username'] or 'N/A',
+            category['approved_by_username'] or 'N/A',
+        ]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer into a generator"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """Yield CSV lines (header first) for the given rows"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows):
+    """
+    Write rows into a write-only workbook and return the finished file, rewound.
+
+    Write-only mode streams rows to disk instead of keeping cells in memory, and the
+    finished file is a spooled temporary file, so memory stays flat however many rows
+    there are. The caller streams the file and closes it.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Category Groups Export")
+    for index, width in enumerate(EXPORT_COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header = []
+    for title in EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    for row in rows:
+        ws.append(row)
+
+    output = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    wb.save(output)
+    output.seek(0)
+    return output
@@ -1,50 +1,164 @@
+from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from django.conf import settings
+import hashlib
+import httplib2
 import io
 import json
+import os
+import requests
+import threading
+import time
+
+
+# Credentials per user identity (refresh token, or access token if there is none), shared
+# by every request in the process so a refreshed token is reused instead of refreshed again
+_credentials_cache = {}
+# Keep the cache bounded; it only holds a handful of Google accounts in practice
+MAX_CACHED_CREDENTIALS = 32
+_credentials_lock = threading.Lock()
+# Built API clients per thread (httplib2 connections are not thread-safe), keyed like the credentials
+_thread_clients = threading.local()
+_discovery_document = None
+# Pooled HTTP session used for token refreshes
+_token_session = requests.Session()
+
+# Most calls Drive accepts in one batch request
+DRIVE_BATCH_LIMIT = 100
+# Batched calls failing with these are retried (rate limits and server errors)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _is_retryable(exception):
+    """Rate limit or server error - Drive reports per-user rate limits as 403 with a reason"""
+    if not isinstance(exception, HttpError):
+        return False
+    if exception.resp.status == 403:
+        return b'ratelimitexceeded' in (exception.content or b'').lower()
+    return exception.resp.status in RETRYABLE_STATUSES
+
+
+def _drive_discovery_document():
+    """
+    Drive v3 discovery document, parsed once per process.
+
+    Read from GOOGLE_DRIVE_DISCOVERY_DOCUMENT if set, otherwise from the copy bundled
+    with google-api-python-client - never fetched over the network.
+    """
+    global _discovery_document
+    if _discovery_document is None:
+        path = settings.GOOGLE_DRIVE_DISCOVERY_DOCUMENT
+        if path:
+            with open(path) as document:
+                _discovery_document = json.load(document)
+        else:
+            _discovery_document = json.loads(get_static_doc('drive', 'v3'))
+    return _discovery_document
+
+
+def _credentials_key(access_token, refresh_token):
+    identity = f'refresh:{refresh_token}' if refresh_token else f'access:{access_token}'
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+class _Credentials(Credentials):
+    """Credentials that report each refresh, so new (possibly rotated) tokens can be stored"""
+    on_refresh = None
+    
+    def refresh(self, request):
+        super().refresh(request)
+        if self.on_refresh:
+            self.on_refresh(self)
+
+
+def get_drive_credentials(access_token, refresh_token=None, expiry=None, on_refresh=None):
+    """
+    Cached OAuth credentials for the given tokens, refreshed first if known to be expired.
+    
+    expiry is when access_token expires (naive UTC, as google-auth expects), if known; after
+    the first refresh the credentials always know it, so later calls refresh ahead of time
+    instead of failing a request with 401 first. on_refresh(credentials) is called after
+    every refresh.
+    """
+    key = _credentials_key(access_token, refresh_token)
+    with _credentials_lock:
+        credentials = _credentials_cache.get(key)
+        if credentials is None:
+            if len(_credentials_cache) >= MAX_CACHED_CREDENTIALS:
+                _credentials_cache.clear()
+            credentials = _Credentials(
+                token=access_token,
+                refresh_token=refresh_token,
+                expiry=expiry,
+                client_id=settings.GOOGLE_DRIVE_CLIENT_ID,
+                client_secret=settings.GOOGLE_DRIVE_CLIENT_SECRET,
+                token_uri='https://oauth2.googleapis.com/token'
+            )
+            _credentials_cache[key] = credentials
+        elif credentials.token != access_token and (credentials.expiry is None or (expiry and expiry > credentials.expiry)):
+            # The caller's token is fresher than ours
+            credentials.token = access_token
+            credentials.expiry = expiry
+        if on_refresh:
+            credentials.on_refresh = on_refresh
+        if credentials.expired and credentials.refresh_token:
+            credentials.refresh(Request(_token_session))
+    return key, credentials
+
+
+def _build_service(credentials):
+    """Drive API client on its own (keep-alive) HTTP connection, built from the cached discovery document"""
+    return build_from_document(_drive_discovery_document(), http=AuthorizedHttp(credentials, http=httplib2.Http()))
+
+
+def get_drive_client(access_token, refresh_token=None, expiry=None, on_refresh=None):
+    """Drive API client for the given tokens, reused by later calls on the same thread"""
+    key, credentials = get_drive_credentials(access_token, refresh_token, expiry, on_refresh)
+    clients = getattr(_thread_clients, 'clients', None)
+    if clients is None:
+        clients = _thread_clients.clients = {}
+    cached = clients.get(key)
+    if cached is None or cached[0] is not credentials:
+        cached = clients[key] = (credentials, _build_service(credentials))
+    return cached[1]
 
 
 class GoogleDriveService:
-    def __init__(self, credentials_dict=None, access_token=None, refresh_token=None):
+    def __init__(self, credentials_dict=None, access_token=None, refresh_token=None, expiry=None, on_refresh=None):
         """
         Initialize Google Drive service.
         credentials_dict: Dictionary containing OAuth2 credentials
         access_token: String access token (alternative to credentials_dict)
         refresh_token: String refresh token (optional, for token refresh)
+        expiry: When access_token expires, naive UTC (optional)
+        on_refresh: Called with the credentials after each token refresh (optional)
+        
+        Clients built from tokens are cached per process (see get_drive_client), so
+        creating a service per request is cheap.
         """
         if credentials_dict:
             # If it's just a token, create credentials from it
             if 'token' in credentials_dict and len(credentials_dict) == 1:
-                from google.oauth2.credentials import Credentials
-                credentials = Credentials(token=credentials_dict['token'])
+                access_token = credentials_dict['token']
             else:
-                credentials = Credentials.from_authorized_user_info(credentials_dict)
-            self.service = build('drive', 'v3', credentials=credentials)
-        elif access_token:
-            # Create credentials from access token string
-            from google.oauth2.credentials import Credentials
-            from django.conf import settings
+                access_token = credentials_dict.get('token')
+                refresh_token = credentials_dict.get('refresh_token')
+        
+        if access_token:
             # If refresh_token is provided as parameter, use it
             # Otherwise check if access_token is a dict
             if isinstance(access_token, dict):
                 # If access_token is actually a dict with token and refresh_token
-                actual_refresh_token = access_token.get('refresh_token') or refresh_token
-                actual_access_token = access_token.get('token') or access_token.get('access_token')
-            else:
-                actual_access_token = access_token
-                actual_refresh_token = refresh_token
+                refresh_token = access_token.get('refresh_token') or refresh_token
+                access_token = access_token.get('token') or access_token.get('access_token')
             
-            credentials = Credentials(
-                token=actual_access_token,
-                refresh_token=actual_refresh_token,
-                client_id=settings.GOOGLE_DRIVE_CLIENT_ID,
-                client_secret=settings.GOOGLE_DRIVE_CLIENT_SECRET,
-                token_uri='https://oauth2.googleapis.com/token'
-            )
-            self.service = build('drive', 'v3', credentials=credentials)
+            self.service = get_drive_client(access_token, refresh_token, expiry, on_refresh)
         else:
             self.service = None
     
@@ -66,15 +180,22 @@ class GoogleDriveService:
         flow.redirect_uri = settings.GOOGLE_DRIVE_REDIRECT_URI
         return flow
     
-    def upload_file(self, file_content, filename, folder_id, mime_type='application/octet-stream'):
+    def upload_file(self, file, filename, folder_id, mime_type='application/octet-stream', app_properties=None,
+                    chunk_size=None, progress_callback=None):
         """
         Upload file to specific Google Drive folder
         
+        The file is sent in a resumable session, chunk_size bytes at a time, so only one
+        chunk is in memory however large the file is.
+        
         Args:
-            file_content: Bytes content of the file
+            file: Open binary file object, or a path to the file (bytes are also accepted)
             filename: Name of the file
             folder_id: Google Drive folder ID
             mime_type: MIME type of the file
+            app_properties: Optional private key/value tags stored with the file
+            chunk_size: Bytes per request (default GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE, a multiple of 256 KB)
+            progress_callback: Optional callable(bytes_uploaded, total_bytes) called after each chunk
         
         Returns:
             Dictionary with file_id and web_url
@@ -86,22 +207,34 @@ class GoogleDriveService:
             'name': filename,
             'parents': [folder_id] if folder_id else []
         }
+        if app_properties:
+            file_metadata['appProperties'] = app_properties
         
-        media = MediaIoBaseUpload(
-            io.BytesIO(file_content),
-            mimetype=mime_type,
-            resumable=True
-        )
+        chunk_size = chunk_size or settings.GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE
+        if isinstance(file, (str, os.PathLike)):
+            media = MediaFileUpload(os.fspath(file), mimetype=mime_type, chunksize=chunk_size, resumable=True)
+        else:
+            if isinstance(file, bytes):
+                file = io.BytesIO(file)
+            media = MediaIoBaseUpload(file, mimetype=mime_type, chunksize=chunk_size, resumable=True)
         
-        file = self.service.files().create(
+        request = self.service.files().create(
             body=file_metadata,
             media_body=media,
             fields='id, webViewLink'
-        ).execute()
+        )
+        
+        # Send chunk by chunk; transient errors on a chunk are retried from where the session left off
+        response = None
+        while response is None:
+            upload_status, response = request.next_chunk(num_retries=settings.GOOGLE_DRIVE_UPLOAD_CHUNK_RETRIES)
+            if progress_callback:
+                uploaded = media.size() if response is not None else upload_status.resumable_progress
+                progress_callback(uploaded, media.size())
         
         return {
-            'file_id': file.get('id'),
-            'web_url': file.get('webViewLink')
+            'file_id': response.get('id'),
+            'web_url': response.get('webViewLink')
         }
     
     def create_folder(self, folder_name, parent_folder_id=None):
@@ -118,18 +251,73 @@ class GoogleDriveService:
         if not self.service:
             raise ValueError("Google Drive service not initialized. Please authenticate first.")
         
+        folder = self.service.files().create(
+            body=self._folder_metadata(folder_name, parent_folder_id),
+            fields='id'
+        ).execute()
+        return folder.get('id')
+    
+    def create_folders(self, folders, retries=3):
+        """
+        Create many folders using batch requests (up to DRIVE_BATCH_LIMIT per HTTP call)
+        
+        Args:
+            folders: List of (key, folder_name, parent_folder_id) tuples; key is any hashable
+                used to match results to inputs
+            retries: Rounds of retrying folders that failed with a rate limit or server error
+        
+        Returns:
+            Tuple (created, errors): {key: folder_id} and {key: error message}
+        """
+        if not self.service:
+            raise ValueError("Google Drive service not initialized. Please authenticate first.")
+        
+        created = {}
+        errors = {}
+        pending = list(folders)
+        for attempt in range(retries + 1):
+            failed = []
+            for start in range(0, len(pending), DRIVE_BATCH_LIMIT):
+                chunk = {str(index): folder for index, folder in enumerate(pending[start:start + DRIVE_BATCH_LIMIT])}
+                
+                def on_response(request_id, response, exception, chunk=chunk):
+                    key = chunk[request_id][0]
+                    if exception is None:
+                        created[key] = response.get('id')
+                        errors.pop(key, None)
+                    else:
+                        errors[key] = str(exception)
+                        if _is_retryable(exception):
+                            failed.append(chunk[request_id])
+                
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for request_id, (key, folder_name, parent_folder_id) in chunk.items():
+                    batch.add(
+                        self.service.files().create(
+                            body=self._folder_metadata(folder_name, parent_folder_id),
+                            fields='id'
+                        ),
+                        request_id=request_id
+                    )
+                batch.execute()
+            
+            if not failed or attempt == retries:
+                break
+            # Back off before retrying the folders Drive turned away
+            time.sleep(2 ** attempt)
+            pending = failed
+        
+        return created, errors
+    
+    @staticmethod
+    def _folder_metadata(folder_name, parent_folder_id=None):
         file_metadata = {
             'name': folder_name,
             'mimeType': 'application/vnd.google-apps.folder'
         }
         if parent_folder_id:
             file_metadata['parents'] = [parent_folder_id]
-        
-        folder = self.service.files().create(
-            body=file_metadata,
-            fields='id'
-        ).execute()
-        return folder.get('id')
+        return file_metadata
     
     def list_files(self, folder_id):
         """
@@ -150,3 +338,56 @@ class GoogleDriveService:
         ).execute()
         return results.get('files', [])
 
+    
+    def get_start_page_token(self):
+        """Changes API token marking "now": listing changes from it returns only later changes"""
+        if not self.service:
+            raise ValueError("Google Drive service not initialized. Please authenticate first.")
+        
+        return self.service.changes().getStartPageToken().execute().get('startPageToken')
+    
+    def list_changes(self, page_token, page_size=1000):
+        """
+        One page of changes to files this app can see, starting at page_token
+        
+        Returns:
+            Tuple (changes, next_page_token, new_start_page_token). next_page_token is None on
+            the last page, where new_start_page_token is the token to resume from next time.
+        """
+        if not self.service:
+            raise ValueError("Google Drive service not initialized. Please authenticate first.")
+        
+        results = self.service.changes().list(
+            pageToken=page_token,
+            pageSize=page_size,
+            spaces='drive',
+            includeRemoved=True,
+            fields='nextPageToken, newStartPageToken, changes(fileId, removed, file(id, trashed, parents, webViewLink))'
+        ).execute()
+        return results.get('changes', []), results.get('nextPageToken'), results.get('newStartPageToken')
+    
+    def find_file_by_properties(self, folder_id, properties):
+        """
+        Find a file in a folder tagged with any of the given appProperties key/values
+        
+        Returns:
+            Dictionary with file_id and web_url, or None
+        """
+        if not self.service:
+            raise ValueError("Google Drive service not initialized. Please authenticate first.")
+        
+        tagged = ' or '.join(
+            f"appProperties has {{ key='{key}' and value='{value}' }}" for key, value in properties.items()
+        )
+        results = self.service.files().list(
+            q=f"'{folder_id}' in parents and ({tagged}) and trashed = false",
+            fields="files(id, webViewLink)",
+            pageSize=1
+        ).execute()
+        files = results.get('files', [])
+        if not files:
+            return None
+        return {
+            'file_id': files[0].get('id'),
+            'web_url': files[0].get('webViewLink')
+        }
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from evidence.models import JobRun, Notification, NotificationArchive
+
+NOTIFICATION_RETENTION_JOB = 'notification_retention'
+
+# Fields copied from a notification to its archive row
+ARCHIVED_FIELDS = [
+    'id', 'user_id', 'notification_type', 'title', 'message', 'category_id', 'submission_id',
+    'occurrence_count', 'created_at', 'last_seen_at'
+]
+
+
+def archive_read_notifications(cutoff, batch_size=None):
+    """
+    Move read notifications last seen before `cutoff` to NotificationArchive.
+
+    Works through them a batch at a time, each batch copied and deleted in its own short
+    transaction, so a large backlog never locks the table for long.
+
+    Returns:
+        Number of notifications archived
+    """
+    batch_size = batch_size or settings.NOTIFICATION_ARCHIVE_BATCH_SIZE
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects.select_for_update().filter(
+                    is_read=True, last_seen_at__lt=cutoff
+                ).order_by('id').values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            ids = [row.pop('id') for row in rows]
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(notification_id=notification_id, **row) for notification_id, row in zip(ids, rows)],
+                # Already archived by a run that died before deleting them
+                ignore_conflicts=True
+            )
+            Notification.objects.filter(id__in=ids).delete()
+        archived += len(rows)
+    return archived
+
+
+def run_notification_retention(days=None, batch_size=None, dry_run=False):
+    """
+    Scheduled entry point: archive read notifications not seen for `days` (default
+    NOTIFICATION_RETENTION_DAYS).
+
+    Returns:
+        Summary of the run (also stored on the JobRun row unless it is a dry run)
+    """
+    started = time.monotonic()
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+
+    if dry_run:
+        return {
+            'dry_run': True,
+            'days': days,
+            'to_archive': Notification.objects.filter(is_read=True, last_seen_at__lt=cutoff).count(),
+            'notifications': Notification.objects.count(),
+        }
+
+    summary = {
+        'dry_run': False,
+        'days': days,
+        'archived': archive_read_notifications(cutoff, batch_size),
+        'remaining': Notification.objects.count(),
+    }
+    summary['duration_seconds'] = round(time.monotonic() - started, 3)
+    JobRun.record(NOTIFICATION_RETENTION_JOB, cutoff=cutoff.isoformat(), **summary)
+    return summary
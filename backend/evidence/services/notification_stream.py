@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from evidence.models import Notification
+from evidence.services.notifications import notification_version, unread_state
+
+
+# How often an open stream looks at the user's change marker in the cache
+POLL_SECONDS = 1
+# Re-check the database (and send a keep-alive) at least this often, for changes made
+# by other processes that the local cache marker can't see
+RECHECK_SECONDS = 15
+# Close the stream after this long; EventSource reconnects and resumes from Last-Event-ID
+MAX_STREAM_SECONDS = 300
+# Client reconnect delay sent with the stream
+RETRY_MILLISECONDS = 5000
+# Most notifications sent in one batch
+BATCH_SIZE = 50
+
+
+def _event(event, data, event_id=None):
+    """Format one Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class NotificationStream:
+    """
+    Server-Sent Events for one user's notifications.
+
+    Sends a `notification` event per new Notification row (with its id, so a reconnecting
+    client resumes via Last-Event-ID), a `notification` event without an id for a row
+    already sent that recurred (a recurring notification is updated in place, see
+    create_missing_notifications) and an `unread_count` event whenever the count changes. The database is only queried when the user's change marker in the cache
+    moves (set by model signals and bulk writers) or every RECHECK_SECONDS.
+    """
+
+    def __init__(self, user_id, last_id=None):
+        self.user_id = user_id
+        self.last_id = last_id
+        self.unread_count = None
+        self.version = None
+        self.checked_at = None
+        # Rows last seen after this are sent again
+        self.seen_since = timezone.now()
+
+    def poll(self, force=False):
+        """Return the events for anything that changed since the last poll"""
+        now = time.monotonic()
+        version = notification_version(self.user_id)
+        if not force and version == self.version and now - self.checked_at < RECHECK_SECONDS:
+            return []
+        self.version = version
+        self.checked_at = now
+
+        from evidence.serializers import NotificationSerializer
+
+        events = []
+        seen_since, self.seen_since = self.seen_since, timezone.now()
+        state = unread_state(self.user_id)
+        if self.last_id is None:
+            # Fresh connection: the client loads the current list itself, only stream what's new
+            self.last_id = state['latest_id'] or 0
+        sent_id = self.last_id
+
+        new_notifications = Notification.objects.filter(
+            user_id=self.user_id,
+            id__gt=self.last_id
+        ).select_related('category', 'submission').order_by('id')[:BATCH_SIZE]
+        for notification in new_notifications:
+            events.append(_event('notification', NotificationSerializer(notification).data, notification.id))
+            self.last_id = notification.id
+        if len(events) == BATCH_SIZE:
+            # More may be waiting - check again on the next poll
+            self.checked_at = now - RECHECK_SECONDS
+
+        # Sent again without an event id, so Last-Event-ID keeps pointing at the newest row
+        recurred = Notification.objects.filter(
+            user_id=self.user_id,
+            id__lte=sent_id,
+            last_seen_at__gt=seen_since
+        ).select_related('category', 'submission').order_by('last_seen_at')[:BATCH_SIZE]
+        for notification in recurred:
+            events.append(_event('notification', NotificationSerializer(notification).data))
+
+        if state['unread_count'] != self.unread_count:
+            self.unread_count = state['unread_count']
+            events.append(_event('unread_count', {'unread_count': self.unread_count}))
+
+        if not events:
+            events.append(': keep-alive\n\n')
+        return events
+
+    async def async_events(self):
+        """Async generator for ASGI servers (no thread is held between polls)"""
+        started = time.monotonic()
+        poll = sync_to_async(self.poll)
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        for event in await poll(force=True):
+            yield event
+        while time.monotonic() - started < MAX_STREAM_SECONDS:
+            await asyncio.sleep(POLL_SECONDS)
+            for event in await poll():
+                yield event
@@ -0,0 +1,250 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+from evidence.models import EvidenceSubmission, EvidenceStatus, Notification, JobRun
+
+# Submission statuses still waiting on the assignee or the approver
+OPEN_STATUSES = [EvidenceStatus.PENDING, EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]
+
+# Notification types that keep applying day after day (a submission stays overdue); they
+# are counted on one row per submission rather than added again each day
+RECURRING_NOTIFICATIONS = ['OVERDUE']
+
+
+DUE_DATE_NOTIFICATIONS_JOB = 'due_date_notifications'
+
+
+def _version_key(user_id):
+    return f'notifications:version:{user_id}'
+
+
+def notification_version(user_id):
+    """Marker that changes whenever the user's notifications change (None if never touched)"""
+    return cache.get(_version_key(user_id))
+
+
+def touch_notifications(user_ids):
+    """Signal open notification streams of these users that something changed"""
+    version = time.time_ns()
+    cache.set_many({_version_key(user_id): version for user_id in set(user_ids)}, timeout=None)
+
+
+def unread_state(user_id):
+    """Unread count and newest notification id of a user, in one query"""
+    return Notification.objects.filter(user_id=user_id).aggregate(
+        unread_count=Count('id', filter=Q(is_read=False)),
+        latest_id=Max('id')
+    )
+
+
+def _notification_key(notification):
+    return (notification.user_id, notification.notification_type, notification.category_id, notification.submission_id)
+
+
+def _insert_notifications(notifications):
+    """
+    bulk_create the given notifications, dropping any the unique_submission_notification
+    constraint rejects (a concurrent run inserted them first), and return the ones that
+    were actually inserted.
+
+    With ignore_conflicts the database doesn't report which rows it skipped, so they are
+    read back by their key and the created_at each was given here (one query).
+    """
+    if not notifications:
+        return []
+    Notification.objects.bulk_create(notifications, ignore_conflicts=True)
+    ours = {(_notification_key(notification), notification.created_at) for notification in notifications}
+    inserted = Notification.objects.filter(
+        user_id__in={notification.user_id for notification in notifications},
+        notification_type__in={notification.notification_type for notification in notifications},
+        created_at__in={notification.created_at for notification in notifications}
+    ).select_related('user', 'category')
+    return [
+        notification for notification in inserted.order_by('id')
+        if (_notification_key(notification), notification.created_at) in ours
+    ]
+
+
+def create_missing_notifications(notifications, today=None):
+    """
+    Insert the given (unsaved) notifications that don't exist yet.
+
+    Existing ones are found with one query on their (user, type, category, submission) and
+    the rest are inserted with one bulk_create (see _insert_notifications), so calling this
+    again with the same notifications creates nothing.
+
+    An existing notification of a RECURRING_NOTIFICATIONS type last seen before `today`
+    is counted as seen again (occurrence_count, last_seen_at and the new text) instead,
+    at most once a day, with one bulk_update. It is also marked unread again, so a read
+    alert for a submission that is still overdue comes back the next day.
+
+    Returns:
+        List of notifications that were created
+    """
+    today = today or timezone.now().date()
+    wanted = {}
+    for notification in notifications:
+        wanted.setdefault(_notification_key(notification), notification)
+    if not wanted:
+        return []
+
+    existing = {
+        (user_id, notification_type, category_id, submission_id): (notification_id, last_seen_at)
+        for notification_id, user_id, notification_type, category_id, submission_id, last_seen_at
+        in Notification.objects.filter(
+            user_id__in={key[0] for key in wanted},
+            notification_type__in={key[1] for key in wanted},
+            submission_id__in={key[3] for key in wanted}
+        ).values_list('id', 'user_id', 'notification_type', 'category_id', 'submission_id', 'last_seen_at')
+    }
+    missing = [notification for key, notification in wanted.items() if key not in existing]
+
+    now = timezone.now()
+    recurred = []
+    for key, (notification_id, last_seen_at) in existing.items():
+        notification = wanted.get(key)
+        if (notification is not None and notification.notification_type in RECURRING_NOTIFICATIONS
+                and timezone.localtime(last_seen_at).date() < today):
+            recurred.append(Notification(
+                id=notification_id,
+                user_id=notification.user_id,
+                title=notification.title,
+                message=notification.message,
+                is_read=False,
+                occurrence_count=F('occurrence_count') + 1,
+                last_seen_at=now
+            ))
+
+    created = _insert_notifications(missing)
+    Notification.objects.bulk_update(recurred, ['title', 'message', 'is_read', 'occurrence_count', 'last_seen_at'])
+    # Neither sends post_save signals
+    touch_notifications(notification.user_id for notification in created + recurred)
+    return created
+
+
+def generate_submission_notifications(today=None):
+    """
+    Due soon / overdue notifications for assignees and pending approval notifications for
+    approvers, about the latest open submission of each active category.
+
+    The notifications wanted are worked out in memory from one query and only the missing
+    ones are created (see create_missing_notifications), so this is a few queries however
+    many categories there are.
+
+    Returns:
+        List of created notifications
+    """
+    today = today or timezone.now().date()
+    current_submission = EvidenceSubmission.objects.filter(
+        category=OuterRef('category'),
+        status__in=OPEN_STATUSES
+    ).order_by('-due_date').values('id')[:1]
+    submissions = EvidenceSubmission.objects.filter(
+        category__is_active=True,
+        status__in=OPEN_STATUSES,
+        id=Subquery(current_submission)
+    ).select_related('category')
+
+    notifications = []
+    for submission in submissions:
+        category = submission.category
+        if category.assignee_id:
+            days_until_due = (submission.due_date - today).days
+            if days_until_due < 0:
+                notifications.append(Notification(
+                    user_id=category.assignee_id,
+                    notification_type='OVERDUE',
+                    title=f'Overdue: {category.name}',
+                    message=f'The submission for {category.name} is overdue by {abs(days_until_due)} day(s).',
+                    category=category,
+                    submission=submission
+                ))
+            elif days_until_due <= 3:
+                notifications.append(Notification(
+                    user_id=category.assignee_id,
+                    notification_type='DUE_SOON',
+                    title=f'Due Soon: {category.name}',
+                    message=f'The submission for {category.name} is due in {days_until_due} day(s).',
+                    category=category,
+                    submission=submission
+                ))
+
+        if category.approver_id and submission.status in [EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]:
+            notifications.append(Notification(
+                user_id=category.approver_id,
+                notification_type='PENDING_APPROVAL',
+                title=f'Pending Approval: {category.name}',
+                message=f'Submission for {category.name} is waiting for your approval.',
+                category=category,
+                submission=submission
+            ))
+
+    return create_missing_notifications(notifications, today)
+
+
+def create_due_date_notifications(today=None):
+    """
+    Create "Due Today" notifications for assignees of PENDING submissions due today.
+
+    Submissions whose assignee already has an OVERDUE notification about them are
+    excluded with an anti-join (NOT EXISTS) and the rest are inserted with one
+    bulk_create, so the cost is three queries however many submissions are due.
+
+    Returns:
+        List of created notifications
+    """
+    today = today or timezone.now().date()
+    already_notified = Notification.objects.filter(
+        user=OuterRef('category__assignee'),
+        category=OuterRef('category'),
+        submission=OuterRef('pk'),
+        notification_type='OVERDUE'
+    )
+    submissions = EvidenceSubmission.objects.filter(
+        due_date=today,
+        status=EvidenceStatus.PENDING,
+        category__assignee__isnull=False
+    ).exclude(Exists(already_notified)).select_related('category', 'category__assignee')
+
+    notifications = [
+        Notification(
+            user=submission.category.assignee,
+            notification_type='OVERDUE',
+            title=f'Due Today: {submission.category.name}',
+            message=f'Evidence submission for "{submission.category.name}" is due today. Please submit your evidence files.',
+            category=submission.category,
+            submission=submission,
+            is_read=False
+        )
+        for submission in submissions
+    ]
+    created = _insert_notifications(notifications)
+    # bulk_create sends no post_save signals; wake streams once the rows are visible to them
+    user_ids = [notification.user_id for notification in created]
+    transaction.on_commit(lambda: touch_notifications(user_ids))
+    return created
+
+
+def run_due_date_notifications(today=None, force=False):
+    """
+    Scheduled entry point: create today's due date notifications at most once per day.
+
+    Args:
+        today: Optional date to run for (defaults to today)
+        force: Run even if the job already ran today
+
+    Returns:
+        List of created notifications, or None if the job already ran today
+    """
+    today = today or timezone.now().date()
+    # Claim the day and create in one transaction: if creating fails, the claim is rolled
+    # back with it and the next run retries the day
+    with transaction.atomic():
+        if not JobRun.claim_daily(DUE_DATE_NOTIFICATIONS_JOB, today) and not force:
+            return None
+
+        created = create_due_date_notifications(today)
+        JobRun.record(DUE_DATE_NOTIFICATIONS_JOB, date=today.isoformat(), created=len(created))
+    return created
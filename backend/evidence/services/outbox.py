@@ -0,0 +1,132 @@
+import logging
+import random
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import F, Q
+from django.utils import timezone
+from evidence.models import OutboundEmail, OutboundEmailStatus
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, body, recipients, from_email=None):
+    """
+    Queue an email for the email worker instead of sending it during the request.
+
+    The email is a row written with the caller's transaction, so one queued inside a block
+    that rolls back is never sent. Returns the OutboundEmail, or None if no recipient has an
+    address.
+    """
+    recipients = [address for address in recipients if address]
+    if not recipients:
+        return None
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=recipients
+    )
+
+
+def _due_emails(now):
+    """Emails ready to send: queued ones whose retry time has come, and ones whose worker went away"""
+    return Q(status=OutboundEmailStatus.QUEUED, next_attempt_at__lte=now) | Q(
+        status=OutboundEmailStatus.SENDING, locked_until__lt=now
+    )
+
+
+def claim_emails(limit):
+    """
+    Claim up to `limit` due emails for this worker and return them, oldest first.
+
+    Each claim is a conditional UPDATE, so two workers never send the same email.
+    """
+    now = timezone.now()
+    candidates = list(
+        OutboundEmail.objects.filter(_due_emails(now)).order_by('next_attempt_at').values_list('id', flat=True)[:limit]
+    )
+
+    locked_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    claimed = [
+        email_id for email_id in candidates
+        if OutboundEmail.objects.filter(_due_emails(now), id=email_id).update(
+            status=OutboundEmailStatus.SENDING,
+            locked_until=locked_until,
+            attempts=F('attempts') + 1
+        )
+    ]
+    return list(OutboundEmail.objects.filter(id__in=claimed).order_by('next_attempt_at'))
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the given number of failed attempts (doubling, capped, with jitter)"""
+    delay = min(
+        settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS
+    )
+    return delay * random.uniform(0.9, 1.1)
+
+
+def _is_permanent(error):
+    """Failures that sending again won't fix: the server refused every recipient or the sender"""
+    return isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused))
+
+
+def send_batch(connection, emails):
+    """
+    Send claimed emails over one mail connection (opened if needed) and record each outcome.
+
+    The messages go out one send_messages call at a time on the same connection, so a
+    failure is pinned on the email that caused it and the emails sent before it aren't sent
+    again. After a failure the connection is closed and opened again for the next email, as
+    the server may have dropped it.
+
+    Returns (sent, retrying, failed) counts.
+    """
+    sent = retrying = failed = 0
+    for email in emails:
+        message = EmailMessage(email.subject, email.body, email.from_email, email.to, connection=connection)
+        try:
+            # Does nothing while the connection is open
+            connection.open()
+            connection.send_messages([message])
+        except Exception as e:
+            if _record_failure(email, e) == OutboundEmailStatus.FAILED:
+                failed += 1
+            else:
+                retrying += 1
+            connection.close()
+            continue
+
+        OutboundEmail.objects.filter(id=email.id).update(
+            status=OutboundEmailStatus.SENT,
+            locked_until=None,
+            last_error='',
+            sent_at=timezone.now()
+        )
+        sent += 1
+    return sent, retrying, failed
+
+
+def _record_failure(email, error):
+    """Schedule a retry for a failed send, or give up once it can't or shouldn't be retried"""
+    error_msg = f"Failed to send \"{email.subject}\" to {', '.join(email.to)}: {str(error)}"
+    if _is_permanent(error) or email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        logger.error(f'{error_msg} (giving up after {email.attempts} attempt(s))')
+        new_status = OutboundEmailStatus.FAILED
+        next_attempt_at = timezone.now()
+    else:
+        delay = retry_delay(email.attempts)
+        logger.warning(f'{error_msg} - retrying in {delay:.0f}s')
+        new_status = OutboundEmailStatus.QUEUED
+        next_attempt_at = timezone.now() + timedelta(seconds=delay)
+
+    OutboundEmail.objects.filter(id=email.id).update(
+        status=new_status,
+        locked_until=None,
+        last_error=error_msg,
+        next_attempt_at=next_attempt_at
+    )
+    return new_status
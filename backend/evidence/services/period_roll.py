@@ -0,0 +1,135 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+from evidence.models import EvidenceCategory, EvidenceSubmission, EvidenceStatus
+from evidence.services.submission_loader import ACTIVE_STATUSES
+from evidence.services.compliance import refresh_compliance_state
+from evidence.services.dashboard_cache import invalidate_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def build_next_submission(category, today, latest_period_end=None, latest_due_date=None, has_active=False,
+                          latest_period_start=None):
+    """
+    Build (without saving) the next PENDING submission for a category, or return None
+    when its current review period is still open.
+
+    - No submissions yet: the first period starts today.
+    - Latest period has ended: the period covering today is opened, continuing the
+      category's schedule from the day after it. Periods missed in between (e.g. a control
+      left alone for weeks) are skipped and logged rather than opened, so they don't all
+      turn overdue at once.
+    - Latest period still running but already approved/rejected: a new PENDING submission
+      covers the rest of that period so evidence can be submitted again. It starts today,
+      or the day after the latest period started if that was today (a period can't share
+      its start date with another); if nothing of the period is left, the next one starts.
+    """
+    if latest_period_end is None:
+        start_date = today
+    elif latest_period_end < today:
+        start_date = latest_period_end + timedelta(days=1)
+        skipped = 0
+        due_date = category.calculate_next_due_date(start_date)
+        while due_date - timedelta(days=1) < today:
+            start_date = due_date
+            due_date = category.calculate_next_due_date(start_date)
+            skipped += 1
+        if skipped:
+            logger.info(
+                f'Skipped {skipped} missed review period(s) of {category.name} '
+                f'({latest_period_end + timedelta(days=1)} to {start_date - timedelta(days=1)})'
+            )
+    elif not has_active:
+        start_date = today
+        if latest_period_start is not None and latest_period_start >= today:
+            start_date = latest_period_start + timedelta(days=1)
+        if start_date > latest_period_end:
+            start_date = latest_period_end + timedelta(days=1)
+        elif latest_due_date > today:
+            return EvidenceSubmission(
+                category=category,
+                period_start_date=start_date,
+                period_end_date=latest_period_end,
+                due_date=latest_due_date,
+                status=EvidenceStatus.PENDING
+            )
+    else:
+        return None
+
+    due_date = category.calculate_next_due_date(start_date)
+    return EvidenceSubmission(
+        category=category,
+        period_start_date=start_date,
+        period_end_date=due_date - timedelta(days=1),
+        due_date=due_date,
+        status=EvidenceStatus.PENDING
+    )
+
+
+def roll_periods(categories=None, today=None):
+    """
+    Open the next review period for every active category that needs one.
+
+    Categories are loaded with their latest period and open-submission flag in a
+    single query and the new submissions are written with one bulk_create. At most one
+    period is opened per category, the one covering today, so a second run finds nothing
+    to do. The categories' rows are locked for the run, so concurrent runs (e.g. two reviews of the
+    same control) take turns and the second one sees the periods the first opened.
+
+    Args:
+        categories: Optional iterable of categories to limit the roll to
+        today: Optional date to roll against (defaults to today)
+
+    Returns:
+        List of submissions that were created
+    """
+    if today is None:
+        today = timezone.now().date()
+
+    queryset = EvidenceCategory.objects.filter(is_active=True)
+    if categories is not None:
+        queryset = queryset.filter(id__in=[category.id for category in categories])
+
+    new_submissions = []
+    with transaction.atomic():
+        # Lock first, then read the periods in a separate query so it sees what a run that
+        # held the lock before us committed
+        category_ids = list(queryset.select_for_update().order_by('id').values_list('id', flat=True))
+
+        latest = EvidenceSubmission.objects.filter(
+            category=OuterRef('pk')
+        ).order_by('-period_end_date', '-id')
+        locked = EvidenceCategory.objects.filter(id__in=category_ids).annotate(
+            latest_period_start=Subquery(latest.values('period_start_date')[:1]),
+            latest_period_end=Subquery(latest.values('period_end_date')[:1]),
+            latest_due_date=Subquery(latest.values('due_date')[:1]),
+            has_active=Exists(EvidenceSubmission.objects.filter(
+                category=OuterRef('pk'),
+                status__in=ACTIVE_STATUSES
+            ))
+        ).only('id', 'name', 'review_period')
+
+        for category in locked:
+            submission = build_next_submission(
+                category,
+                today,
+                latest_period_end=category.latest_period_end,
+                latest_due_date=category.latest_due_date,
+                has_active=category.has_active,
+                latest_period_start=category.latest_period_start
+            )
+            if submission:
+                new_submissions.append(submission)
+
+        if new_submissions:
+            # No ignore_conflicts: with the lock held a clash is a bug and must not pass silently
+            EvidenceSubmission.objects.bulk_create(new_submissions)
+            refresh_compliance_state({submission.category_id for submission in new_submissions})
+
+    if new_submissions:
+        # bulk_create sends no post_save signals
+        invalidate_snapshots()
+    return new_submissions
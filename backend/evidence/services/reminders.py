@@ -0,0 +1,231 @@
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef, Prefetch, Q, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils import timezone
+from evidence.models import EvidenceSubmission, EvidenceStatus, ReminderLog
+
+logger = logging.getLogger(__name__)
+
+REMINDER_DUE_SOON = '1_day'
+REMINDER_OVERDUE = 'overdue'
+
+
+def reminders_due(today=None):
+    """
+    Reminders to send today as (submission, reminder_type, recipient) tuples.
+
+    PENDING submissions due tomorrow get a 1-day reminder (once per day) and those due
+    yesterday an overdue reminder (once ever). Submissions already reminded are excluded
+    with NOT EXISTS subqueries on ReminderLog, so this is one query (plus one for the
+    reviewers of categories nobody else can be reminded for) however many submissions
+    there are.
+
+    Returns:
+        (reminders, unassigned): unassigned are submissions with nobody to remind
+    """
+    today = today or timezone.now().date()
+    tomorrow = today + timedelta(days=1)
+    yesterday = today - timedelta(days=1)
+
+    reminded_today = ReminderLog.objects.filter(
+        submission=OuterRef('pk'),
+        reminder_type=REMINDER_DUE_SOON,
+        sent_at__date=today
+    )
+    reminded_overdue = ReminderLog.objects.filter(
+        submission=OuterRef('pk'),
+        reminder_type=REMINDER_OVERDUE
+    )
+    submissions = EvidenceSubmission.objects.filter(
+        Q(due_date=tomorrow) & ~Exists(reminded_today) | Q(due_date=yesterday) & ~Exists(reminded_overdue),
+        status=EvidenceStatus.PENDING
+    ).select_related(
+        'category', 'category__assignee', 'submitted_by'
+    ).order_by('due_date', 'category__name')
+    submissions = list(submissions)
+
+    # Recipient: the assignee, else whoever submitted, else the first assigned reviewer.
+    # Reviewers are only fetched for the categories that fall back to them.
+    prefetch_related_objects(
+        [submission.category for submission in submissions
+         if not submission.category.assignee and not submission.submitted_by],
+        Prefetch('assigned_reviewers', queryset=User.objects.order_by('id'))
+    )
+
+    reminders, unassigned = [], []
+    for submission in submissions:
+        recipient = submission.category.assignee or submission.submitted_by
+        if recipient is None:
+            reviewers = submission.category.assigned_reviewers.all()
+            recipient = reviewers[0] if reviewers else None
+        if recipient is None:
+            unassigned.append(submission)
+            continue
+        reminder_type = REMINDER_OVERDUE if submission.due_date == yesterday else REMINDER_DUE_SOON
+        reminders.append((submission, reminder_type, recipient))
+    return reminders, unassigned
+
+
+def render_reminder(submission, reminder_type, recipient):
+    """Subject and body of the reminder email for one submission"""
+    if reminder_type == REMINDER_OVERDUE:
+        subject = f"OVERDUE: Evidence Submission Required - {submission.category.name}"
+        message = f"""Hello {recipient.first_name or recipient.username},
+
+This is a reminder that your evidence submission for "{submission.category.name}" is now OVERDUE.
+
+Due Date: {submission.due_date} (1 day ago)
+Period: {submission.period_start_date} to {submission.period_end_date}
+
+Evidence Requirements:
+{submission.category.evidence_requirements}
+
+Please submit your evidence immediately.
+
+Best regards,
+ComplianceGrid System
+"""
+    else:
+        subject = f"Evidence Submission Reminder: {submission.category.name}"
+        message = f"""Hello {recipient.first_name or recipient.username},
+
+This is a reminder that your evidence submission for "{submission.category.name}" is due in 1 day.
+
+Due Date: {submission.due_date}
+Period: {submission.period_start_date} to {submission.period_end_date}
+
+Evidence Requirements:
+{submission.category.evidence_requirements}
+
+Please submit your evidence as soon as possible.
+
+Best regards,
+ComplianceGrid System
+"""
+    return subject, message
+
+
+def render_digest(recipient, reminders, today):
+    """
+    Subject and body of one email covering all of a recipient's reminders.
+
+    Args:
+        reminders: (submission, reminder_type) pairs for this recipient
+    """
+    overdue = [submission for submission, reminder_type in reminders if reminder_type == REMINDER_OVERDUE]
+    due_soon = [submission for submission, reminder_type in reminders if reminder_type == REMINDER_DUE_SOON]
+    parts = []
+    if overdue:
+        parts.append(f'{len(overdue)} overdue')
+    if due_soon:
+        parts.append(f'{len(due_soon)} due tomorrow')
+    subject = f"Evidence Submission Reminders: {', '.join(parts)}"
+    message = render_to_string('evidence/emails/reminder_digest.txt', {
+        'recipient': recipient,
+        'overdue': overdue,
+        'overdue_date': today - timedelta(days=1),
+        'due_soon': due_soon,
+        'due_soon_date': today + timedelta(days=1),
+    })
+    return subject, message
+
+
+def send_reminders(today=None, dry_run=False, digest=False):
+    """
+    Send today's reminder emails over a single mail connection and log them with one bulk insert.
+
+    Each message goes out in its own send_messages call on that connection, so a failed
+    email only leaves its own submissions unlogged (the next run tries them again).
+
+    Args:
+        today: Optional date to run for (defaults to today)
+        dry_run: Only work out and render the reminders; nothing is sent or logged
+        digest: Send each recipient one email listing all their reminders instead of one
+            email per submission (someone with a single reminder gets the usual email).
+            ReminderLog rows are still written per submission.
+
+    Returns:
+        Summary with counts, per-step timings (seconds) and any problems found
+    """
+    today = today or timezone.now().date()
+    started = time.monotonic()
+    reminders, unassigned = reminders_due(today)
+    queried = time.monotonic()
+
+    summary = {
+        'dry_run': dry_run,
+        'digest': digest,
+        'due_soon': sum(1 for _, reminder_type, _ in reminders if reminder_type == REMINDER_DUE_SOON),
+        'overdue': sum(1 for _, reminder_type, _ in reminders if reminder_type == REMINDER_OVERDUE),
+        'sent': 0,
+        'emails_sent': 0,
+        'no_recipient': [submission.id for submission in unassigned],
+        'no_email': [],
+        'errors': [],
+    }
+
+    # Reminders per recipient, in the order they were found
+    by_recipient = {}
+    for submission, reminder_type, recipient in reminders:
+        if not recipient.email:
+            summary['no_email'].append((submission.id, recipient.username))
+            continue
+        by_recipient.setdefault(recipient.id, (recipient, []))[1].append((submission, reminder_type))
+
+    # (recipient, subject, message, [(submission, reminder_type)] the email covers)
+    to_send = []
+    for recipient, recipient_reminders in by_recipient.values():
+        if digest and len(recipient_reminders) > 1:
+            subject, message = render_digest(recipient, recipient_reminders, today)
+            to_send.append((recipient, subject, message, recipient_reminders))
+            continue
+        for submission, reminder_type in recipient_reminders:
+            subject, message = render_reminder(submission, reminder_type, recipient)
+            to_send.append((recipient, subject, message, [(submission, reminder_type)]))
+    summary['to_send'] = sum(len(covered) for _, _, _, covered in to_send)
+    summary['emails'] = len(to_send)
+    rendered = time.monotonic()
+
+    logs = []
+    if not dry_run and to_send:
+        connection = get_connection(fail_silently=False)
+        try:
+            for recipient, subject, message, covered in to_send:
+                email = EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [recipient.email], connection=connection)
+                try:
+                    # Does nothing while the connection is open
+                    connection.open()
+                    connection.send_messages([email])
+                except Exception as e:
+                    logger.error(f'Failed to send "{subject}" to {recipient.email}: {str(e)}')
+                    summary['errors'].append(f'"{subject}" to {recipient.email}: {str(e)}')
+                    connection.close()
+                    continue
+                summary['emails_sent'] += 1
+                logs.extend(
+                    ReminderLog(
+                        submission=submission,
+                        reminder_type=reminder_type,
+                        sent_to=recipient,
+                        email_sent=True
+                    )
+                    for submission, reminder_type in covered
+                )
+        finally:
+            connection.close()
+    sent = time.monotonic()
+
+    ReminderLog.objects.bulk_create(logs, batch_size=1000)
+    summary['sent'] = len(logs)
+    summary['timings'] = {
+        'query': round(queried - started, 3),
+        'render': round(rendered - queried, 3),
+        'send': round(sent - rendered, 3),
+        'log': round(time.monotonic() - sent, 3),
+    }
+    return summary
@@ -0,0 +1,104 @@
+from django.db.models import Q, F, Exists, OuterRef, Prefetch, Window, prefetch_related_objects
+from django.db.models.functions import RowNumber
+from evidence.models import (
+    EvidenceSubmission, EvidenceFile, SubmissionComment, EvidenceStatus
+)
+
+
+ACTIVE_STATUSES = [EvidenceStatus.PENDING, EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]
+SCORED_STATUSES = ACTIVE_STATUSES + [EvidenceStatus.APPROVED]
+REVIEWED_STATUSES = [EvidenceStatus.APPROVED, EvidenceStatus.REJECTED]
+
+# Number of past submissions shown per category
+PAST_SUBMISSIONS_LIMIT = 10
+
+
+class SubmissionLoader:
+    """
+    Resolve current and past submissions and compliance state for a batch of categories.
+
+    Everything the category serializer needs is loaded up front in a fixed
+    number of queries (one per submission kind, one each for files and comments,
+    one for compliance state), regardless of how many categories are in the batch.
+    """
+
+    def __init__(self, categories):
+        self.categories = {category.id: category for category in categories}
+        self.current = {}
+        self.past = {}
+        self.compliance_states = {}
+        if self.categories:
+            self._load()
+
+    def covers(self, category):
+        return category.id in self.categories
+
+    def _ranked(self, queryset, limit=1):
+        """Keep the latest `limit` submissions per category (by due date)"""
+        return queryset.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('category_id')],
+                order_by=[F('due_date').desc(), F('id').asc()]
+            )
+        ).filter(row_number__lte=limit).order_by('category_id', 'row_number')
+
+    def _load(self):
+        base = EvidenceSubmission.objects.filter(
+            category_id__in=list(self.categories)
+        ).select_related('submitted_by', 'reviewed_by')
+
+        # Latest active submission per category
+        current = list(self._ranked(base.filter(status__in=ACTIVE_STATUSES)))
+
+        # Up to PAST_SUBMISSIONS_LIMIT reviewed submissions (or submissions with reviewed files) per category
+        reviewed_files = EvidenceFile.objects.filter(
+            submission=OuterRef('pk'),
+            status__in=REVIEWED_STATUSES
+        )
+        past = list(self._ranked(
+            base.filter(Q(status__in=REVIEWED_STATUSES) | Q(Exists(reviewed_files))),
+            limit=PAST_SUBMISSIONS_LIMIT
+        ))
+
+        # Compliance comes from the materialized per-category state rows
+        from evidence.services.compliance import get_compliance_states
+        self.compliance_states = get_compliance_states(self.categories)
+
+        # Share one instance per submission so files/comments are fetched once
+        submissions = {}
+        for submission in current + past:
+            submissions.setdefault(submission.id, submission)
+        current = [submissions[s.id] for s in current]
+        past = [submissions[s.id] for s in past]
+
+        self._prefetch(list(submissions.values()))
+
+        for submission in current:
+            self.current[submission.category_id] = submission
+        for submission in past:
+            self.past.setdefault(submission.category_id, []).append(submission)
+
+    def _prefetch(self, submissions):
+        if not submissions:
+            return
+
+        for submission in submissions:
+            # Reuse the category instances we already hold instead of joining
+            submission.category = self.categories[submission.category_id]
+
+        prefetch_related_objects(
+            submissions,
+            Prefetch('files', queryset=EvidenceFile.objects.select_related('uploaded_by', 'reviewed_by')),
+            Prefetch('comments', queryset=SubmissionComment.objects.select_related('user')),
+        )
+
+    def get_current_submission(self, category):
+        return self.current.get(category.id)
+
+    def get_past_submissions(self, category):
+        return self.past.get(category.id, [])
+
+    def get_compliance_score(self, category):
+        state = self.compliance_states.get(category.id)
+        return state.compliance_score() if state else 0
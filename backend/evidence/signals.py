@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import EvidenceCategory, EvidenceSubmission, EvidenceFile, EvidenceUpload, Notification
+from .services.blob_store import add_blob_reference, release_blob_reference
+from .services.compliance import refresh_compliance_state_on_commit
+from .services.dashboard_cache import invalidate_snapshots
+from .services.direct_uploads import discard_part_file
+from .services.notifications import touch_notifications
+
+
+@receiver([post_save, post_delete], sender=EvidenceSubmission)
+def refresh_submission_compliance(sender, instance, **kwargs):
+    """Keep the category's stored compliance state in step with its submissions"""
+    # Connected before the dashboard invalidation so the refresh lands first on commit
+    refresh_compliance_state_on_commit(category_ids=[instance.category_id])
+
+
+@receiver([post_save, post_delete], sender=EvidenceFile)
+def refresh_file_compliance(sender, instance, **kwargs):
+    """A file added or removed can change whether the scored submission has files"""
+    refresh_compliance_state_on_commit(submission_ids=[instance.submission_id])
+
+
+@receiver([post_save, post_delete], sender=EvidenceSubmission)
+@receiver([post_save, post_delete], sender=EvidenceFile)
+@receiver([post_save, post_delete], sender=EvidenceCategory)
+def invalidate_dashboard_snapshots(sender, **kwargs):
+    """Any change to controls, submissions or files makes cached dashboards stale"""
+    # After commit, so a concurrent request can't re-cache the pre-change state
+    transaction.on_commit(invalidate_snapshots)
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def wake_notification_streams(sender, instance, **kwargs):
+    """Let the user's open notification streams pick up the change"""
+    transaction.on_commit(lambda: touch_notifications([instance.user_id]))
+
+
+@receiver(post_save, sender=EvidenceFile)
+def count_blob_reference(sender, instance, created, **kwargs):
+    """Each evidence file created on a blob holds a reference to it"""
+    if created and instance.blob_id:
+        add_blob_reference(instance.blob_id)
+
+
+@receiver(post_delete, sender=EvidenceFile)
+def release_blob(sender, instance, **kwargs):
+    """Deleting an evidence file releases its blob, which goes with its last reference"""
+    if instance.blob_id:
+        release_blob_reference(instance.blob_id)
+
+
+@receiver(post_delete, sender=EvidenceUpload)
+def remove_upload_part(sender, instance, **kwargs):
+    """A finished or abandoned upload's part file goes with it"""
+    transaction.on_commit(lambda: discard_part_file(instance))
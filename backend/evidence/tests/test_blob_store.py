@@ -0,0 +1,51 @@
+import tempfile
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from evidence.models import EvidenceCategory, EvidenceFile, EvidenceSubmission, ReviewPeriod
+from evidence.services.blob_store import store_blob
+
+
+class RestoreBlobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        today = timezone.now().date()
+        category = EvidenceCategory.objects.create(
+            name='Firewall rules',
+            description='Firewall review',
+            evidence_requirements='Rule export',
+            review_period=ReviewPeriod.MONTHLY
+        )
+        self.submission = EvidenceSubmission.objects.create(
+            category=category,
+            period_start_date=today,
+            period_end_date=today + timedelta(days=29),
+            due_date=today + timedelta(days=30)
+        )
+
+    def test_restored_blob_updates_files_using_it(self):
+        blob = store_blob(ContentFile(b'allow 443', name='rules.txt'))
+        evidence_file = EvidenceFile.objects.create(
+            submission=self.submission,
+            filename='rules.txt',
+            file=blob.file.name,
+            blob=blob,
+            file_size=blob.size,
+            mime_type='text/plain'
+        )
+        # Local copies removed (remove_local_documents), then the same content uploaded again
+        blob.file.storage.delete(blob.file.name)
+        restored = store_blob(ContentFile(b'allow 443', name='rules.csv'))
+
+        self.assertEqual(restored.id, blob.id)
+        self.assertNotEqual(restored.file.name, blob.file.name)
+        evidence_file.refresh_from_db()
+        self.assertEqual(evidence_file.file.name, restored.file.name)
+        with evidence_file.file.open('rb') as handle:
+            self.assertEqual(handle.read(), b'allow 443')
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from evidence.models import (
+    CategoryComplianceState, EvidenceCategory, EvidenceFile, EvidenceStatus, EvidenceSubmission, ReviewPeriod
+)
+
+
+class ComplianceStateSignalTests(TestCase):
+    """Changes made outside the review views (admin, shell, commands) still refresh the stored state"""
+
+    def setUp(self):
+        today = timezone.now().date()
+        self.category = EvidenceCategory.objects.create(
+            name='Backup restore test',
+            description='Quarterly restore test',
+            evidence_requirements='Restore log',
+            review_period=ReviewPeriod.MONTHLY
+        )
+        self.submission = EvidenceSubmission.objects.create(
+            category=self.category,
+            period_start_date=today,
+            period_end_date=today + timedelta(days=29),
+            due_date=today + timedelta(days=30),
+            status=EvidenceStatus.SUBMITTED
+        )
+
+    def state(self):
+        return CategoryComplianceState.objects.get(category=self.category)
+
+    def add_file(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return EvidenceFile.objects.create(
+                submission=self.submission,
+                filename='restore.log',
+                file_size=10,
+                mime_type='text/plain'
+            )
+
+    def test_saving_submission_refreshes_state(self):
+        self.add_file()
+        self.assertEqual(self.state().score, 50.0)
+
+        self.submission.status = EvidenceStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submission.save()
+        state = self.state()
+        self.assertEqual(state.status, EvidenceStatus.APPROVED)
+        self.assertEqual(state.score, 100.0)
+
+    def test_deleting_file_refreshes_state(self):
+        evidence_file = self.add_file()
+        self.assertTrue(self.state().has_files)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            evidence_file.delete()
+        state = self.state()
+        self.assertFalse(state.has_files)
+        self.assertEqual(state.score, 0.0)
+
+    def test_deleting_submission_refreshes_state(self):
+        self.add_file()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.submission.delete()
+        state = self.state()
+        self.assertIsNone(state.current_submission_id)
+        self.assertEqual(state.status, '')
+        self.assertEqual(state.score, 0.0)
+
+    def test_changes_in_one_transaction_share_one_refresh(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for i in range(3):
+                EvidenceFile.objects.create(
+                    submission=self.submission, filename=f'log-{i}.txt', file_size=10, mime_type='text/plain'
+                )
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+        table = CategoryComplianceState._meta.db_table
+        upserts = [query for query in queries if query['sql'].startswith(f'INSERT INTO "{table}"')]
+        self.assertEqual(len(upserts), 1)
+        self.assertTrue(self.state().has_files)
@@ -0,0 +1,65 @@
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from evidence.models import EvidenceCategory, EvidenceSubmission, ReviewPeriod
+from evidence.services.direct_uploads import (
+    UploadOffsetError, append_part, create_upload, finish_upload, part_path
+)
+
+
+class DirectUploadTests(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        settings_override = override_settings(EVIDENCE_UPLOAD_TEMP_DIR=temp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        today = timezone.now().date()
+        user = User.objects.create_user('uploader', 'uploader@example.com', 'pw')
+        category = EvidenceCategory.objects.create(
+            name='Backups',
+            description='Backup restore test',
+            evidence_requirements='Restore log',
+            review_period=ReviewPeriod.MONTHLY
+        )
+        submission = EvidenceSubmission.objects.create(
+            category=category,
+            period_start_date=today,
+            period_end_date=today + timedelta(days=29),
+            due_date=today + timedelta(days=30)
+        )
+        self.upload = create_upload(submission, user, 'restore.log', 10, 'text/plain')
+
+    def test_part_sent_twice_is_rejected(self):
+        append_part(self.upload, BytesIO(b'hello'), 0, 5)
+        with self.assertRaises(UploadOffsetError) as raised:
+            append_part(self.upload, BytesIO(b'HELLO'), 0, 5)
+        self.assertEqual(raised.exception.expected_offset, 5)
+        with open(part_path(self.upload), 'rb') as part:
+            self.assertEqual(part.read(), b'hello')
+
+    def test_stale_upload_object_sees_current_offset(self):
+        stale = type(self.upload).objects.get(id=self.upload.id)
+        append_part(self.upload, BytesIO(b'hello'), 0, 5)
+        with self.assertRaises(UploadOffsetError):
+            append_part(stale, BytesIO(b'HELLO'), 0, 5)
+        self.assertEqual(stale.offset, 5)
+
+    def test_finish_checks_part_file_size(self):
+        append_part(self.upload, BytesIO(b'helloworld'), 0, 10)
+        with open(part_path(self.upload), 'r+b') as part:
+            part.truncate(4)
+        with self.assertRaisesMessage(ValueError, '4 of 10 bytes'):
+            finish_upload(self.upload)
+
+    def test_finish_complete_upload(self):
+        append_part(self.upload, BytesIO(b'hello'), 0, 5)
+        append_part(self.upload, BytesIO(b'world'), 5, 5)
+        part = finish_upload(self.upload)
+        self.addCleanup(part.close)
+        self.assertEqual(part.size, 10)
+        self.assertEqual(part.read(), b'helloworld')
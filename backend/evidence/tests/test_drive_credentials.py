@@ -0,0 +1,27 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from evidence.models import DriveCredential
+from evidence.services.drive_credentials import get_drive_credential, store_drive_credential
+
+
+class DriveCredentialTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('signed-in', 'signed-in@example.com', 'pw')
+
+    def test_access_token_without_expires_in_lasts_an_hour(self):
+        credential = store_drive_credential(self.user, 'access-token')
+        self.assertAlmostEqual(
+            credential.token_expiry, timezone.now() + timedelta(hours=1), delta=timedelta(minutes=1)
+        )
+        self.assertEqual(get_drive_credential(self.user), credential)
+
+    def test_access_token_without_expiry_or_refresh_token_is_not_used(self):
+        DriveCredential.objects.create(user=self.user, access_token='access-token')
+        self.assertIsNone(get_drive_credential(self.user))
+
+    def test_refreshable_credential_is_used_after_expiry(self):
+        credential = store_drive_credential(self.user, 'access-token', 'refresh-token', expires_in=60)
+        DriveCredential.objects.filter(id=credential.id).update(token_expiry=timezone.now() - timedelta(hours=1))
+        self.assertEqual(get_drive_credential(self.user), credential)
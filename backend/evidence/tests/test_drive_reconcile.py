@@ -0,0 +1,27 @@
+from unittest import mock
+from django.test import TestCase
+from evidence.models import JobRun
+from evidence.services.drive_reconcile import DRIVE_RECONCILE_JOB, run_drive_reconcile
+
+
+class DriveReconcileTests(TestCase):
+    def test_page_token_saved_after_each_page(self):
+        JobRun.record(DRIVE_RECONCILE_JOB, start_page_token='page-1')
+        drive_service = mock.Mock()
+        drive_service.list_changes.side_effect = [
+            ([], 'page-2', None),
+            ([], 'page-3', None),
+            RuntimeError('connection reset'),
+        ]
+
+        with mock.patch('evidence.services.drive_reconcile.get_drive_service', return_value=drive_service):
+            summary = run_drive_reconcile()
+        self.assertIn('connection reset', summary['error'])
+        self.assertEqual(JobRun.objects.get(name=DRIVE_RECONCILE_JOB).details['start_page_token'], 'page-3')
+
+        # A run that dies mid-way (no final record) still resumes after the last applied page
+        drive_service.list_changes.side_effect = [([], 'page-4', None), KeyboardInterrupt]
+        with mock.patch('evidence.services.drive_reconcile.get_drive_service', return_value=drive_service):
+            with self.assertRaises(KeyboardInterrupt):
+                run_drive_reconcile()
+        self.assertEqual(JobRun.objects.get(name=DRIVE_RECONCILE_JOB).details['start_page_token'], 'page-4')
@@ -0,0 +1,88 @@
+import json
+from email.parser import Parser
+from unittest import mock
+import httplib2
+from django.test import SimpleTestCase
+from googleapiclient.discovery import build_from_document
+from evidence.services.google_drive import DRIVE_BATCH_LIMIT, GoogleDriveService, _drive_discovery_document
+
+
+class FakeDriveBatchHttp:
+    """
+    Stands in for Drive's batch endpoint: answers each call of a multipart batch request
+    on its own, so some calls can fail while the rest of the batch succeeds.
+
+    Folders named "missing..." fail with a 404 every time and folders named "busy..." are
+    rate limited (429) the first time they are asked for.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.created = []
+        self.rate_limited = set()
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        assert uri.endswith('/batch/drive/v3'), uri
+        content_type = headers['content-type']
+        message = Parser().parsestr(f'content-type: {content_type}\r\n\r\n{body}')
+        parts = message.get_payload()
+        self.batch_sizes.append(len(parts))
+
+        boundary = 'batch_response'
+        response = []
+        for part in parts:
+            # Each part is an HTTP request: request line and headers, a blank line, the JSON body
+            _, _, folder = part.get_payload().partition('\n\n')
+            name = json.loads(folder)['name']
+            if name.startswith('missing'):
+                status, payload = '404 Not Found', {'error': {'code': 404, 'message': 'Parent not found'}}
+            elif name.startswith('busy') and name not in self.rate_limited:
+                self.rate_limited.add(name)
+                status, payload = '429 Too Many Requests', {'error': {'code': 429, 'message': 'Rate limited'}}
+            else:
+                self.created.append(name)
+                status, payload = '200 OK', {'id': f'id-{name}'}
+            response.append(
+                f'--{boundary}\r\nContent-Type: application/http\r\n'
+                f'Content-ID: {part["Content-ID"].replace("<", "<response-", 1)}\r\n\r\n'
+                f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n'
+            )
+        response.append(f'--{boundary}--')
+        return (
+            httplib2.Response({'status': '200', 'content-type': f'multipart/mixed; boundary={boundary}'}),
+            ''.join(response).encode()
+        )
+
+
+class CreateFoldersTests(SimpleTestCase):
+    def setUp(self):
+        self.http = FakeDriveBatchHttp()
+        self.drive = GoogleDriveService()
+        self.drive.service = build_from_document(_drive_discovery_document(), http=self.http)
+        sleep = mock.patch('evidence.services.google_drive.time.sleep')
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_batches_respect_the_size_limit(self):
+        folders = [(index, f'folder {index}', 'parent') for index in range(DRIVE_BATCH_LIMIT * 2 + 5)]
+        created, errors = self.drive.create_folders(folders)
+
+        self.assertEqual(self.http.batch_sizes, [DRIVE_BATCH_LIMIT, DRIVE_BATCH_LIMIT, 5])
+        self.assertEqual(errors, {})
+        self.assertEqual(created, {index: f'id-folder {index}' for index in range(DRIVE_BATCH_LIMIT * 2 + 5)})
+
+    def test_failed_calls_are_reported_per_folder(self):
+        folders = [
+            ('ok', 'policies', 'parent'),
+            ('missing', 'missing parent', 'gone'),
+            ('busy', 'busy folder', 'parent'),
+            ('ok-too', 'logs', 'parent'),
+        ]
+        created, errors = self.drive.create_folders(folders)
+
+        self.assertEqual(created, {'ok': 'id-policies', 'busy': 'id-busy folder', 'ok-too': 'id-logs'})
+        self.assertEqual(list(errors), ['missing'])
+        self.assertIn('Parent not found', errors['missing'])
+        # Only the rate limited folder is retried, in a batch of its own; the 404 is not
+        self.assertEqual(self.http.batch_sizes, [4, 1])
+        self.assertEqual(self.http.created.count('busy folder'), 1)
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from evidence.models import Notification
+from evidence.services.notification_stream import NotificationStream
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class NotificationStreamAvailabilityTests(TestCase):
+    """The stream is only offered under ASGI; WSGI clients are told to poll"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw')
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def test_wsgi_clients_poll(self):
+        response = self.client.get('/api/notifications/unread-count/', {'user_id': self.user.id})
+        self.assertEqual(response.json(), {'unread_count': 0, 'stream': False})
+        response = self.client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_asgi_clients_stream(self):
+        response = await self.async_client.get('/api/notifications/unread-count/', {'user_id': self.user.id})
+        self.assertEqual(response.json(), {'unread_count': 0, 'stream': True})
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=False)
+    async def test_asgi_stream_can_be_turned_off(self):
+        response = await self.async_client.get('/api/notifications/unread-count/', {'user_id': self.user.id})
+        self.assertFalse(response.json()['stream'])
+        response = await self.async_client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 404)
+
+
+class NotificationStreamPollTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw')
+
+    def notification(self, title):
+        return Notification.objects.create(
+            user=self.user, notification_type='OVERDUE', title=title, message=title
+        )
+
+    def test_recurred_notification_is_sent_again(self):
+        read = self.notification('Overdue: Backups')
+        Notification.objects.filter(id=read.id).update(is_read=True)
+        stream = NotificationStream(self.user.id)
+        stream.poll(force=True)
+
+        # Recurs the next day: the same row, unread again with a new text
+        Notification.objects.filter(id=read.id).update(
+            is_read=False, title='Overdue: Backups (2 days)', last_seen_at=timezone.now()
+        )
+        new = self.notification('Overdue: Patching')
+        events = stream.poll(force=True)
+
+        sent = [event for event in events if event.startswith(('id:', 'event: notification'))]
+        self.assertEqual(len(sent), 2)
+        self.assertTrue(sent[0].startswith(f'id: {new.id}\n'))
+        self.assertTrue(sent[1].startswith('event: notification\n'))
+        self.assertIn('Overdue: Backups (2 days)', sent[1])
+        self.assertIn('event: unread_count', events[-1])
+        self.assertEqual(stream.last_id, new.id)
+
+        # Nothing changed since
+        self.assertEqual(stream.poll(force=True), [': keep-alive\n\n'])
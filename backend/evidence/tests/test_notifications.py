@@ -0,0 +1,139 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from evidence.models import EvidenceCategory, EvidenceSubmission, JobRun, Notification, ReviewPeriod
+from evidence.services.notifications import (
+    DUE_DATE_NOTIFICATIONS_JOB, _insert_notifications, create_due_date_notifications,
+    generate_submission_notifications, run_due_date_notifications
+)
+
+
+class RecurringNotificationTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.assignee = User.objects.create_user('assignee', 'assignee@example.com', 'pw')
+        category = EvidenceCategory.objects.create(
+            name='Vulnerability scan',
+            description='Monthly scan',
+            evidence_requirements='Scan report',
+            review_period=ReviewPeriod.MONTHLY,
+            assignee=self.assignee
+        )
+        EvidenceSubmission.objects.create(
+            category=category,
+            period_start_date=self.today - timedelta(days=40),
+            period_end_date=self.today - timedelta(days=11),
+            due_date=self.today - timedelta(days=10)
+        )
+
+    def test_read_overdue_notification_comes_back_the_next_day(self):
+        created = generate_submission_notifications(self.today)
+        self.assertEqual([notification.notification_type for notification in created], ['OVERDUE'])
+        notification = Notification.objects.get(user=self.assignee)
+        Notification.objects.filter(id=notification.id).update(is_read=True)
+
+        # Still overdue the next day: the same row is counted again and unread
+        self.assertEqual(generate_submission_notifications(self.today + timedelta(days=1)), [])
+        notification.refresh_from_db()
+        self.assertFalse(notification.is_read)
+        self.assertEqual(notification.occurrence_count, 2)
+        self.assertEqual(timezone.localtime(notification.last_seen_at).date(), timezone.localdate())
+        self.assertIn('overdue by 11 day(s)', notification.message)
+        self.assertEqual(Notification.objects.filter(user=self.assignee).count(), 1)
+
+    def test_read_notification_stays_read_on_the_same_day(self):
+        generate_submission_notifications(self.today)
+        Notification.objects.filter(user=self.assignee).update(is_read=True)
+
+        generate_submission_notifications(self.today)
+        notification = Notification.objects.get(user=self.assignee)
+        self.assertTrue(notification.is_read)
+        self.assertEqual(notification.occurrence_count, 1)
+
+
+class InsertedNotificationTests(TestCase):
+    """Only rows that were actually inserted are reported, not the ones a conflict dropped"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.assignee = User.objects.create_user('assignee', 'assignee@example.com', 'pw')
+        self.categories = [
+            EvidenceCategory.objects.create(
+                name=f'Control {index}',
+                description='Control',
+                evidence_requirements='Evidence',
+                review_period=ReviewPeriod.MONTHLY,
+                assignee=self.assignee
+            )
+            for index in range(2)
+        ]
+        self.submissions = [
+            EvidenceSubmission.objects.create(
+                category=category,
+                period_start_date=self.today - timedelta(days=30),
+                period_end_date=self.today - timedelta(days=1),
+                due_date=self.today
+            )
+            for category in self.categories
+        ]
+
+    def notification(self, submission):
+        return Notification(
+            user=self.assignee,
+            notification_type='OVERDUE',
+            title=f'Due Today: {submission.category.name}',
+            message='Due today',
+            category=submission.category,
+            submission=submission
+        )
+
+    def test_conflicting_rows_are_not_reported(self):
+        # Inserted meanwhile by a concurrent run
+        existing = self.notification(self.submissions[0])
+        existing.save()
+
+        inserted = _insert_notifications([self.notification(submission) for submission in self.submissions])
+        self.assertEqual([notification.submission_id for notification in inserted], [self.submissions[1].id])
+        self.assertIsNotNone(inserted[0].pk)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_due_date_notifications_created_once(self):
+        created = create_due_date_notifications(self.today)
+        self.assertEqual(len(created), 2)
+        self.assertEqual(create_due_date_notifications(self.today), [])
+        self.assertEqual(Notification.objects.count(), 2)
+
+
+class DueDateJobTests(TestCase):
+    """A failed run must not use up the day's claim"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        assignee = User.objects.create_user('assignee', 'assignee@example.com', 'pw')
+        category = EvidenceCategory.objects.create(
+            name='Firewall review',
+            description='Monthly firewall review',
+            evidence_requirements='Rule export',
+            review_period=ReviewPeriod.MONTHLY,
+            assignee=assignee
+        )
+        EvidenceSubmission.objects.create(
+            category=category,
+            period_start_date=self.today - timedelta(days=29),
+            period_end_date=self.today,
+            due_date=self.today
+        )
+
+    def test_failed_run_releases_the_claim(self):
+        with mock.patch(
+            'evidence.services.notifications.create_due_date_notifications', side_effect=RuntimeError('database down')
+        ):
+            with self.assertRaises(RuntimeError):
+                run_due_date_notifications(self.today)
+        self.assertFalse(JobRun.objects.filter(name=DUE_DATE_NOTIFICATIONS_JOB, last_run_date=self.today).exists())
+
+        created = run_due_date_notifications(self.today)
+        self.assertEqual(len(created), 1)
+        self.assertIsNone(run_due_date_notifications(self.today))
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from evidence.models import EvidenceCategory, EvidenceStatus, EvidenceSubmission, ReviewPeriod
+from evidence.services.period_roll import roll_periods
+
+
+class SameDayReviewTests(TestCase):
+    """A period opened and reviewed on the same day must still get a new PENDING submission"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.reviewer = User.objects.create_user('reviewer', 'reviewer@example.com', 'pw')
+        self.category = EvidenceCategory.objects.create(
+            name='Access review',
+            description='Quarterly access review',
+            evidence_requirements='Signed review',
+            review_period=ReviewPeriod.MONTHLY
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reviewer)
+
+    def open_and_submit(self):
+        """Open today's period and mark it submitted, as if evidence came in right away"""
+        created = roll_periods([self.category])
+        self.assertEqual(len(created), 1)
+        submission = created[0]
+        self.assertIsNotNone(submission.pk)
+        self.assertEqual(submission.period_start_date, self.today)
+        submission.status = EvidenceStatus.SUBMITTED
+        submission.submitted_at = timezone.now()
+        submission.save()
+        return submission
+
+    def assert_next_period_opened(self, reviewed):
+        pending = EvidenceSubmission.objects.get(category=self.category, status=EvidenceStatus.PENDING)
+        self.assertEqual(pending.period_start_date, self.today + timedelta(days=1))
+        self.assertEqual(pending.period_end_date, reviewed.period_end_date)
+        self.assertEqual(pending.due_date, reviewed.due_date)
+
+    def test_same_day_approve_opens_next_period(self):
+        submission = self.open_and_submit()
+        response = self.client.post(f'/api/submissions/{submission.id}/approve/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assert_next_period_opened(submission)
+
+    def test_same_day_reject_opens_next_period(self):
+        submission = self.open_and_submit()
+        response = self.client.post(
+            f'/api/submissions/{submission.id}/reject/',
+            {'review_notes': 'Missing signature'},
+            HTTP_HOST='localhost'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_next_period_opened(submission)
+
+    def test_returns_only_saved_submissions(self):
+        submission = self.open_and_submit()
+        submission.status = EvidenceStatus.APPROVED
+        submission.save()
+
+        created = roll_periods([self.category])
+        self.assertEqual(len(created), 1)
+        self.assertTrue(EvidenceSubmission.objects.filter(pk=created[0].pk).exists())
+        # The new period is open, so rolling again adds nothing
+        self.assertEqual(roll_periods([self.category]), [])
+        self.assertEqual(EvidenceSubmission.objects.filter(category=self.category).count(), 2)
+
+
+class LapsedCategoryTests(TestCase):
+    """A category whose periods ran out gets only the period covering today, not every missed one"""
+
+    def setUp(self):
+        self.today = timezone.now().date()
+
+    def lapsed_category(self, review_period, ended_days_ago):
+        category = EvidenceCategory.objects.create(
+            name=f'{review_period} control',
+            description='Control',
+            evidence_requirements='Evidence',
+            review_period=review_period
+        )
+        end = self.today - timedelta(days=ended_days_ago)
+        EvidenceSubmission.objects.create(
+            category=category,
+            period_start_date=end,
+            period_end_date=end,
+            due_date=end + timedelta(days=1),
+            status=EvidenceStatus.APPROVED
+        )
+        return category
+
+    def test_lapsed_daily_category_opens_one_period(self):
+        category = self.lapsed_category(ReviewPeriod.DAILY, ended_days_ago=30)
+        with self.assertLogs('evidence.services.period_roll', 'INFO') as logs:
+            created = roll_periods([category], today=self.today)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].period_start_date, self.today)
+        self.assertEqual(created[0].period_end_date, self.today)
+        self.assertEqual(created[0].due_date, self.today + timedelta(days=1))
+        self.assertIn('Skipped 29 missed review period(s)', logs.output[0])
+        self.assertEqual(roll_periods([category], today=self.today), [])
+        self.assertEqual(EvidenceSubmission.objects.filter(category=category).count(), 2)
+
+    def test_lapsed_weekly_category_keeps_its_schedule(self):
+        category = self.lapsed_category(ReviewPeriod.WEEKLY, ended_days_ago=10)
+        created = roll_periods([category], today=self.today)
+
+        # Weeks continue from the day after the last period: the first one missed ended 3 days ago
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].period_start_date, self.today - timedelta(days=2))
+        self.assertEqual(created[0].period_end_date, self.today + timedelta(days=4))
+
+    def test_next_period_opened_without_skipping(self):
+        category = self.lapsed_category(ReviewPeriod.DAILY, ended_days_ago=1)
+        with self.assertNoLogs('evidence.services.period_roll', 'INFO'):
+            created = roll_periods([category], today=self.today)
+        self.assertEqual(created[0].period_start_date, self.today)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from evidence.models import (
+    EvidenceCategory, EvidenceFile, EvidenceStatus, EvidenceSubmission, ReviewPeriod, SubmissionComment
+)
+from evidence.serializers import EvidenceCategorySerializer
+from evidence.services.compliance import refresh_compliance_state
+
+
+class CategoryQueryCountTests(TestCase):
+    """Serializing categories takes the same number of queries however many there are"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_categories(self, count, past_periods=2):
+        """Categories with an open period, `past_periods` approved ones, files, comments and reviewers"""
+        today = timezone.now().date()
+        start = EvidenceCategory.objects.count()
+        categories = EvidenceCategory.objects.bulk_create([
+            EvidenceCategory(
+                name=f'Control {start + i:04d}',
+                description='Control',
+                evidence_requirements='Evidence',
+                review_period=ReviewPeriod.MONTHLY,
+                assignee=self.user,
+                approver=self.user,
+                created_by=self.user
+            )
+            for i in range(count)
+        ])
+        submissions = []
+        for category in categories:
+            submissions.append(EvidenceSubmission(
+                category=category,
+                period_start_date=today,
+                period_end_date=today + timedelta(days=29),
+                due_date=today + timedelta(days=30)
+            ))
+            for period in range(1, past_periods + 1):
+                end = today - timedelta(days=30 * (period - 1) + 1)
+                submissions.append(EvidenceSubmission(
+                    category=category,
+                    period_start_date=end - timedelta(days=29),
+                    period_end_date=end,
+                    due_date=end + timedelta(days=1),
+                    status=EvidenceStatus.APPROVED,
+                    submitted_by=self.user,
+                    reviewed_by=self.user
+                ))
+        submissions = EvidenceSubmission.objects.bulk_create(submissions)
+        EvidenceFile.objects.bulk_create([
+            EvidenceFile(
+                submission=submission,
+                filename=f'evidence-{submission.id}.pdf',
+                file_size=10,
+                mime_type='application/pdf',
+                uploaded_by=self.user,
+                status=submission.status
+            )
+            for submission in submissions
+        ])
+        SubmissionComment.objects.bulk_create([
+            SubmissionComment(submission=submission, user=self.user, comment='Looks good')
+            for submission in submissions
+        ])
+        EvidenceCategory.assigned_reviewers.through.objects.bulk_create([
+            EvidenceCategory.assigned_reviewers.through(evidencecategory_id=category.id, user_id=self.user.id)
+            for category in categories
+        ])
+        refresh_compliance_state([category.id for category in categories])
+        return categories
+
+    def serialize_all(self):
+        queryset = EvidenceCategory.objects.order_by('name').prefetch_related(
+            'assigned_reviewers'
+        ).select_related('primary_assignee', 'assignee', 'approver', 'created_by')
+        return EvidenceCategorySerializer(queryset, many=True).data
+
+    def test_serializing_many_categories(self):
+        self.create_categories(5)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(len(self.serialize_all()), 5)
+
+        self.create_categories(520)
+        with self.assertNumQueries(len(few.captured_queries)):
+            data = self.serialize_all()
+        self.assertEqual(len(data), 525)
+        self.assertEqual(len(data[-1]['past_submissions']), 2)
+        self.assertEqual(len(data[-1]['current_submission']['files']), 1)
+
+    def test_category_list_endpoint(self):
+        self.create_categories(5)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get('/api/categories/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+
+        self.create_categories(520)
+        with self.assertNumQueries(len(few.captured_queries)):
+            response = self.client.get('/api/categories/', {'page': 3}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 525)
+
+    def test_category_detail_endpoint(self):
+        few, many = self.create_categories(1, past_periods=1) + self.create_categories(1, past_periods=12)
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(f'/api/categories/{few.id}/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(f'/api/categories/{many.id}/', HTTP_HOST='localhost')
+        self.assertEqual(len(response.data['past_submissions']), 10)
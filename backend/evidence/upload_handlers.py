@@ -0,0 +1,95 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+# Leading bytes of common evidence formats and their MIME type
+FILE_SIGNATURES = [
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/x-ole-storage'),  # .doc / .xls / .ppt / .msg
+    (b'PK\x03\x04', 'application/zip'),  # also .docx / .xlsx / .pptx
+    (b'\x1f\x8b', 'application/gzip'),
+    (b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+]
+
+# Bytes kept from the start of each file for sniffing
+SNIFF_BYTES = 16
+
+
+def sniff_content_type(head, filename, declared=None):
+    """
+    MIME type of a file judged from its first bytes.
+
+    Container formats (zip, OLE) are narrowed down by the file extension, since Office
+    documents are zip or OLE files. Unknown content falls back to the extension, then to
+    the type the browser declared.
+    """
+    guessed, _ = mimetypes.guess_type(filename)
+    for signature, content_type in FILE_SIGNATURES:
+        if head.startswith(signature):
+            if content_type in ('application/zip', 'application/x-ole-storage'):
+                return guessed or content_type
+            return content_type
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return guessed or declared or 'application/octet-stream'
+
+
+class HashedUploadedFile(TemporaryUploadedFile):
+    """Uploaded file in a temporary file under EVIDENCE_UPLOAD_TEMP_DIR, with its SHA-256"""
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        os.makedirs(settings.EVIDENCE_UPLOAD_TEMP_DIR, exist_ok=True)
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=settings.EVIDENCE_UPLOAD_TEMP_DIR)
+        super(TemporaryUploadedFile, self).__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = None
+
+
+class EvidenceUploadHandler(FileUploadHandler):
+    """
+    Upload handler streaming each file to a temporary file next to the evidence storage
+    while hashing it, counting its size and sniffing its type.
+
+    The request body is read once and only a chunk is held in memory at a time. Storing the
+    finished file (see services.blob_store) is then a rename, or nothing at all when the
+    same content is already stored.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = HashedUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.head = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        self.file.content_type = sniff_content_type(self.head, self.file_name, self.content_type)
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            temp_location = self.file.temporary_file_path()
+            try:
+                self.file.close()
+                os.remove(temp_location)
+            except FileNotFoundError:
+                pass
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework.request import Request
-from .views import EvidenceCategoryViewSet, EvidenceSubmissionViewSet, GoogleAuthView, GoogleOAuthCallbackView, AuthView, EvidenceFileViewSet, NotificationViewSet, LoginView
+from .views import EvidenceCategoryViewSet, EvidenceSubmissionViewSet, GoogleAuthView, GoogleOAuthCallbackView, AuthView, EvidenceFileViewSet, NotificationViewSet, LoginView, EvidenceUploadCreateView, EvidenceUploadView, notification_stream
 
 def export_no_slash_view(request):
     """Handle /categories/export (without trailing slash) by calling the ViewSet action"""
@@ -18,6 +18,9 @@ def export_no_slash_view(request):
 urlpatterns = [
     path('auth/login/', LoginView.as_view(), name='login'),  # CSRF-exempt login endpoint - must come before router
     path('auth/google/callback/', GoogleOAuthCallbackView.as_view(), name='google-oauth-callback'),  # CSRF-exempt OAuth callback
+    path('notifications/stream/', notification_stream, name='notification-stream'),  # SSE - must come before router (notifications/<pk>/)
+    path('uploads/', EvidenceUploadCreateView.as_view(), name='evidence-upload-create'),  # tus creation
+    path('uploads/<uuid:upload_id>/', EvidenceUploadView.as_view(), name='evidence-upload'),  # Bytes of direct uploads
 ]
 
 router = DefaultRouter()
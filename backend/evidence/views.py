@@ -5,12 +5,15 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.views import APIView
 from django.utils import timezone
-from django.db.models import Q, Count, Prefetch
-from django.http import HttpResponse
+from django.db.models import Q, Count, Prefetch, Sum, Case, When, Value, F, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, FileResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.http import http_date, parse_etags
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404
 from datetime import timedelta
 from io import BytesIO
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -19,7 +22,7 @@ from reportlab.lib.units import inch
 from .models import (
     EvidenceCategory, EvidenceSubmission, EvidenceFile,
     SubmissionComment, EvidenceStatus, CategoryGroup, Notification,
-    GoogleDriveFolderMapping
+    GoogleDriveFolderMapping, EvidenceUpload
 )
 from .serializers import (
     EvidenceCategorySerializer, EvidenceCategoryDetailSerializer,
@@ -28,14 +31,31 @@ from .serializers import (
     NotificationSerializer, AnalyticsSerializer
 )
 from .services.google_drive import GoogleDriveService
+from .services.period_roll import roll_periods
+from .services.compliance import ensure_compliance_states
+from .services.analytics import build_analytics
+from .services.dashboard_cache import get_snapshot, snapshot_stats
+from .services.notifications import generate_submission_notifications, touch_notifications, unread_state
+from .services.notification_stream import NotificationStream
+from .services.export import EXPORT_GROUPS, EXPORT_HEADERS, export_queryset, iter_export_rows, iter_csv, write_xlsx
+from .services.drive_uploads import enqueue_drive_uploads
+from .services.outbox import queue_email
+from .services.blob_store import store_blob
+from .services.direct_uploads import (
+    TUS_EXTENSIONS, TUS_VERSION, UploadOffsetError, append_part, create_upload, finish_upload,
+    parse_upload_metadata
+)
+from .upload_handlers import EvidenceUploadHandler
+from .services.drive_credentials import store_drive_credential
+from .services.drive_reconcile import files_needing_upload
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.conf import settings
-from django.core.mail import send_mail
 import requests
 from datetime import datetime
 import os
+import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -60,45 +80,81 @@ def add_date_prefix_to_filename(filename):
     return f"{current_date}_{name}{ext}"
 
 
-def create_due_date_notifications():
+def queue_drive_uploads(category, files):
     """
-    Automatically create notifications for assignees when due date arrives.
-    This function checks for submissions with due_date = today and creates notifications
-    if they don't already exist. Called automatically from key endpoints.
+    Queue approved files for the background upload to Google Drive (manage.py drive_worker).
+    Returns (number of files queued, upload errors).
     """
-    today = timezone.now().date()
-    submissions = EvidenceSubmission.objects.filter(
-        due_date=today,
-        status=EvidenceStatus.PENDING
-    ).select_related('category', 'category__assignee')
-    
-    notifications_created = 0
-    for submission in submissions:
-        category = submission.category
-        # Send notification to assignee if exists
-        if category.assignee:
-            # Check if notification already exists for this submission today
-            existing_notification = Notification.objects.filter(
-                user=category.assignee,
-                submission=submission,
-                notification_type='OVERDUE',
-                created_at__date=today
-            ).first()
-            
-            if not existing_notification:
-                # Create notification with link to control-file page
-                Notification.objects.create(
-                    user=category.assignee,
-                    notification_type='OVERDUE',
-                    title=f'Due Today: {category.name}',
-                    message=f'Evidence submission for "{category.name}" is due today. Please submit your evidence files.',
-                    category=category,
-                    submission=submission,
-                    is_read=False
-                )
-                notifications_created += 1
+    if not category.google_drive_folder_id:
+        return 0, ["Google Drive folder not configured for this category."]
+    return enqueue_drive_uploads(files), []
+
+
+def submit_error(submission):
+    """Error response if files can't be submitted for this submission, else None"""
+    if submission.status not in [EvidenceStatus.PENDING, EvidenceStatus.REJECTED, 
+                                 EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]:
+        return Response(
+            {'error': 'This submission cannot be submitted in its current status.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    return notifications_created
+    # Validate that category has both assignee and approver
+    category = submission.category
+    if not category.assignee:
+        return Response(
+            {'error': 'Cannot submit files: Assignee is required for this control.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not category.approver:
+        return Response(
+            {'error': 'Cannot submit files: Approver is required for this control.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def upload_filename(filename):
+    """
+    Stored name of a direct upload: dated when the upload starts, so the name stays the
+    same however long it takes to finish (add_date_prefix_to_filename keeps an existing prefix)
+    """
+    return add_date_prefix_to_filename(os.path.basename(filename)) if filename else filename
+
+
+def tus_headers(upload=None, **headers):
+    """Headers of a tus protocol response, with the upload's offset, length and expiry"""
+    headers['Tus-Resumable'] = TUS_VERSION
+    if upload is not None:
+        headers['Upload-Offset'] = str(upload.offset)
+        headers['Upload-Length'] = str(upload.size)
+        headers['Upload-Expires'] = http_date(upload.expires_at.timestamp())
+        headers['Cache-Control'] = 'no-store'
+    return headers
+
+
+def tus_version_error(request):
+    """412 response for tus requests made with a protocol version we don't speak, else None"""
+    if request.headers.get('Tus-Resumable') != TUS_VERSION:
+        return Response(
+            {'error': f'Tus-Resumable: {TUS_VERSION} is required.'},
+            status=status.HTTP_412_PRECONDITION_FAILED,
+            headers={'Tus-Version': TUS_VERSION}
+        )
+    return None
+
+
+def upload_state(upload):
+    """Response body describing a direct upload and where to send its bytes"""
+    return {
+        'id': str(upload.id),
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.offset,
+        'expires_at': upload.expires_at,
+        # Relative to the API root, which is /api/ or / depending on the proxy in front
+        'upload_path': f'uploads/{upload.id}/',
+    }
 
 
 class EvidenceCategoryViewSet(viewsets.ModelViewSet):
@@ -190,13 +246,16 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
         # Ensure proper ordering
         queryset = queryset.order_by('name')
         
+        # Submissions are resolved per page by EvidenceCategoryListSerializer's SubmissionLoader
         return queryset.prefetch_related(
-            'assigned_reviewers', 
-            'submissions',
-            'submissions__files',
-            'submissions__comments'
+            'assigned_reviewers'
         ).select_related('primary_assignee', 'assignee', 'approver', 'created_by')
     
+    def perform_create(self, serializer):
+        category = serializer.save()
+        # Open the first review period right away instead of waiting for the scheduled roll
+        roll_periods([category])
+    
     def update(self, request, *args, **kwargs):
         """Override update to send notification when assignee is changed"""
         instance = self.get_object()
@@ -235,80 +294,66 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
         """Get all category groups with counts and compliance scores"""
         show_hidden = request.query_params.get('show_hidden', 'false') == 'true'
         show_all = request.query_params.get('show_all', 'false') == 'true'
-        base_queryset = EvidenceCategory.objects.prefetch_related(
-            Prefetch(
-                'submissions',
-                queryset=EvidenceSubmission.objects.prefetch_related('files').select_related('submitted_by', 'reviewed_by')
-            )
-        ).all()
         if show_hidden:
             # When showing hidden, only show inactive categories
-            base_queryset = base_queryset.filter(is_active=False)
+            base_queryset = EvidenceCategory.objects.filter(is_active=False)
         else:
             # When showing active, only show active categories
-            base_queryset = base_queryset.filter(is_active=True)
+            base_queryset = EvidenceCategory.objects.filter(is_active=True)
         
         # Filter by assigned categories for logged-in user (unless show_all is true)
         if not show_all and request.user.is_authenticated:
             base_queryset = base_queryset.filter(assignee=request.user)
         
+        ensure_compliance_states(base_queryset)
+        today = timezone.now().date()
+        
+        # Whether the latest open or rejected submission of each category still needs evidence
+        # (PENDING/REJECTED without files)
+        awaiting_evidence = EvidenceSubmission.objects.filter(
+            category=OuterRef('pk'),
+            status__in=['PENDING', 'SUBMITTED', 'UNDER_REVIEW', 'REJECTED']
+        ).order_by('-due_date', 'id').annotate(
+            awaiting_evidence=Case(
+                When(
+                    Q(status__in=['PENDING', 'REJECTED']) &
+                    ~Q(Exists(EvidenceFile.objects.filter(submission=OuterRef('pk')))),
+                    then=Value(True)
+                ),
+                default=Value(False)
+            )
+        ).values('awaiting_evidence')[:1]
+        
+        # All groups are counted in one grouped query
+        rows = base_queryset.annotate(
+            # No such submission at all also counts as pending evidence
+            awaiting_evidence=Coalesce(Subquery(awaiting_evidence), Value(True))
+        ).order_by().values('category_group').annotate(
+            count=Count('id'),
+            # Score is reset to 0 once the current submission is past due
+            total_score=Sum(Case(
+                When(compliance_state__due_date__lt=today, then=Value(0.0)),
+                default=F('compliance_state__score')
+            )),
+            pending_count=Count('id', filter=Q(awaiting_evidence=True))
+        )
+        rows = {row['category_group']: row for row in rows}
+        
         groups = []
         for group_code, group_label in CategoryGroup.choices:
-            group_categories = base_queryset.filter(category_group=group_code)
-            count = group_categories.count()
+            row = rows.get(group_code, {})
+            count = row.get('count', 0)
             
             if count > 0 or show_hidden:
-                # Calculate average compliance score for the group
-                total_score = 0
-                categories_with_score = 0
-                pending_count = 0
-                
-                for category in group_categories:
-                    try:
-                        # Check if score should be reset
-                        if category.should_reset_compliance_score():
-                            score = 0
-                        else:
-                            score = category.calculate_compliance_score()
-                        total_score += score
-                        categories_with_score += 1
-                        
-                        # Count pending evidence (categories with PENDING/REJECTED status and no files, or no submission)
-                        # Use prefetched submissions - Django will use prefetched data automatically
-                        submissions = category.submissions.all()
-                        
-                        current_submission = None
-                        for sub in submissions:
-                            if sub.status in ['PENDING', 'SUBMITTED', 'UNDER_REVIEW', 'REJECTED']:
-                                if current_submission is None or sub.due_date > current_submission.due_date:
-                                    current_submission = sub
-                        
-                        if not current_submission:
-                            # No active submission - pending
-                            pending_count += 1
-                        elif current_submission.status in ['PENDING', 'REJECTED']:
-                            # Has submission but no files uploaded yet
-                            # Check if files are prefetched
-                            if hasattr(current_submission, '_prefetched_objects_cache') and 'files' in current_submission._prefetched_objects_cache:
-                                files_exist = len(current_submission._prefetched_objects_cache['files']) > 0
-                            else:
-                                files_exist = current_submission.files.exists()
-                            
-                            if not files_exist:
-                                pending_count += 1
-                    except Exception as e:
-                        # Log error but continue processing other categories
-                        logger.error(f"Error processing category {category.id}: {e}", exc_info=True)
-                        continue
-                
-                avg_compliance_score = round(total_score / categories_with_score, 2) if categories_with_score > 0 else 0
+                total_score = row.get('total_score') or 0
+                avg_compliance_score = round(total_score / count, 2) if count > 0 else 0
                 
                 groups.append({
                     'code': group_code,
                     'label': group_label,
                     'count': count,
                     'compliance_score': avg_compliance_score,
-                    'pending_evidence_count': pending_count
+                    'pending_evidence_count': row.get('pending_count', 0)
                 })
         
         return Response(groups)
@@ -386,126 +431,84 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
                 'Common Criteria (CC1-CC5)': 'common_criteria_folder_id'
             }
             
-            for parent_name, group_codes in folder_structure.items():
-                # Get or create parent folder
-                parent_field = parent_folder_map[parent_name]
-                parent_folder_id = getattr(folder_mapping, parent_field)
-                
-                if not parent_folder_id:
-                    parent_folder_id = drive_service.create_folder(parent_name, parent_folder_id=root_folder_id)
-                    setattr(folder_mapping, parent_field, parent_folder_id)
-                
-                # Create subcategory folders (category group folders)
-                for group_code in group_codes:
-                    if group_code not in category_group_folder_ids:
-                        # Get the label for this group
-                        group_label = dict(CategoryGroup.choices).get(group_code, group_code)
-                        subfolder_id = drive_service.create_folder(group_label, parent_folder_id=parent_folder_id)
-                        category_group_folder_ids[group_code] = subfolder_id
+            # Missing folders of each level are created in one batch request; a level only
+            # needs the ids of the level above, so the whole tree takes a few round trips
+            missing_parents = [
+                (parent_field, parent_name, root_folder_id)
+                for parent_name, parent_field in parent_folder_map.items()
+                if not getattr(folder_mapping, parent_field)
+            ]
+            created_parents, folder_errors = drive_service.create_folders(missing_parents)
+            for parent_field, parent_folder_id in created_parents.items():
+                setattr(folder_mapping, parent_field, parent_folder_id)
+            
+            # Create subcategory folders (category group folders)
+            group_labels = dict(CategoryGroup.choices)
+            missing_groups = [
+                (group_code, group_labels.get(group_code, group_code), getattr(folder_mapping, parent_folder_map[parent_name]))
+                for parent_name, group_codes in folder_structure.items()
+                if getattr(folder_mapping, parent_folder_map[parent_name])
+                for group_code in group_codes
+                if group_code not in category_group_folder_ids
+            ]
+            created_groups, group_errors = drive_service.create_folders(missing_groups)
+            category_group_folder_ids.update(created_groups)
+            folder_errors.update(group_errors)
             
             # Save folder mapping
             folder_mapping.category_group_folder_ids = category_group_folder_ids
             folder_mapping.save()
             
             # Step 2: Create folders for each EvidenceCategory (control) inside their category group folders
-            categories_created = 0
-            categories_skipped = 0
-            for group_code, group_folder_id in category_group_folder_ids.items():
-                # Get all categories for this group
-                categories = EvidenceCategory.objects.filter(
-                    category_group=group_code,
-                    is_active=True
-                )
-                
-                for category in categories:
-                    # Skip if folder already exists
-                    if category.google_drive_folder_id:
-                        categories_skipped += 1
-                        continue
-                    
-                    # Create folder for this category (control)
-                    try:
-                        category_folder_id = drive_service.create_folder(
-                            category.name,
-                            parent_folder_id=group_folder_id
-                        )
-                        # Store folder ID in category
-                        category.google_drive_folder_id = category_folder_id
-                        category.save()
-                        categories_created += 1
-                    except Exception as e:
-                        # Log error but continue with other categories
-                        logger.error(f"Error creating folder for category {category.name}: {str(e)}", exc_info=True)
-                        continue
-            
-            # Step 3: Sync files - Upload any approved files that haven't been uploaded to Google Drive yet
-            files_uploaded = 0
-            files_skipped = 0
-            files_failed = 0
-            upload_errors = []
-            
-            # Get all approved submissions with files that haven't been uploaded
-            approved_submissions = EvidenceSubmission.objects.filter(
-                status=EvidenceStatus.APPROVED
-            ).prefetch_related('files', 'category')
-            
-            for submission in approved_submissions:
-                category = submission.category
-                # Skip if category doesn't have a Google Drive folder ID
-                if not category.google_drive_folder_id:
-                    continue
-                
-                # Get files that haven't been uploaded to Google Drive yet
-                files_to_upload = submission.files.filter(google_drive_file_id__isnull=True)
-                
-                for evidence_file in files_to_upload:
-                    if evidence_file.file:  # Check if local file exists
-                        try:
-                            # Read file content
-                            evidence_file.file.open('rb')
-                            file_content = evidence_file.file.read()
-                            evidence_file.file.close()
-                            
-                            # Upload to Google Drive
-                            drive_result = drive_service.upload_file(
-                                file_content=file_content,
-                                filename=evidence_file.filename,
-                                folder_id=category.google_drive_folder_id,
-                                mime_type=evidence_file.mime_type
-                            )
-                            
-                            # Store Google Drive file info
-                            evidence_file.google_drive_file_id = drive_result['file_id']
-                            evidence_file.google_drive_file_url = drive_result['web_url']
-                            evidence_file.save()
-                            files_uploaded += 1
-                        except Exception as e:
-                            # Log error but continue with other files
-                            error_msg = f"Failed to upload {evidence_file.filename} to Google Drive: {str(e)}"
-                            logger.error(error_msg, exc_info=True)
-                            upload_errors.append(error_msg)
-                            files_failed += 1
-                    else:
-                        error_msg = f"Local file not found for {evidence_file.filename}"
-                        upload_errors.append(error_msg)
-                        files_failed += 1
+            categories = list(EvidenceCategory.objects.filter(
+                category_group__in=list(category_group_folder_ids),
+                is_active=True
+            ))
+            categories_skipped = sum(1 for category in categories if category.google_drive_folder_id)
+            categories_to_create = {
+                category.id: category for category in categories if not category.google_drive_folder_id
+            }
+            created_categories, category_errors = drive_service.create_folders([
+                (category.id, category.name, category_group_folder_ids[category.category_group])
+                for category in categories_to_create.values()
+            ])
+            for category_id, error in category_errors.items():
+                # Log error but continue with other categories
+                logger.error(f"Error creating folder for category {categories_to_create[category_id].name}: {error}")
+            for name, error in folder_errors.items():
+                logger.error(f"Error creating Google Drive folder {name}: {error}")
+            
+            # Store folder IDs in categories
+            now = timezone.now()
+            updated_categories = []
+            for category_id, category_folder_id in created_categories.items():
+                category = categories_to_create[category_id]
+                category.google_drive_folder_id = category_folder_id
+                category.updated_at = now
+                updated_categories.append(category)
+            EvidenceCategory.objects.bulk_update(updated_categories, ['google_drive_folder_id', 'updated_at'], batch_size=500)
+            categories_created = len(updated_categories)
+            
+            # Step 3: Sync files - Queue any approved files that haven't been uploaded to Google Drive yet
+            files_queued = enqueue_drive_uploads(files_needing_upload())
             
             # Build response message
             message_parts = ['Folder structure synced successfully']
             if categories_created > 0:
                 message_parts.append(f'{categories_created} category folder(s) created')
-            if files_uploaded > 0:
-                message_parts.append(f'{files_uploaded} file(s) uploaded to Google Drive')
-            if files_failed > 0:
-                message_parts.append(f'{files_failed} file(s) failed to upload')
+            folders_failed = len(folder_errors) + len(category_errors)
+            if folders_failed > 0:
+                message_parts.append(f'{folders_failed} folder(s) could not be created')
+            if files_queued > 0:
+                message_parts.append(f'{files_queued} file(s) queued for upload to Google Drive')
             
             response_data = {
                 'message': '. '.join(message_parts) + '.',
                 'root_folder_id': root_folder_id,
                 'categories_created': categories_created,
                 'categories_skipped': categories_skipped,
-                'files_uploaded': files_uploaded,
-                'files_failed': files_failed,
+                'folders_failed': folders_failed,
+                'files_queued': files_queued,
                 'folder_mapping': {
                     'security_folder_id': folder_mapping.security_folder_id,
                     'availability_folder_id': folder_mapping.availability_folder_id,
@@ -515,9 +518,6 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
                 }
             }
             
-            if upload_errors:
-                response_data['upload_errors'] = upload_errors
-            
             return Response(response_data)
             
         except Exception as e:
@@ -536,127 +536,25 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], url_path='export', url_name='export')
     def export_groups(self, request):
-        """Export category groups data in PDF or Excel format"""
+        """Export category groups data in PDF, Excel or CSV format"""
         try:
             format_type = request.query_params.get('format', 'excel').lower()
-            show_hidden = request.query_params.get('show_hidden', 'false') == 'true'          
-            # Get all categories with their submissions and files
-            base_queryset = EvidenceCategory.objects.select_related(
-                'assignee', 'approver'
-            ).prefetch_related(
-                Prefetch(
-                    'submissions',
-                    queryset=EvidenceSubmission.objects.prefetch_related(
-                        'files', 'files__uploaded_by'
-                    ).select_related('submitted_by', 'reviewed_by')
-                )
-            ).all()
-            
-            if show_hidden:
-                # When showing hidden, only show inactive categories
-                base_queryset = base_queryset.filter(is_active=False)
-            else:
-                # When showing active, only show active categories
-                base_queryset = base_queryset.filter(is_active=True)
-            
-            total_categories_before_filter = base_queryset.count()
-            
-            # Prepare export data
-            export_data = []
-            categories_by_group = {}
-            for group_code, group_label in CategoryGroup.choices:
-                if group_code == 'UNCATEGORIZED':
-                    continue
-                    
-                group_categories = base_queryset.filter(category_group=group_code)
-                categories_by_group[group_label] = group_categories.count()
-                
-                for category in group_categories:
-                    try:
-                        # Get all submissions for this category (using prefetched data)
-                        submissions = list(category.submissions.all())
-                        
-                        # Get latest submission with files
-                        latest_submission = None
-                        latest_file = None
-                        for sub in submissions:
-                            # Check if submission has files (using prefetched data)
-                            sub_files = list(sub.files.all())
-                            if sub_files:
-                                # Find the latest file in this submission
-                                sub_latest_file = None
-                                for f in sub_files:
-                                    if sub_latest_file is None or (f.uploaded_at and sub_latest_file.uploaded_at and f.uploaded_at > sub_latest_file.uploaded_at):
-                                        sub_latest_file = f
-                                
-                                if sub_latest_file:
-                                    if latest_submission is None or (sub.submitted_at and latest_submission.submitted_at and sub.submitted_at > latest_submission.submitted_at):
-                                        latest_submission = sub
-                                        latest_file = sub_latest_file
-                        
-                        # Get file details
-                        uploaded_by = None
-                        uploaded_date = None
-                        approved_by = None
-                        
-                        if latest_file:
-                            uploaded_by = latest_file.uploaded_by.username if latest_file.uploaded_by else 'N/A'
-                            uploaded_date = latest_file.uploaded_at.strftime('%Y-%m-%d %H:%M:%S') if latest_file.uploaded_at else 'N/A'
-                        
-                        if latest_submission and latest_submission.status == 'APPROVED' and latest_submission.reviewed_by:
-                            approved_by = latest_submission.reviewed_by.username
-                        
-                        # Determine evidence status
-                        current_submission = None
-                        for sub in submissions:
-                            if sub.status in [EvidenceStatus.PENDING, EvidenceStatus.SUBMITTED, 
-                                             EvidenceStatus.UNDER_REVIEW, EvidenceStatus.REJECTED]:
-                                if current_submission is None or sub.due_date > current_submission.due_date:
-                                    current_submission = sub
-                        
-                        if not current_submission:
-                            evidence_status = 'Missing'
-                        elif current_submission.status in [EvidenceStatus.PENDING, EvidenceStatus.REJECTED]:
-                            # Check if files exist using prefetched data
-                            current_files = list(current_submission.files.all())
-                            if not current_files:
-                                evidence_status = 'Missing'
-                            else:
-                                evidence_status = 'Uploaded'
-                        else:
-                            # Check if files exist using prefetched data
-                            current_files = list(current_submission.files.all())
-                            if current_files:
-                                evidence_status = 'Uploaded'
-                            else:
-                                evidence_status = 'Missing'
-                        
-                        export_data.append({
-                            'category_group': group_label,
-                            'control': category.name,
-                            'evidence_status': evidence_status,
-                            'last_uploaded_date': uploaded_date or 'N/A',
-                            'uploaded_by': uploaded_by or 'N/A',
-                            'approved_by': approved_by or 'N/A'
-                        })
-                    except Exception as e:
-                        # Log error but continue with other categories
-                        logger.error(f"Error processing category {category.id} for export: {e}", exc_info=True)
-                        # Still add the category with default values
-                        export_data.append({
-                            'category_group': group_label,
-                            'control': category.name,
-                            'evidence_status': 'Error',
-                            'last_uploaded_date': 'N/A',
-                            'uploaded_by': 'N/A',
-                            'approved_by': 'N/A'
-                        })
-                        continue
+            show_hidden = request.query_params.get('show_hidden', 'false') == 'true'
+            # Rows are computed in SQL and streamed from a server-side cursor
+            queryset = export_queryset(show_hidden)
             
             # Check if we have data to export
-            if not export_data:
-                # Log why there's no data
-                total_categories = base_queryset.count()
+            if not queryset.exists():
+                categories_by_group = dict(
+                    EvidenceCategory.objects.filter(is_active=not show_hidden).order_by().values_list(
+                        'category_group'
+                    ).annotate(total=Count('id'))
+                )
+                categories_by_group = {
+                    group_label: categories_by_group.get(group_code, 0)
+                    for group_code, group_label in EXPORT_GROUPS
+                }
+                total_categories = EvidenceCategory.objects.filter(is_active=not show_hidden).count()
                 
                 # Return a more informative error with 400 status instead of 404
                 return Response(
@@ -670,10 +568,13 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            rows = iter_export_rows(queryset)
             if format_type == 'pdf':
-                return self._generate_pdf(export_data)
+                return self._generate_pdf(rows)
+            elif format_type == 'csv':
+                return self._generate_csv(rows)
             else:
-                return self._generate_excel(export_data)
+                return self._generate_excel(rows)
         except Exception as e:
             logger.error(f"Error in export_groups: {e}", exc_info=True)
             return Response(
@@ -681,66 +582,27 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _generate_excel(self, data):
-        """Generate Excel file"""
+    def _generate_excel(self, rows):
+        """Generate Excel file from a write-only workbook and stream it from a temporary file"""
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Category Groups Export"
-            
-            # Headers
-            headers = ['Category Group', 'Control', 'Evidence Status', 'Last Uploaded Date', 'Uploaded By', 'Approved By']
-            ws.append(headers)
-            
-            # Style headers
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            for cell in ws[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-            
-            # Add data
-            for row in data:
-                ws.append([
-                    row['category_group'],
-                    row['control'],
-                    row['evidence_status'],
-                    row['last_uploaded_date'],
-                    row['uploaded_by'],
-                    row['approved_by']
-                ])
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Save to BytesIO
-            output = BytesIO()
-            wb.save(output)
-            output.seek(0)
-            
-            response = HttpResponse(
-                output.read(),
+            output = write_xlsx(rows)
+            response = FileResponse(
+                output,
                 content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             )
             response['Content-Disposition'] = 'attachment; filename="category_groups_export.xlsx"'
             return response
         except Exception as e:
             logger.error(f"Error generating Excel: {e}", exc_info=True)
+            raise
+    
+    def _generate_csv(self, rows):
+        """Stream CSV rows as they are read from the database"""
+        response = StreamingHttpResponse(iter_csv(rows), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="category_groups_export.csv"'
+        return response
     
-    def _generate_pdf(self, data):
+    def _generate_pdf(self, rows):
         """Generate PDF file"""
         try:
             buffer = BytesIO()
@@ -763,17 +625,8 @@ class EvidenceCategoryViewSet(viewsets.ModelViewSet):
             elements.append(Spacer(1, 0.2*inch))
             
             # Prepare table data
-            table_data = [['Category Group', 'Control', 'Evidence Status', 'Last Uploaded Date', 'Uploaded By', 'Approved By']]
-            
-            for row in data:
-                table_data.append([
-                    row['category_group'],
-                    row['control'],
-                    row['evidence_status'],
-                    row['last_uploaded_date'],
-                    row['uploaded_by'],
-                    row['approved_by']
-                ])
+            # (reportlab lays out the whole table at once, so PDF rows are held in memory)
+            table_data = [EXPORT_HEADERS] + list(rows)
             
             # Create table
             table = Table(table_data, repeatRows=1)
@@ -822,6 +675,14 @@ class EvidenceSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = EvidenceSubmissionSerializer
     permission_classes = [IsAuthenticated]
     
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'submit':
+            # Stream evidence uploads to disk while hashing them, instead of the default handlers
+            # (which keep files up to FILE_UPLOAD_MAX_MEMORY_SIZE in memory)
+            request.upload_handlers = [EvidenceUploadHandler(request)]
+        return drf_request
+    
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -848,36 +709,88 @@ class EvidenceSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
     def submit(self, request, pk=None):
         """Submit evidence files for a submission"""
         submission = self.get_object()
+        error_response = submit_error(submission)
+        if error_response:
+            return error_response
         
-      
-        if submission.status not in [EvidenceStatus.PENDING, EvidenceStatus.REJECTED, 
-                                     EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]:
+        # Get files from request
+        files = request.FILES.getlist('files')
+        if not files:
             return Response(
-                {'error': 'This submission cannot be submitted in its current status.'},
+                {'error': 'No files provided.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate that category has both assignee and approver
-        category = submission.category
-        if not category.assignee:
-            return Response(
-                {'error': 'Cannot submit files: Assignee is required for this control.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        if not category.approver:
-            return Response(
-                {'error': 'Cannot submit files: Approver is required for this control.'},
-                status=status.HTTP_400_BAD_REQUEST
+        return self._add_files(request, submission, files)
+    
+    @action(detail=True, methods=['post'], url_path='uploads')
+    def create_upload(self, request, pk=None):
+        """
+        Open an upload slot for one evidence file - the first step of a direct upload.
+        
+        The file is then PUT to the returned upload_path, whole or in parts, and attached
+        with commit_uploads. Large files don't have to arrive in one long request.
+        """
+        submission = self.get_object()
+        error_response = submit_error(submission)
+        if error_response:
+            return error_response
+        
+        try:
+            upload = create_upload(
+                submission,
+                request.user,
+                filename=upload_filename(request.data.get('filename')),
+                size=request.data.get('size'),
+                content_type=request.data.get('content_type', '')
             )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(upload_state(upload), status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def commit_uploads(self, request, pk=None):
+        """Attach finished direct uploads to the submission, like files sent to submit"""
+        submission = self.get_object()
+        error_response = submit_error(submission)
+        if error_response:
+            return error_response
         
-        # Get files from request
-        files = request.FILES.getlist('files')
-        if not files:
+        upload_ids = [str(upload_id) for upload_id in request.data.get('uploads') or []]
+        try:
+            uploads = {
+                str(upload.id): upload for upload in EvidenceUpload.objects.filter(
+                    id__in=upload_ids, submission=submission, created_by=request.user
+                )
+            }
+        except ValidationError:
+            uploads = {}
+        if not upload_ids or len(uploads) != len(set(upload_ids)):
             return Response(
-                {'error': 'No files provided.'},
+                {'error': 'No uploads provided, or some of them were not found.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        files = []
+        try:
+            for upload_id in dict.fromkeys(upload_ids):
+                files.append(finish_upload(uploads[upload_id]))
+            response = self._add_files(request, submission, files)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            for file in files:
+                file.close()
+        
+        if response.status_code == status.HTTP_200_OK:
+            for upload in uploads.values():
+                upload.delete()
+        return response
+    
+    def _add_files(self, request, submission, files):
+        """Store uploaded files on a submission and move it along (the body of submit)"""
+        category = submission.category
+        
         # Get notes and due date
         notes = request.data.get('notes', '')
         due_date_str = request.data.get('due_date')
@@ -906,11 +819,16 @@ class EvidenceSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
                 # We need to rename the file before saving
                 file.name = date_prefixed_filename
                 
+                # Content is stored once per distinct file (by SHA-256) however often it is uploaded;
+                # EvidenceUploadHandler hashed it as it arrived
+                blob = store_blob(file, sha256=getattr(file, 'sha256', None))
+                
                 # Create EvidenceFile record with local file storage only
                 evidence_file = EvidenceFile.objects.create(
                     submission=submission,
                     filename=date_prefixed_filename,
-                    file=file,  # Save file locally using FileField
+                    file=blob.file.name,  # Points at the blob's locally stored file
+                    blob=blob,
                     file_size=file.size,
                     mime_type=file.content_type or 'application/octet-stream',
                     uploaded_by=request.user if request.user.is_authenticated else None,
@@ -918,67 +836,20 @@ class EvidenceSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
                     status=file_status
                 )
                 
-                # If approver uploaded, automatically approve and upload to Google Drive
+                # If approver uploaded, automatically approve (Google Drive upload is queued below)
                 if is_approver:
                     evidence_file.reviewed_by = request.user if request.user.is_authenticated else None
                     evidence_file.reviewed_at = timezone.now()
                     evidence_file.review_notes = ''  # No review notes needed for auto-approved files
                     evidence_file.save()
-                    
-                    # Upload to Google Drive immediately
-                    if category.google_drive_folder_id:
-                        access_token = request.session.get('google_access_token')
-                        refresh_token = request.session.get('google_refresh_token')
-                        
-                        if not access_token:
-                            # Try to get token from any user's session
-                            from django.contrib.sessions.models import Session
-                            recent_sessions = Session.objects.filter(expire_date__gte=timezone.now())
-                            for session in recent_sessions:
-                                try:
-                                    session_data = session.get_decoded()
-                                    if 'google_access_token' in session_data:
-                                        access_token = session_data['google_access_token']
-                                        refresh_token = session_data.get('google_refresh_token')
-                                        break
-                                except Exception:
-                                    continue
-                        
-                        if access_token:
-                            try:
-                                drive_service = GoogleDriveService(access_token=access_token, refresh_token=refresh_token)
-                                
-                                # Only upload if not already uploaded
-                                if not evidence_file.google_drive_file_id and evidence_file.file:
-                                    try:
-                                        # Read file content
-                                        evidence_file.file.open('rb')
-                                        file_content = evidence_file.file.read()
-                                        evidence_file.file.close()
-                                        
-                                        # Upload to Google Drive
-                                        drive_result = drive_service.upload_file(
-                                            file_content=file_content,
-                                            filename=evidence_file.filename,
-                                            folder_id=category.google_drive_folder_id,
-                                            mime_type=evidence_file.mime_type
-                                        )
-                                        
-                                        # Store Google Drive file info
-                                        evidence_file.google_drive_file_id = drive_result['file_id']
-                                        evidence_file.google_drive_file_url = drive_result['web_url']
-                                        evidence_file.save()
-                                    except Exception as e:
-                                        error_msg = f"Failed to upload {evidence_file.filename} to Google Drive: {str(e)}"
-                                        logger.error(error_msg, exc_info=True)
-                                        upload_errors.append(error_msg)
-                            except Exception as e:
-                                error_msg = f"Failed to initialize Google Drive service: {str(e)}"
-                                logger.error(error_msg, exc_info=True)
-                                upload_errors.append(error_msg)
                 
                 uploaded_files.append(evidence_file)
             
+            # Approver uploads are approved right away - queue them for Google Drive
+            queued_uploads = 0
+            if is_approver:
+                queued_uploads, upload_errors = queue_drive_uploads(category, uploaded_files)
+            
             # Update submission
             # Only change status to SUBMITTED if it was PENDING or REJECTED and not approver upload
             # If approver uploads, keep current status or set to APPROVED if all files are approved
@@ -1010,16 +881,24 @@ class EvidenceSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
             
             submission.save()
             
+            # An approver upload can close the period - open the next one if needed
+            if submission.status == EvidenceStatus.APPROVED:
+                roll_periods([category])
+            
             # Send notification to approver only if assignee uploaded (not approver)
             if category.approver and not is_approver:
-                Notification.objects.create(
+                # One per submission: a later upload brings the existing one back as unread
+                Notification.objects.update_or_create(
                     user=category.approver,
                     notification_type='PENDING_APPROVAL',
-                    title=f'Pending Approval: {category.name}',
-                    message=f'New evidence files have been submitted for "{category.name}" and are awaiting your approval.',
                     category=category,
                     submission=submission,
-                    is_read=False
+                    defaults={
+                        'title': f'Pending Approval: {category.name}',
+                        'message': f'New evidence files have been submitted for "{category.name}" and are awaiting your approval.',
+                        'is_read': False,
+                        'created_at': timezone.now(),
+                    }
                 )
                 
                 # Send email notification to approver
@@ -1042,25 +921,22 @@ Please review and approve or reject the submission in the ComplianceGrid system.
 Best regards,
 ComplianceGrid System
 """
-                        send_mail(
-                            subject,
-                            message,
-                            settings.DEFAULT_FROM_EMAIL,
-                            [category.approver.email],
-                            fail_silently=False,
-                        )
+                        queue_email(subject, message, [category.approver.email])
                     except Exception as e:
-                        logger.error(f"Failed to send email notification to approver: {str(e)}", exc_info=True)
+                        logger.error(f"Failed to queue email notification to approver: {str(e)}", exc_info=True)
             
+            # Reload so the response lists the files just added (get_object prefetched the old ones)
+            submission.refresh_from_db()
             serializer = EvidenceSubmissionSerializer(submission, context={'request': request})
             response_data = serializer.data
             
             # If approver uploaded, add upload status information
             if is_approver and upload_errors:
                 response_data['upload_errors'] = upload_errors
-                response_data['upload_warning'] = 'Files approved, but some could not be uploaded to Google Drive.'
+                response_data['upload_warning'] = 'Files approved, but could not be queued for upload to Google Drive.'
             elif is_approver:
-                response_data['upload_status'] = 'Files approved and uploaded to Google Drive successfully.'
+                response_data['drive_upload_status'] = 'queued'
+                response_data['upload_status'] = f'Files approved. {queued_uploads} file(s) queued for upload to Google Drive.'
             
             return Response(response_data, status=status.HTTP_200_OK)
         except Exception as e:
@@ -1121,95 +997,24 @@ ComplianceGrid System
         submission.review_notes = review_notes
         submission.save()
         
-        # Upload files to Google Drive after approval
-        category = submission.category
-        upload_errors = []
-        uploaded_count = 0
+        # The reviewed period is closed - open the next one for the control
+        roll_periods([submission.category])
         
-        if category.google_drive_folder_id:
-            access_token = request.session.get('google_access_token')
-            refresh_token = request.session.get('google_refresh_token')
-            
-            if not access_token:
-                # Try to get token from any user's session (since Google Drive is shared)
-                # Check if there's a way to get a shared token or use the first authenticated user
-                from django.contrib.sessions.models import Session
-                
-                # Try to find a recent session with Google Drive token
-                # Look for sessions from the last 24 hours
-                recent_sessions = Session.objects.filter(expire_date__gte=timezone.now())
-                for session in recent_sessions:
-                    try:
-                        session_data = session.get_decoded()
-                        if 'google_access_token' in session_data:
-                            access_token = session_data['google_access_token']
-                            refresh_token = session_data.get('google_refresh_token')
-                            break
-                    except Exception:
-                        continue
-            
-            if access_token:
-                try:
-                    drive_service = GoogleDriveService(access_token=access_token, refresh_token=refresh_token)
-                    # Get all files for this submission that haven't been uploaded to Google Drive yet
-                    files_to_upload = submission.files.filter(google_drive_file_id__isnull=True)
-                    
-                    if not files_to_upload.exists():
-                        # All files already uploaded
-                        serializer = EvidenceSubmissionSerializer(submission)
-                        return Response({
-                            **serializer.data,
-                            'message': 'Submission approved. All files were already uploaded to Google Drive.'
-                        })
-                    
-                    for evidence_file in files_to_upload:
-                        if evidence_file.file:  # Check if local file exists
-                            try:
-                                # Read file content
-                                evidence_file.file.open('rb')
-                                file_content = evidence_file.file.read()
-                                evidence_file.file.close()
-                                
-                                # Upload to Google Drive
-                                drive_result = drive_service.upload_file(
-                                    file_content=file_content,
-                                    filename=evidence_file.filename,
-                                    folder_id=category.google_drive_folder_id,
-                                    mime_type=evidence_file.mime_type
-                                )
-                                
-                                # Store Google Drive file info
-                                evidence_file.google_drive_file_id = drive_result['file_id']
-                                evidence_file.google_drive_file_url = drive_result['web_url']
-                                evidence_file.save()
-                                uploaded_count += 1
-                            except Exception as e:
-                                # Log error and collect for response
-                                error_msg = f"Failed to upload {evidence_file.filename} to Google Drive: {str(e)}"
-                                logger.error(error_msg, exc_info=True)
-                                upload_errors.append(error_msg)
-                        else:
-                            error_msg = f"Local file not found for {evidence_file.filename}"
-                            upload_errors.append(error_msg)
-                except Exception as e:
-                    # Log error and collect for response
-                    error_msg = f"Failed to initialize Google Drive service: {str(e)}"
-                    logger.error(error_msg, exc_info=True)
-                    upload_errors.append(error_msg)
-            else:
-                upload_errors.append("Google Drive not authenticated. Please authenticate Google Drive first.")
-        else:
-            upload_errors.append("Google Drive folder not configured for this category.")
+        # Files are uploaded to Google Drive in the background
+        queued_uploads, upload_errors = queue_drive_uploads(submission.category, submission.files.all())
         
         serializer = EvidenceSubmissionSerializer(submission)
         response_data = serializer.data
         
         # Add upload status to response
-        if uploaded_count > 0:
-            response_data['upload_status'] = f'Successfully uploaded {uploaded_count} file(s) to Google Drive.'
         if upload_errors:
             response_data['upload_errors'] = upload_errors
-            response_data['upload_warning'] = 'Submission approved, but some files could not be uploaded to Google Drive.'
+            response_data['upload_warning'] = 'Submission approved, but files could not be queued for upload to Google Drive.'
+        elif queued_uploads > 0:
+            response_data['drive_upload_status'] = 'queued'
+            response_data['upload_status'] = f'Submission approved. {queued_uploads} file(s) queued for upload to Google Drive.'
+        else:
+            response_data['upload_status'] = 'Submission approved. All files were already uploaded to Google Drive.'
         
         return Response(response_data)
     
@@ -1237,6 +1042,9 @@ ComplianceGrid System
         submission.review_notes = review_notes
         submission.save()
         
+        # The reviewed period is closed - open the next one for the control
+        roll_periods([submission.category])
+        
         # Send email notification to assignee when submission is rejected
         category = submission.category
         if category.assignee and category.assignee.email:
@@ -1261,15 +1069,9 @@ Please review the comments, make necessary corrections, and resubmit your eviden
 Best regards,
 ComplianceGrid System
 """
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [category.assignee.email],
-                    fail_silently=False,
-                )
+                queue_email(subject, message, [category.assignee.email])
             except Exception as e:
-                logger.error(f"Failed to send email notification to assignee: {str(e)}", exc_info=True)
+                logger.error(f"Failed to queue email notification to assignee: {str(e)}", exc_info=True)
         
         serializer = EvidenceSubmissionSerializer(submission)
         return Response(serializer.data)
@@ -1277,9 +1079,14 @@ ComplianceGrid System
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
         """Get dashboard statistics with gap analysis"""
-        # Automatically create due date notifications
-        create_due_date_notifications()
-        
+        # Served from the snapshot cache; model signals invalidate it on changes
+        data, hit = get_snapshot('dashboard', self._dashboard_stats)
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+    
+    def _dashboard_stats(self):
+        """Compute the dashboard statistics payload"""
         today = timezone.now().date()
         start_of_month = today.replace(day=1)
         
@@ -1320,13 +1127,8 @@ ComplianceGrid System
         controls_with_overdue = active_categories.filter(id__in=overdue_category_ids).count()
         
         # Controls with low compliance (below 50%)
-        # Calculate compliance scores efficiently
-        controls_with_low_compliance = 0
-        categories_with_scores = active_categories.prefetch_related('submissions__files')
-        for category in categories_with_scores:
-            score = category.calculate_compliance_score()
-            if score < 50:
-                controls_with_low_compliance += 1
+        ensure_compliance_states(active_categories)
+        controls_with_low_compliance = active_categories.filter(compliance_state__score__lt=50).count()
         
         # Controls pending approval
         pending_approval_submissions = EvidenceSubmission.objects.filter(
@@ -1360,403 +1162,200 @@ ComplianceGrid System
             'upcoming_deadlines': upcoming_deadlines
         })
         
-        return Response(serializer.data)
+        return serializer.data
     
     @action(detail=False, methods=['get'])
     def analytics(self, request):
         """Get comprehensive analytics data for the compliance dashboard"""
-        from collections import defaultdict
-        from django.db.models import Avg, Count, Q, F, Sum
-        
-        # Automatically create due date notifications
-        create_due_date_notifications()
-        
-        today = timezone.now().date()
-        start_of_month = today.replace(day=1)
-        six_months_ago = today - timedelta(days=180)
-        
         # Filter by user assignments if requested
         my_assignments_only = request.query_params.get('my_assignments', 'false') == 'true'
-        active_categories = EvidenceCategory.objects.filter(is_active=True)
-        
-        if my_assignments_only and request.user.is_authenticated:
-            active_categories = active_categories.filter(assignee=request.user)
-        
-        # ========== ACTION REQUIRED ==========
-        # Overdue submissions with aging
-        overdue_submissions = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.PENDING,
-            due_date__lt=today
-        )
-        if my_assignments_only and request.user.is_authenticated:
-            overdue_submissions = overdue_submissions.filter(category__assignee=request.user)
-        
-        overdue_count = overdue_submissions.count()
-        
-        # Calculate aging buckets
-        overdue_aging = {
-            '1_7_days': overdue_submissions.filter(
-                due_date__gte=today - timedelta(days=7)
-            ).count(),
-            '8_30_days': overdue_submissions.filter(
-                due_date__gte=today - timedelta(days=30),
-                due_date__lt=today - timedelta(days=7)
-            ).count(),
-            'over_30_days': overdue_submissions.filter(
-                due_date__lt=today - timedelta(days=30)
-            ).count()
-        }
-        
-        # My assignments awaiting submission
-        my_assignments_count = 0
-        if request.user.is_authenticated:
-            my_assignments_count = active_categories.filter(
-                assignee=request.user
-            ).filter(
-                submissions__status=EvidenceStatus.PENDING,
-                submissions__due_date__gte=today
-            ).distinct().count()
-        
-        # Pending approvals
-        pending_approvals = EvidenceSubmission.objects.filter(
-            status__in=[EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]
-        )
-        if my_assignments_only and request.user.is_authenticated:
-            pending_approvals = pending_approvals.filter(category__assignee=request.user)
-        pending_approvals_count = pending_approvals.count()
-        
-        # Controls with no evidence in 2+ review cycles
-        # This is a simplified check - controls without recent approved submissions
-        categories_with_recent_approved = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.APPROVED,
-            reviewed_at__gte=six_months_ago
-        ).values_list('category_id', flat=True).distinct()
-        no_evidence_count = active_categories.exclude(
-            id__in=categories_with_recent_approved
-        ).count()
-        
-        # Missing assignees/approvers
-        missing_assignees_count = active_categories.filter(assignee__isnull=True).count()
-        missing_approvers_count = active_categories.filter(approver__isnull=True).count()
-        
-        # ========== COMPLIANCE HEALTH ==========
-        # Calculate overall compliance score
-        total_score = 0
-        total_categories = 0
-        category_scores = []
-        
-        for category in active_categories.prefetch_related('submissions__files'):
-            score = category.calculate_compliance_score()
-            category_scores.append(score)
-            total_score += score
-            total_categories += 1
-        
-        overall_compliance_score = (total_score / total_categories * 100) if total_categories > 0 else 0
-        
-        # Calculate trend (simplified - compare with last month)
-        last_month_start = (start_of_month - timedelta(days=32)).replace(day=1)
-        last_month_end = start_of_month - timedelta(days=1)
-        
-        last_month_approved = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.APPROVED,
-            reviewed_at__gte=last_month_start,
-            reviewed_at__lte=last_month_end
-        ).count()
-        
-        this_month_approved = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.APPROVED,
-            reviewed_at__gte=start_of_month
-        ).count()
-        
-        if last_month_approved > 0:
-            trend_change = ((this_month_approved - last_month_approved) / last_month_approved) * 100
-            if trend_change > 5:
-                compliance_trend = 'up'
-            elif trend_change < -5:
-                compliance_trend = 'down'
-            else:
-                compliance_trend = 'stable'
-        else:
-            compliance_trend = 'stable'
-        
-        # Category group heatmap
-        category_groups = []
-        for group_code, group_label in CategoryGroup.choices:
-            group_categories = active_categories.filter(category_group=group_code)
-            group_total = group_categories.count()
-            
-            if group_total == 0:
-                continue
-            
-            # Calculate group compliance
-            group_score_sum = 0
-            group_overdue = 0
-            group_at_risk = 0
-            group_compliant = 0
-            group_no_data = 0
-            
-            for cat in group_categories.prefetch_related('submissions__files'):
-                score = cat.calculate_compliance_score()
-                group_score_sum += score
-                
-                # Check if overdue
-                has_overdue = cat.submissions.filter(
-                    status=EvidenceStatus.PENDING,
-                    due_date__lt=today
-                ).exists()
-                
-                if has_overdue:
-                    group_overdue += 1
-                
-                if score >= 80:
-                    group_compliant += 1
-                elif score >= 50:
-                    group_at_risk += 1
-                else:
-                    group_no_data += 1
-            
-            group_compliance = (group_score_sum / group_total) if group_total > 0 else 0
-            
-            category_groups.append({
-                'group_code': group_code,
-                'group_label': group_label,
-                'total_controls': group_total,
-                'compliance_score': round(group_compliance, 1),
-                'overdue_count': group_overdue,
-                'at_risk_count': group_at_risk,
-                'compliant_count': group_compliant,
-                'no_data_count': group_no_data
-            })
+        # p50/p90 approval times are opt-in
+        percentiles = request.query_params.get('percentiles', 'false') == 'true'
+        
+        def build():
+            analytics_data = build_analytics(
+                request.user,
+                my_assignments_only=my_assignments_only,
+                percentiles=percentiles
+            )
+            return AnalyticsSerializer(analytics_data).data
         
-        # At-risk controls count
-        at_risk_controls_count = sum(1 for score in category_scores if 50 <= score < 80)
+        # my_assignments_count is per user even when not filtering, so the user is always part of the scope
+        scope = f'analytics:{request.user.id}:{my_assignments_only}:{percentiles}'
+        data, hit = get_snapshot(scope, build)
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """Hit/miss counters of the dashboard/analytics snapshot cache"""
+        return Response(snapshot_stats())
+
+
+class TusOptionsMixin:
+    """Answers tus OPTIONS requests, which clients send to discover what the server supports"""
+    
+    def options(self, request, *args, **kwargs):
+        """tus discovery: protocol version, extensions and maximum size"""
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=tus_headers(**{
+            'Tus-Version': TUS_VERSION,
+            'Tus-Extension': TUS_EXTENSIONS,
+            'Tus-Max-Size': str(settings.EVIDENCE_UPLOAD_MAX_SIZE),
+        }))
+
+
+class EvidenceUploadCreateView(TusOptionsMixin, APIView):
+    """
+    tus (https://tus.io) creation endpoint for evidence uploads.
+    
+    POST with Upload-Length and Upload-Metadata carrying `submission` (its id), `filename`
+    and optionally `filetype`. The Location of the new upload is relative to this URL. Once
+    all bytes have arrived the upload is attached with submissions/<id>/commit_uploads/.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        error_response = tus_version_error(request)
+        if error_response:
+            return error_response
         
-        # ========== WHAT'S DUE NEXT ==========
-        upcoming_7 = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.PENDING,
-            due_date__gte=today,
-            due_date__lte=today + timedelta(days=7)
-        )
-        upcoming_14 = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.PENDING,
-            due_date__gte=today,
-            due_date__lte=today + timedelta(days=14)
-        )
-        upcoming_30 = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.PENDING,
-            due_date__gte=today,
-            due_date__lte=today + timedelta(days=30)
+        try:
+            metadata = parse_upload_metadata(request.headers.get('Upload-Metadata'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST, headers=tus_headers())
+        if not metadata.get('submission', '').isdigit():
+            return Response(
+                {'error': 'Upload-Metadata must include the submission id.'},
+                status=status.HTTP_400_BAD_REQUEST,
+                headers=tus_headers()
+            )
+        submission = EvidenceSubmission.objects.select_related('category').filter(id=metadata['submission']).first()
+        if submission is None:
+            return Response({'error': 'Submission not found.'}, status=status.HTTP_404_NOT_FOUND)
+        error_response = submit_error(submission)
+        if error_response:
+            return error_response
+        
+        upload_length = request.headers.get('Upload-Length')
+        try:
+            upload = create_upload(
+                submission,
+                request.user,
+                filename=upload_filename(metadata.get('filename')),
+                size=upload_length if upload_length is not None else '',
+                content_type=metadata.get('filetype', '')
+            )
+        except ValueError as e:
+            too_large = str(upload_length).isdigit() and int(upload_length) > settings.EVIDENCE_UPLOAD_MAX_SIZE
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if too_large else status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            upload_state(upload),
+            status=status.HTTP_201_CREATED,
+            headers=tus_headers(upload, Location=f'{upload.id}/')
         )
-        
-        if my_assignments_only and request.user.is_authenticated:
-            upcoming_7 = upcoming_7.filter(category__assignee=request.user)
-            upcoming_14 = upcoming_14.filter(category__assignee=request.user)
-            upcoming_30 = upcoming_30.filter(category__assignee=request.user)
-        
-        due_next_7_days = upcoming_7.count()
-        due_next_14_days = upcoming_14.count()
-        due_next_30_days = upcoming_30.count()
-        
-        # Group by review period
-        upcoming_deadlines_by_period = defaultdict(int)
-        upcoming_deadlines_list = []
-        
-        for submission in upcoming_30.select_related('category', 'category__assignee').order_by('due_date')[:50]:
-            period = submission.category.review_period
-            upcoming_deadlines_by_period[period] += 1
-            
-            days_until = (submission.due_date - today).days
-            upcoming_deadlines_list.append({
-                'control_id': submission.category.id,
-                'control_name': submission.category.name,
-                'due_date': submission.due_date,
-                'days_until_due': days_until,
-                'review_period': period,
-                'assignee_name': (
-                    f"{submission.category.assignee.first_name} {submission.category.assignee.last_name}".strip()
-                    if submission.category.assignee and (submission.category.assignee.first_name or submission.category.assignee.last_name)
-                    else (submission.category.assignee.username if submission.category.assignee else None)
-                ),
-                'status': submission.status
-            })
-        
-        # ========== WORKFLOW EFFICIENCY ==========
-        # Average approval time
-        approved_submissions = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.APPROVED,
-            reviewed_at__isnull=False,
-            submitted_at__isnull=False
+
+
+class EvidenceUploadView(TusOptionsMixin, APIView):
+    """
+    Receives the bytes of a direct upload (see EvidenceSubmissionViewSet.create_upload).
+    
+    GET reports how many bytes have arrived. PUT sends the file as raw bytes, either whole
+    or in parts with a `Content-Range: bytes <first>-<last>/<size>` header. Each part is
+    a short request, and after a dropped connection the upload carries on from `offset`.
+    
+    The same upload also speaks tus: HEAD for the offset, PATCH to append at Upload-Offset
+    and DELETE to abandon it.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(
+            EvidenceUpload, id=upload_id, created_by=request.user, expires_at__gt=timezone.now()
         )
+    
+    def get(self, request, upload_id):
+        return Response(upload_state(self.get_upload(request, upload_id)))
+    
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        
+        offset = 0
+        content_range = request.headers.get('Content-Range')
+        if content_range:
+            match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range.strip())
+            if (not match or int(match.group(2)) - int(match.group(1)) + 1 != length
+                    or match.group(3) not in ('*', str(upload.size))):
+                return Response(
+                    {'error': 'Content-Range must be "bytes <first>-<last>/<size>" matching the body and the file size.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            offset = int(match.group(1))
         
-        if approved_submissions.exists():
-            approval_times = []
-            for sub in approved_submissions:
-                if sub.submitted_at and sub.reviewed_at:
-                    delta = sub.reviewed_at - sub.submitted_at
-                    approval_times.append(delta.total_seconds() / 3600)  # Convert to hours
-            
-            average_approval_time_hours = sum(approval_times) / len(approval_times) if approval_times else None
-        else:
-            average_approval_time_hours = None
-        
-        # Rejection rate
-        total_reviewed = EvidenceSubmission.objects.filter(
-            status__in=[EvidenceStatus.APPROVED, EvidenceStatus.REJECTED],
-            reviewed_at__isnull=False
-        ).count()
-        
-        rejected_count = EvidenceSubmission.objects.filter(
-            status=EvidenceStatus.REJECTED
-        ).count()
-        
-        rejection_rate = (rejected_count / total_reviewed * 100) if total_reviewed > 0 else 0
-        
-        # Submission trends (last 6 months)
-        submission_trends = []
-        for i in range(6):
-            month_start = (today - timedelta(days=30 * i)).replace(day=1)
-            if i == 0:
-                month_end = today
-            else:
-                next_month = month_start + timedelta(days=32)
-                month_end = next_month.replace(day=1) - timedelta(days=1)
-            
-            count = EvidenceSubmission.objects.filter(
-                submitted_at__gte=month_start,
-                submitted_at__lte=month_end
-            ).count()
-            
-            submission_trends.append({
-                'month': month_start.strftime('%Y-%m'),
-                'count': count
-            })
-        
-        submission_trends.reverse()
-        
-        # Bottleneck approvers (approvers with most pending)
-        approver_bottlenecks = EvidenceSubmission.objects.filter(
-            status__in=[EvidenceStatus.SUBMITTED, EvidenceStatus.UNDER_REVIEW]
-        ).values('category__approver__username', 'category__approver__first_name').annotate(
-            pending_count=Count('id')
-        ).order_by('-pending_count')[:5]
-        
-        bottleneck_approvers = [
-            {
-                'username': item['category__approver__username'] or 'Unassigned',
-                'name': item['category__approver__first_name'] or 'Unassigned',
-                'pending_count': item['pending_count']
-            }
-            for item in approver_bottlenecks
-        ]
-        
-        # ========== RISK & GAP ANALYSIS ==========
-        priority_issues = []
-        priority = 1
-        
-        # Controls with no evidence
-        for category in active_categories.filter(
-            id__in=active_categories.exclude(
-                id__in=EvidenceSubmission.objects.filter(
-                    status=EvidenceStatus.APPROVED,
-                    reviewed_at__gte=six_months_ago
-                ).values_list('category_id', flat=True)
+        try:
+            append_part(upload, request.stream or BytesIO(), offset, length)
+        except UploadOffsetError as e:
+            return Response(
+                {'error': str(e), 'offset': e.expected_offset},
+                status=status.HTTP_409_CONFLICT
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(upload_state(upload))
+    
+    def head(self, request, upload_id):
+        error_response = tus_version_error(request)
+        if error_response:
+            return error_response
+        upload = self.get_upload(request, upload_id)
+        return Response(status=status.HTTP_200_OK, headers=tus_headers(upload))
+    
+    def patch(self, request, upload_id):
+        error_response = tus_version_error(request)
+        if error_response:
+            return error_response
+        upload = self.get_upload(request, upload_id)
+        if request.META.get('CONTENT_TYPE', '').split(';')[0].strip() != 'application/offset+octet-stream':
+            return Response(
+                {'error': 'Content-Type must be application/offset+octet-stream.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                headers=tus_headers()
+            )
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset is required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+                headers=tus_headers()
             )
-        )[:10]:
-            score = category.calculate_compliance_score()
-            priority_issues.append({
-                'priority': priority,
-                'control_id': category.id,
-                'control_name': category.name,
-                'status': 'NO_EVIDENCE',
-                'days_overdue': None,
-                'assignee_name': (
-                    f"{category.assignee.first_name} {category.assignee.last_name}".strip()
-                    if category.assignee and (category.assignee.first_name or category.assignee.last_name)
-                    else (category.assignee.username if category.assignee else None)
-                ),
-                'assignee_id': category.assignee.id if category.assignee else None,
-                'issue_type': 'No evidence submitted recently',
-                'compliance_score': score
-            })
-            priority += 1
-        
-        # Controls without assignees
-        for category in active_categories.filter(assignee__isnull=True)[:5]:
-            priority_issues.append({
-                'priority': priority,
-                'control_id': category.id,
-                'control_name': category.name,
-                'status': 'NO_ASSIGNEE',
-                'days_overdue': None,
-                'assignee_name': None,
-                'assignee_id': None,
-                'issue_type': 'No assignee assigned',
-                'compliance_score': category.calculate_compliance_score()
-            })
-            priority += 1
-        
-        # Overdue controls
-        overdue_categories = active_categories.filter(
-            id__in=EvidenceSubmission.objects.filter(
-                status=EvidenceStatus.PENDING,
-                due_date__lt=today
-            ).values_list('category_id', flat=True)
-        ).distinct()[:10]
-        
-        for category in overdue_categories:
-            overdue_sub = category.submissions.filter(
-                status=EvidenceStatus.PENDING,
-                due_date__lt=today
-            ).order_by('due_date').first()
-            
-            if overdue_sub:
-                days_overdue = (today - overdue_sub.due_date).days
-                priority_issues.append({
-                    'priority': priority,
-                    'control_id': category.id,
-                    'control_name': category.name,
-                    'status': 'OVERDUE',
-                    'days_overdue': days_overdue,
-                    'assignee_name': (
-                        f"{category.assignee.first_name} {category.assignee.last_name}".strip()
-                        if category.assignee and (category.assignee.first_name or category.assignee.last_name)
-                        else (category.assignee.username if category.assignee else None)
-                    ),
-                    'assignee_id': category.assignee.id if category.assignee else None,
-                    'issue_type': f'Overdue by {days_overdue} days',
-                    'compliance_score': category.calculate_compliance_score()
-                })
-                priority += 1
-        
-        # Sort by priority
-        priority_issues = sorted(priority_issues, key=lambda x: x['priority'])[:10]
-        
-        analytics_data = {
-            'overdue_count': overdue_count,
-            'overdue_aging': overdue_aging,
-            'my_assignments_count': my_assignments_count,
-            'pending_approvals_count': pending_approvals_count,
-            'no_evidence_count': no_evidence_count,
-            'missing_assignees_count': missing_assignees_count,
-            'missing_approvers_count': missing_approvers_count,
-            'overall_compliance_score': round(overall_compliance_score, 1),
-            'compliance_trend': compliance_trend,
-            'category_groups': category_groups,
-            'at_risk_controls_count': at_risk_controls_count,
-            'due_next_7_days': due_next_7_days,
-            'due_next_14_days': due_next_14_days,
-            'due_next_30_days': due_next_30_days,
-            'upcoming_deadlines_by_period': dict(upcoming_deadlines_by_period),
-            'upcoming_deadlines': upcoming_deadlines_list,
-            'average_approval_time_hours': round(average_approval_time_hours, 1) if average_approval_time_hours else None,
-            'rejection_rate': round(rejection_rate, 1),
-            'submission_trends': submission_trends,
-            'bottleneck_approvers': bottleneck_approvers,
-            'priority_issues': priority_issues
-        }
         
-        serializer = AnalyticsSerializer(analytics_data)
-        return Response(serializer.data)
+        try:
+            append_part(upload, request.stream or BytesIO(), offset, length)
+        except UploadOffsetError as e:
+            return Response(
+                {'error': str(e), 'offset': e.expected_offset},
+                status=status.HTTP_409_CONFLICT,
+                headers=tus_headers(upload)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST, headers=tus_headers())
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=tus_headers(upload))
+    
+    def delete(self, request, upload_id):
+        error_response = tus_version_error(request)
+        if error_response:
+            return error_response
+        self.get_upload(request, upload_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=tus_headers())
 
 
 # CSRF-exempt login view using APIView
@@ -2090,6 +1689,8 @@ class GoogleAuthView(viewsets.ViewSet):
         # Store Google access token in session
         request.session['google_access_token'] = access_token
         request.session['google_user_info'] = user_info
+        # ...and for background Drive work (upload worker)
+        store_drive_credential(user, access_token)
         
         # Login user
         login(request, user)
@@ -2255,6 +1856,9 @@ class GoogleOAuthCallbackView(APIView):
             # Return current user (either newly logged in or existing)
             current_user = request.user if request.user.is_authenticated else user
             
+            # Keep the tokens for background Drive work (upload worker)
+            store_drive_credential(current_user, access_token, refresh_token, token_json.get('expires_in'))
+            
             # Set CSRF token in response for subsequent requests
             from django.middleware.csrf import get_token
             csrf_token = get_token(request)
@@ -2387,78 +1991,21 @@ class EvidenceFileViewSet(viewsets.ReadOnlyModelViewSet):
         evidence_file.review_notes = review_notes
         evidence_file.save()
         
-        # Upload file to Google Drive after approval
-        category = evidence_file.submission.category
-        upload_errors = []
-        uploaded = False
-        
-        if category.google_drive_folder_id:
-            access_token = request.session.get('google_access_token')
-            refresh_token = request.session.get('google_refresh_token')
-            
-            if not access_token:
-                # Try to get token from any user's session
-                from django.contrib.sessions.models import Session
-                recent_sessions = Session.objects.filter(expire_date__gte=timezone.now())
-                for session in recent_sessions:
-                    try:
-                        session_data = session.get_decoded()
-                        if 'google_access_token' in session_data:
-                            access_token = session_data['google_access_token']
-                            refresh_token = session_data.get('google_refresh_token')
-                            break
-                    except Exception:
-                        continue
-            
-            if access_token:
-                try:
-                    drive_service = GoogleDriveService(access_token=access_token, refresh_token=refresh_token)
-                    
-                    # Only upload if not already uploaded
-                    if not evidence_file.google_drive_file_id and evidence_file.file:
-                        try:
-                            # Read file content
-                            evidence_file.file.open('rb')
-                            file_content = evidence_file.file.read()
-                            evidence_file.file.close()
-                            
-                            # Upload to Google Drive
-                            drive_result = drive_service.upload_file(
-                                file_content=file_content,
-                                filename=evidence_file.filename,
-                                folder_id=category.google_drive_folder_id,
-                                mime_type=evidence_file.mime_type
-                            )
-                            
-                            # Store Google Drive file info
-                            evidence_file.google_drive_file_id = drive_result['file_id']
-                            evidence_file.google_drive_file_url = drive_result['web_url']
-                            evidence_file.save()
-                            uploaded = True
-                        except Exception as e:
-                            error_msg = f"Failed to upload {evidence_file.filename} to Google Drive: {str(e)}"
-                            logger.error(error_msg, exc_info=True)
-                            upload_errors.append(error_msg)
-                    elif evidence_file.google_drive_file_id:
-                        uploaded = True  # Already uploaded
-                except Exception as e:
-                    error_msg = f"Failed to initialize Google Drive service: {str(e)}"
-                    logger.error(error_msg, exc_info=True)
-                    upload_errors.append(error_msg)
-            else:
-                upload_errors.append("Google Drive not authenticated. Please authenticate Google Drive first.")
-        else:
-            upload_errors.append("Google Drive folder not configured for this category.")
+        # The file is uploaded to Google Drive in the background
+        queued_uploads, upload_errors = queue_drive_uploads(evidence_file.submission.category, [evidence_file])
         
         serializer = EvidenceFileSerializer(evidence_file, context={'request': request})
         response_data = serializer.data
         
         # Add upload status to response
-        if uploaded:
-            response_data['upload_status'] = 'File approved and uploaded to Google Drive successfully.'
         if upload_errors:
             response_data['upload_errors'] = upload_errors
-            response_data['upload_warning'] = 'File approved, but could not be uploaded to Google Drive.'
+            response_data['upload_warning'] = 'File approved, but could not be queued for upload to Google Drive.'
+        elif queued_uploads > 0:
+            response_data['drive_upload_status'] = 'queued'
+            response_data['upload_status'] = 'File approved and queued for upload to Google Drive.'
+        else:
+            response_data['upload_status'] = 'File approved. It is already on Google Drive.'
         
         return Response(response_data)
     
@@ -2511,15 +2058,9 @@ Please review the comments, make necessary corrections, and resubmit your eviden
 Best regards,
 ComplianceGrid System
 """
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [category.assignee.email],
-                    fail_silently=False,
-                )
+                queue_email(subject, message, [category.assignee.email])
             except Exception as e:
-                logger.error(f"Failed to send email notification to assignee: {str(e)}", exc_info=True)
+                logger.error(f"Failed to queue email notification to assignee: {str(e)}", exc_info=True)
         
         serializer = EvidenceFileSerializer(evidence_file, context={'request': request})
         return Response(serializer.data)
@@ -2535,9 +2076,6 @@ class NotificationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Get notifications for the current user or all users if no user specified"""
-        # Automatically create due date notifications when checking notifications
-        create_due_date_notifications()
-        
         queryset = Notification.objects.select_related('user', 'category', 'submission').all()
         
         # Filter by user if provided
@@ -2550,80 +2088,13 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if is_read is not None:
             queryset = queryset.filter(is_read=is_read.lower() == 'true')
         
-        return queryset.order_by('-created_at')
+        # Newest first by when they last applied, so a recurring alert comes back to the top
+        return queryset.order_by('-last_seen_at', '-id')
     
     @action(detail=False, methods=['get'], url_path='generate')
     def generate_notifications(self, request):
         """Generate notifications for due dates and approvals"""
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        today = timezone.now().date()
-        three_days_from_now = today + timedelta(days=3)
-        
-        notifications_created = 0
-        
-        # Get all active categories with pending/submitted submissions
-        categories = EvidenceCategory.objects.filter(is_active=True).select_related(
-            'assignee', 'approver'
-        ).prefetch_related('submissions')
-        
-        for category in categories:
-            # Get current submission
-            current_submission = category.submissions.filter(
-                status__in=['PENDING', 'SUBMITTED', 'UNDER_REVIEW']
-            ).order_by('-due_date').first()
-            
-            if not current_submission:
-                continue
-            
-            # Notifications for assignees - due dates
-            if category.assignee:
-                days_until_due = (current_submission.due_date - today).days
-                
-                if days_until_due < 0:
-                    # Overdue
-                    notification, created = Notification.objects.get_or_create(
-                        user=category.assignee,
-                        notification_type='OVERDUE',
-                        category=category,
-                        submission=current_submission,
-                        defaults={
-                            'title': f'Overdue: {category.name}',
-                            'message': f'The submission for {category.name} is overdue by {abs(days_until_due)} day(s).',
-                        }
-                    )
-                    if created:
-                        notifications_created += 1
-                elif days_until_due <= 3:
-                    # Due soon
-                    notification, created = Notification.objects.get_or_create(
-                        user=category.assignee,
-                        notification_type='DUE_SOON',
-                        category=category,
-                        submission=current_submission,
-                        defaults={
-                            'title': f'Due Soon: {category.name}',
-                            'message': f'The submission for {category.name} is due in {days_until_due} day(s).',
-                        }
-                    )
-                    if created:
-                        notifications_created += 1
-            
-            # Notifications for approvers - pending approvals
-            if category.approver and current_submission.status in ['SUBMITTED', 'UNDER_REVIEW']:
-                notification, created = Notification.objects.get_or_create(
-                    user=category.approver,
-                    notification_type='PENDING_APPROVAL',
-                    category=category,
-                    submission=current_submission,
-                    defaults={
-                        'title': f'Pending Approval: {category.name}',
-                        'message': f'Submission for {category.name} is waiting for your approval.',
-                    }
-                )
-                if created:
-                    notifications_created += 1
+        notifications_created = len(generate_submission_notifications())
         
         return Response({
             'message': f'Generated {notifications_created} notifications',
@@ -2646,6 +2117,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
             return Response({'error': 'user_id is required'}, status=400)
         
         updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+        # update() sends no signals - wake the user's notification streams explicitly
+        touch_notifications([user_id])
         return Response({'message': f'Marked {updated} notifications as read'})
     
     @action(detail=False, methods=['get'], url_path='unread-count')
@@ -2655,5 +2128,51 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if not user_id:
             return Response({'error': 'user_id is required'}, status=400)
         
-        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
-        return Response({'unread_count': count})
+        # Conditional GET for clients that poll instead of using the stream
+        state = unread_state(user_id)
+        etag = f'"{user_id}-{state["unread_count"]}-{state["latest_id"] or 0}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({
+                'unread_count': state['unread_count'],
+                # Whether notifications/stream/ is served; clients poll this endpoint otherwise
+                'stream': notification_stream_available(request._request),
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+def notification_stream_available(request):
+    """
+    The notification stream is only served under ASGI, where an idle stream holds no
+    thread. Under WSGI each open tab would tie up a worker, so clients poll instead.
+    """
+    return settings.NOTIFICATION_STREAM_ENABLED and isinstance(request, ASGIRequest)
+
+
+def notification_stream(request):
+    """
+    Server-Sent Events stream of new notifications and unread counts for the logged-in user.
+    
+    Served by an async generator, only under ASGI (see notification_stream_available). The
+    stream closes after a few minutes and EventSource reconnects, resuming from Last-Event-ID.
+    """
+    if not notification_stream_available(request):
+        return JsonResponse({'error': 'Notification stream is not available, poll unread-count instead'}, status=404)
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    
+    stream = NotificationStream(request.user.id, last_id)
+    response = StreamingHttpResponse(stream.async_events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,21 @@
+"""
+ASGI config for evidence_collection project.
+
+Serve with an ASGI server (e.g. uvicorn evidence_collection.asgi:application, as
+start-servers.ps1 does) so long-lived notification streams don't each hold a worker
+thread. The notification stream is only offered under ASGI.
+"""
+
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'evidence_collection.settings')
+
+application = get_asgi_application()
+
+# Serve static files in development, as runserver does
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
@@ -148,6 +148,28 @@ else:
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache (dashboard/analytics snapshots)
+# Local memory by default; set CACHE_DIR to a shared directory so all worker processes
+# on the host see the same snapshots and invalidations
+CACHE_DIR = os.environ.get('CACHE_DIR', '')
+if CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'compliancegrid',
+        }
+    }
+
+# Seconds a dashboard snapshot may be served before it is rebuilt, even without changes
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', '300'))
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -182,6 +204,7 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
+    'HEAD',
     'OPTIONS',
     'PATCH',
     'POST',
@@ -199,6 +222,24 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    # Direct/resumable evidence uploads (uploads/<id>/)
+    'content-range',
+    'tus-resumable',
+    'upload-length',
+    'upload-metadata',
+    'upload-offset',
+]
+
+# Let browser tus clients read the upload state from responses
+CORS_EXPOSE_HEADERS = [
+    'location',
+    'tus-resumable',
+    'tus-version',
+    'tus-extension',
+    'tus-max-size',
+    'upload-expires',
+    'upload-length',
+    'upload-offset',
 ]
 
 # CSRF settings - allow requests from frontend
@@ -223,7 +264,11 @@ CSRF_COOKIE_SAMESITE = 'Lax'  # Allow cross-site requests for development
 CSRF_COOKIE_SECURE = True  # Set to True in production with HTTPS
 
 # Email configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Emails are queued and sent by manage.py email_worker. For local work, use
+# django.core.mail.backends.filebased.EmailBackend (writes to EMAIL_FILE_PATH) or
+# django.core.mail.backends.console.EmailBackend instead of a real mail server
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', str(BASE_DIR / 'sent_emails'))
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
@@ -231,14 +276,64 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@compliancegrid.com')
 
+# send_reminders sends each person one email listing all their reminders rather than one
+# email per submission (override per run with --digest / --no-digest)
+REMINDER_DIGEST = os.environ.get('REMINDER_DIGEST', 'False') == 'True'
+
+# Push notifications to the browser over Server-Sent Events. Only served when running under
+# an ASGI server (start-servers.ps1 runs uvicorn); under WSGI clients poll unread-count
+NOTIFICATION_STREAM_ENABLED = os.environ.get('NOTIFICATION_STREAM_ENABLED', 'True') == 'True'
+
+# Notification retention (manage.py prune_notifications): read notifications not seen for
+# this many days are moved to the archive table, this many rows per transaction
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', '90'))
+NOTIFICATION_ARCHIVE_BATCH_SIZE = int(os.environ.get('NOTIFICATION_ARCHIVE_BATCH_SIZE', '1000'))
+
+# Outgoing email queue (manage.py email_worker)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '8'))
+# Retry delay doubles after each failed attempt: 1m, 2m, 4m, ... up to an hour
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_OUTBOX_RETRY_BASE_SECONDS', '60'))
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get('EMAIL_OUTBOX_RETRY_MAX_SECONDS', '3600'))
+# How long a worker holds a claimed email; one still unsent after this is picked up again
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.environ.get('EMAIL_OUTBOX_LEASE_SECONDS', '300'))
+
 # Google Drive API settings
 GOOGLE_DRIVE_CLIENT_ID = os.environ.get('GOOGLE_DRIVE_CLIENT_ID', '')
 GOOGLE_DRIVE_CLIENT_SECRET = os.environ.get('GOOGLE_DRIVE_CLIENT_SECRET', '')
 # Must match frontend URL where OAuth callback is served (e.g. https://your-app.com/login/callback in production)
 GOOGLE_DRIVE_REDIRECT_URI = os.environ.get('GOOGLE_DRIVE_REDIRECT_URI', 'http://localhost:3000/login/callback')
 GOOGLE_DRIVE_SCOPES = ['openid', 'email', 'profile', 'https://www.googleapis.com/auth/drive.file']
+# Optional path to a Drive v3 discovery document (JSON); by default the copy bundled with
+# google-api-python-client is used, so building a client never fetches it over the network
+GOOGLE_DRIVE_DISCOVERY_DOCUMENT = os.environ.get('GOOGLE_DRIVE_DISCOVERY_DOCUMENT', '')
+# Drive uploads are sent in resumable chunks of this size (must be a multiple of 256 KB)
+GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE = int(os.environ.get('GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+# Retries of a failed chunk (with backoff) before the upload gives up
+GOOGLE_DRIVE_UPLOAD_CHUNK_RETRIES = int(os.environ.get('GOOGLE_DRIVE_UPLOAD_CHUNK_RETRIES', '3'))
+
+# Keys for encrypted model fields (stored Google tokens), comma separated, newest first.
+# Generate one with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+# If unset, a key is derived from SECRET_KEY (so changing SECRET_KEY makes stored tokens unreadable)
+FIELD_ENCRYPTION_KEYS = [key for key in os.environ.get('FIELD_ENCRYPTION_KEYS', '').split(',') if key]
+
+# Background Drive uploads (manage.py drive_worker)
+DRIVE_UPLOAD_WORKERS = int(os.environ.get('DRIVE_UPLOAD_WORKERS', '4'))  # Upload threads per worker process
+DRIVE_UPLOAD_MAX_ATTEMPTS = int(os.environ.get('DRIVE_UPLOAD_MAX_ATTEMPTS', '8'))
+# Retry delay doubles after each failed attempt: 30s, 1m, 2m, ... up to an hour
+DRIVE_UPLOAD_RETRY_BASE_SECONDS = int(os.environ.get('DRIVE_UPLOAD_RETRY_BASE_SECONDS', '30'))
+DRIVE_UPLOAD_RETRY_MAX_SECONDS = int(os.environ.get('DRIVE_UPLOAD_RETRY_MAX_SECONDS', '3600'))
+# How long a worker holds a job; a job still running after this is picked up again
+DRIVE_UPLOAD_LEASE_SECONDS = int(os.environ.get('DRIVE_UPLOAD_LEASE_SECONDS', '900'))
 
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Evidence uploads are written here while they arrive (hashed on the way); keep it on the same
+# filesystem as MEDIA_ROOT so storing a file is a rename rather than a second copy
+EVIDENCE_UPLOAD_TEMP_DIR = os.environ.get('EVIDENCE_UPLOAD_TEMP_DIR', str(MEDIA_ROOT / 'uploads_tmp'))
+# Files uploaded in parts (upload slot -> parts -> commit) may be up to this size
+EVIDENCE_UPLOAD_MAX_SIZE = int(os.environ.get('EVIDENCE_UPLOAD_MAX_SIZE', str(2 * 1024 * 1024 * 1024)))
+# Unfinished part uploads are discarded after this long without a new part
+EVIDENCE_UPLOAD_EXPIRY_HOURS = int(os.environ.get('EVIDENCE_UPLOAD_EXPIRY_HOURS', '24'))
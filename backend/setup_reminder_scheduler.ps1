@@ -1,5 +1,5 @@
 # ComplianceGrid - Setup Email Reminder Scheduler
-# This script sets up a Windows Scheduled Task to run send_reminders daily
+# This script sets up a Windows Scheduled Task to run generate_submissions and send_reminders daily
 
 Write-Host "=== ComplianceGrid Email Reminder Scheduler Setup ===" -ForegroundColor Cyan
 
@@ -35,7 +35,7 @@ Write-Host "Python found: $pythonPath" -ForegroundColor Green
 
 # Task configuration
 $taskName = "ComplianceGrid Daily Reminders"
-$taskDescription = "Sends email reminders to assignees 1 day before and 1 day after due dates"
+$taskDescription = "Opens new review periods, then sends email reminders to assignees 1 day before and 1 day after due dates"
 
 # Check if task already exists
 $existingTask = Get-ScheduledTask -TaskName $taskName -ErrorAction SilentlyContinue
@@ -70,8 +70,13 @@ try {
 
 Write-Host "`nCreating scheduled task..." -ForegroundColor Cyan
 
-# Create the action (what to run)
-$action = New-ScheduledTaskAction -Execute $pythonPath -Argument "manage.py send_reminders" -WorkingDirectory $backendPath
+# Create the actions (what to run, in order): open the review periods that are due, send reminders,
+# then rebuild the compliance state to catch bulk edits that bypassed the model signals
+$action = @(
+    (New-ScheduledTaskAction -Execute $pythonPath -Argument "manage.py generate_submissions" -WorkingDirectory $backendPath),
+    (New-ScheduledTaskAction -Execute $pythonPath -Argument "manage.py send_reminders" -WorkingDirectory $backendPath),
+    (New-ScheduledTaskAction -Execute $pythonPath -Argument "manage.py refresh_compliance_state" -WorkingDirectory $backendPath)
+)
 
 # Create the trigger (when to run - daily at specified time)
 $trigger = New-ScheduledTaskTrigger -Daily -At $timeString
@@ -90,7 +95,9 @@ try {
     Write-Host "`nTask Details:" -ForegroundColor Cyan
     Write-Host "  Name: $taskName" -ForegroundColor White
     Write-Host "  Schedule: Daily at $timeString" -ForegroundColor White
-    Write-Host "  Command: $pythonPath manage.py send_reminders" -ForegroundColor White
+    Write-Host "  Commands: $pythonPath manage.py generate_submissions" -ForegroundColor White
+    Write-Host "            $pythonPath manage.py send_reminders" -ForegroundColor White
+    Write-Host "            $pythonPath manage.py refresh_compliance_state" -ForegroundColor White
     Write-Host "  Working Directory: $backendPath" -ForegroundColor White
     
     Write-Host "`nTo verify the task:" -ForegroundColor Yellow
@@ -99,7 +106,9 @@ try {
     
     Write-Host "`nTo test the task manually:" -ForegroundColor Yellow
     Write-Host "  cd $backendPath" -ForegroundColor Gray
+    Write-Host "  python manage.py generate_submissions" -ForegroundColor Gray
     Write-Host "  python manage.py send_reminders" -ForegroundColor Gray
+    Write-Host "  python manage.py refresh_compliance_state" -ForegroundColor Gray
     
     Write-Host "`nTo run the task now:" -ForegroundColor Yellow
     Write-Host "  Start-ScheduledTask -TaskName '$taskName'" -ForegroundColor Gray
@@ -32,7 +32,8 @@ $backendJob = Start-Job -ScriptBlock {
     if (Test-Path "venv\Scripts\Activate.ps1") {
         & .\venv\Scripts\Activate.ps1
     }
-    python manage.py runserver
+    # ASGI server, so notification streams don't each tie up a worker thread (see evidence_collection/asgi.py)
+    python -m uvicorn evidence_collection.asgi:application --host 127.0.0.1 --port 8000 --reload
 }
 
 # Start Frontend  
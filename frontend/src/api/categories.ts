@@ -79,6 +79,8 @@ export interface Submission {
     file_url?: string;
     google_drive_file_id?: string;
     google_drive_file_url?: string;
+    drive_upload_status?: '' | 'QUEUED' | 'UPLOADING' | 'UPLOADED' | 'FAILED';
+    drive_upload_error?: string;
     file_size: number;
     mime_type: string;
     uploaded_at: string;
@@ -218,9 +220,8 @@ export const categoriesApi = {
     root_folder_id: string;
     categories_created?: number;
     categories_skipped?: number;
-    files_uploaded?: number;
-    files_failed?: number;
-    upload_errors?: string[];
+    folders_failed?: number;
+    files_queued?: number;
     folder_mapping: {
       security_folder_id: string;
       availability_folder_id: string;
@@ -233,7 +234,7 @@ export const categoriesApi = {
     return response.data;
   },
 
-  exportGroups: async (format: 'pdf' | 'excel', showHidden: boolean = false): Promise<Blob> => {
+  exportGroups: async (format: 'pdf' | 'excel' | 'csv', showHidden: boolean = false): Promise<Blob> => {
     const params: any = {
       format: format,
     };
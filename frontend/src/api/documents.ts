@@ -6,6 +6,8 @@ export interface Document {
   file_url?: string;
   google_drive_file_id?: string;
   google_drive_file_url?: string;
+  drive_upload_status?: '' | 'QUEUED' | 'UPLOADING' | 'UPLOADED' | 'FAILED';
+  drive_upload_error?: string;
   file_size: number;
   mime_type: string;
   uploaded_by: {
@@ -12,6 +12,8 @@ export interface Notification {
   submission_id: number | null;
   is_read: boolean;
   created_at: string;
+  occurrence_count: number;
+  last_seen_at: string;
 }
 
 export const notificationsApi = {
@@ -38,6 +40,14 @@ export const notificationsApi = {
     return response.data.unread_count;
   },
 
+  // Unread count, and whether the server offers the notification stream (only under ASGI)
+  getUnreadState: async (userId: number): Promise<{ unread_count: number; stream: boolean }> => {
+    const response = await apiClient.get('/notifications/unread-count/', {
+      params: { user_id: userId }
+    });
+    return response.data;
+  },
+
   markRead: async (notificationId: number): Promise<void> => {
     await apiClient.post(`/notifications/${notificationId}/mark-read/`);
   },
@@ -46,6 +56,11 @@ export const notificationsApi = {
     await apiClient.post('/notifications/mark-all-read/', { user_id: userId });
   },
 
+  // Server-Sent Events: `notification` (new Notification) and `unread_count` ({ unread_count }) events
+  openStream: (): EventSource => {
+    return new EventSource(`${apiClient.defaults.baseURL}/notifications/stream/`, { withCredentials: true });
+  },
+
   generate: async (): Promise<{ notifications_created: number }> => {
     const response = await apiClient.get('/notifications/generate/');
     return response.data;
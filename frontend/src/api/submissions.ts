@@ -16,6 +16,62 @@ export interface DashboardStats {
   upcoming_deadlines: Submission[];
 }
 
+export interface EvidenceUpload {
+  id: string;
+  filename: string;
+  size: number;
+  offset: number;
+  expires_at: string;
+  upload_path: string;
+}
+
+// Files larger than this are sent in parts through a direct upload instead of in the submit request
+const DIRECT_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+const UPLOAD_PART_SIZE = 8 * 1024 * 1024;
+
+// Attempts at a part before giving up, waiting 1s, 2s, 4s, ... in between
+const UPLOAD_PART_ATTEMPTS = 6;
+
+const wait = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Send a file's bytes to its upload slot part by part, carrying on from where the server is.
+// A dropped connection resumes from the bytes already received instead of starting over.
+const sendUploadParts = async (upload: EvidenceUpload, file: File): Promise<void> => {
+  let offset = upload.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    const end = Math.min(offset + UPLOAD_PART_SIZE, file.size);
+    try {
+      const response = await apiClient.put(upload.upload_path, file.slice(offset, end), {
+        headers: {
+          'Content-Type': 'application/octet-stream',
+          'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`,
+        },
+      });
+      offset = response.data.offset;
+      failures = 0;
+    } catch (error: any) {
+      const status = error.response?.status;
+      // The server is elsewhere in the file (e.g. a part arrived but its response was lost)
+      if (status === 409 && typeof error.response.data?.offset === 'number') {
+        offset = error.response.data.offset;
+        continue;
+      }
+      // Network errors and server hiccups are retried; anything else is final
+      failures += 1;
+      if ((status && status < 500) || failures >= UPLOAD_PART_ATTEMPTS) {
+        throw error;
+      }
+      await wait(1000 * 2 ** (failures - 1));
+      try {
+        offset = (await apiClient.get(upload.upload_path)).data.offset;
+      } catch {
+        // Still unreachable - the next attempt finds out where the upload is
+      }
+    }
+  }
+};
+
 export const submissionsApi = {
   getAll: async (params?: {
     category?: number;
@@ -40,6 +96,10 @@ export const submissionsApi = {
     notes?: string,
     dueDate?: string
   ): Promise<Submission> => {
+    if (files.some((file) => file.size > DIRECT_UPLOAD_THRESHOLD)) {
+      return submissionsApi.submitDirect(id, files, notes, dueDate);
+    }
+
     const formData = new FormData();
     files.forEach((file) => {
       formData.append('files', file);
@@ -59,8 +119,35 @@ export const submissionsApi = {
     return response.data;
   },
 
+  // Same as submit, but each file is uploaded on its own (in parts) before being attached
+  submitDirect: async (
+    id: number,
+    files: File[],
+    notes?: string,
+    dueDate?: string
+  ): Promise<Submission> => {
+    const uploadIds: string[] = [];
+    for (const file of files) {
+      const slot = await apiClient.post(`/submissions/${id}/uploads/`, {
+        filename: file.name,
+        size: file.size,
+        content_type: file.type,
+      });
+      await sendUploadParts(slot.data, file);
+      uploadIds.push(slot.data.id);
+    }
+
+    const response = await apiClient.post(`/submissions/${id}/commit_uploads/`, {
+      uploads: uploadIds,
+      notes: notes || undefined,
+      due_date: dueDate || undefined,
+    });
+    return response.data;
+  },
+
   approve: async (id: number, reviewNotes?: string): Promise<Submission & {
     upload_status?: string;
+    drive_upload_status?: 'queued';
     upload_warning?: string;
     upload_errors?: string[];
   }> => {
@@ -90,6 +177,7 @@ export const submissionsApi = {
   // File-level approval/rejection
   approveFile: async (fileId: number, reviewNotes?: string): Promise<any & {
     upload_status?: string;
+    drive_upload_status?: 'queued';
     upload_warning?: string;
     upload_errors?: string[];
   }> => {
@@ -18,16 +18,62 @@ export const Notifications: React.FC<NotificationsProps> = ({ userId }) => {
 
   useEffect(() => {
     if (userId) {
-      fetchNotifications();
-      fetchUnreadCount();
+      let stream: EventSource | null = null;
+      let interval: ReturnType<typeof setInterval> | null = null;
+      let cancelled = false;
+      
+      // Refresh every 30 seconds (unread-count answers 304 when nothing changed)
+      const startPolling = () => {
+        if (cancelled || interval) return;
+        interval = setInterval(() => {
+          fetchNotifications();
+          fetchUnreadCount();
+        }, 30000);
+      };
       
-      // Refresh every 30 seconds
-      const interval = setInterval(() => {
-        fetchNotifications();
-        fetchUnreadCount();
-      }, 30000);
+      fetchNotifications();
+      notificationsApi.getUnreadState(userId).then((state) => {
+        if (cancelled) return;
+        setUnreadCount(typeof state.unread_count === 'number' ? state.unread_count : 0);
+        
+        // Push updates over Server-Sent Events when the server offers them (ASGI deployments)
+        if (!state.stream || typeof EventSource === 'undefined') {
+          startPolling();
+          return;
+        }
+        let failures = 0;
+        stream = notificationsApi.openStream();
+        stream.addEventListener('open', () => {
+          failures = 0;
+        });
+        stream.addEventListener('notification', (event) => {
+          const notification: Notification = JSON.parse((event as MessageEvent).data);
+          setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+        });
+        stream.addEventListener('unread_count', (event) => {
+          setUnreadCount(JSON.parse((event as MessageEvent).data).unread_count);
+        });
+        stream.onerror = () => {
+          // EventSource reconnects by itself after the server ends the stream, but gives up
+          // on an error response (e.g. 401) and keeps retrying a server that is down -
+          // poll instead in both cases
+          failures += 1;
+          if (stream && (stream.readyState === EventSource.CLOSED || failures >= 3)) {
+            stream.close();
+            stream = null;
+            startPolling();
+          }
+        };
+      }).catch((error) => {
+        console.error('Error fetching unread count:', error);
+        startPolling();
+      });
       
-      return () => clearInterval(interval);
+      return () => {
+        cancelled = true;
+        if (stream) stream.close();
+        if (interval) clearInterval(interval);
+      };
     } else {
       console.warn('Notifications: userId not provided, notifications will not be fetched');
     }
@@ -219,7 +265,9 @@ export const Notifications: React.FC<NotificationsProps> = ({ userId }) => {
                           {notification.message}
                         </p>
                         <p className="text-xs text-gray-400">
-                          {new Date(notification.created_at).toLocaleString()}
+                          {notification.occurrence_count > 1
+                            ? `Seen on ${notification.occurrence_count} days, last ${new Date(notification.last_seen_at).toLocaleString()}`
+                            : new Date(notification.created_at).toLocaleString()}
                         </p>
                       </div>
                       {!notification.is_read && (
@@ -46,6 +46,18 @@ interface UpcomingDeadline {
   status: string;
 }
 
+interface ApproverStats {
+  user_id: number;
+  username: string;
+  name: string;
+  approved_count: number;
+  rejected_count: number;
+  average_approval_time_hours: number | null;
+  approval_time_p50_hours: number | null;
+  approval_time_p90_hours: number | null;
+  rejection_rate: number;
+}
+
 interface AnalyticsData {
   overdue_count: number;
   overdue_aging: {
@@ -68,7 +80,10 @@ interface AnalyticsData {
   upcoming_deadlines_by_period: Record<string, number>;
   upcoming_deadlines: UpcomingDeadline[];
   average_approval_time_hours: number | null;
+  approval_time_p50_hours: number | null;
+  approval_time_p90_hours: number | null;
   rejection_rate: number;
+  approver_stats: ApproverStats[];
   submission_trends: Array<{ month: string; count: number }>;
   bottleneck_approvers: Array<{ username: string; name: string; pending_count: number }>;
   priority_issues: PriorityIssue[];
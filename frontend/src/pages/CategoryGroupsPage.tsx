@@ -114,8 +114,8 @@ export const CategoryGroupsPage: React.FC = () => {
       
       // Show success message with details
       const messageParts = [result.message || 'Sync completed successfully!'];
-      if (result.files_uploaded && result.files_uploaded > 0) {
-        messageParts.push(`${result.files_uploaded} file(s) uploaded`);
+      if (result.files_queued && result.files_queued > 0) {
+        messageParts.push(`${result.files_queued} file(s) queued for upload`);
       }
       if (result.categories_created && result.categories_created > 0) {
         messageParts.push(`${result.categories_created} folder(s) created`);
@@ -123,22 +123,6 @@ export const CategoryGroupsPage: React.FC = () => {
       
       toast.success(messageParts.join('. '), { id: 'create-folders', duration: 5000 });
       
-      // Show warnings/errors if any files failed
-      if (result.files_failed && result.files_failed > 0) {
-        toast.error(`${result.files_failed} file(s) failed to upload. Check console for details.`, { 
-          id: 'sync-errors', 
-          duration: 7000 
-        });
-        
-        // Log detailed errors to console
-        if (result.upload_errors && Array.isArray(result.upload_errors)) {
-          console.error('File upload errors:', result.upload_errors);
-          result.upload_errors.forEach((error: string) => {
-            toast.error(error, { duration: 5000 });
-          });
-        }
-      }
-      
       // Refresh authentication status after successful sync
       await checkGoogleDriveAuth();
     } catch (error: any) {
@@ -162,7 +146,7 @@ export const CategoryGroupsPage: React.FC = () => {
     }
   };
 
-  const handleExport = async (format: 'pdf' | 'excel') => {
+  const handleExport = async (format: 'pdf' | 'excel' | 'csv') => {
     try {
       toast.loading(`Exporting as ${format.toUpperCase()}...`, { id: 'export' });
       const blob = await categoriesApi.exportGroups(format, false);
@@ -179,7 +163,7 @@ export const CategoryGroupsPage: React.FC = () => {
       const url = window.URL.createObjectURL(blob);
       const link = document.createElement('a');
       link.href = url;
-      link.download = `category_groups_export.${format === 'pdf' ? 'pdf' : 'xlsx'}`;
+      link.download = `category_groups_export.${format === 'excel' ? 'xlsx' : format}`;
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
@@ -348,6 +332,16 @@ export const CategoryGroupsPage: React.FC = () => {
                     <FileSpreadsheet className="text-green-600" size={20} />
                     <span className="text-sm font-medium">Export as Excel</span>
                   </button>
+                  <button
+                    onClick={() => {
+                      handleExport('csv');
+                      setShowExportMenu(false);
+                    }}
+                    className="w-full flex items-center gap-3 px-4 py-3 text-left hover:bg-gray-50 transition-colors"
+                  >
+                    <FileSpreadsheet className="text-gray-600" size={20} />
+                    <span className="text-sm font-medium">Export as CSV</span>
+                  </button>
                   <button
                     onClick={() => {
                       handleExport('pdf');